@@ -0,0 +1,250 @@
+"""
+OpenAI-compatible stand-in for the benchmarks (chat completions, Whisper,
+and the Files + Batches endpoints used by bulk review).
+
+Responses are canned, but the timing is not: each call sleeps
+`latency + prompt_tokens / 1000 * latency_per_1k_tokens` (± jitter), plus
+`seconds_per_output_token` for each completion token. Images
+are billed at a fixed token count, like gpt-4o's tiles, so payload size and
+prompt shape still show up in wall time. Usage is reported on every
+response, so token counters behave exactly as in production. A batch
+completes `batch_latency` seconds after it is created, with one canned
+completion per input line and no per-request delay.
+"""
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+IMAGE_TOKENS = 765  # gpt-4o, one 1024px image at high detail
+
+LOREM = (
+    "the nurse explains the care plan while the family listens and asks how the "
+    "medication schedule will change over the next week and who to call at night"
+).split()
+
+
+def estimate_tokens(messages):
+    tokens = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            tokens += len(content) // 4
+            continue
+        for part in content or []:
+            if part.get("type") == "text":
+                tokens += len(part.get("text", "")) // 4
+            elif part.get("type") == "image_url":
+                tokens += IMAGE_TOKENS
+    return tokens
+
+
+class FakeOpenAI:
+    def __init__(self, latency=0.5, latency_per_1k_tokens=0.05, jitter=0.1, seconds_per_output_token=0.0,
+                 completion_words=80, transcript_words=400, batch_latency=1.0, seed=0):
+        self.latency = latency
+        self.latency_per_1k_tokens = latency_per_1k_tokens
+        self.jitter = jitter
+        self.seconds_per_output_token = seconds_per_output_token
+        self.completion_words = completion_words
+        self.transcript_words = transcript_words
+        self.batch_latency = batch_latency
+        self.files = {}
+        self.batches = {}
+        self.random = random.Random(seed)
+        self.calls = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.lock = threading.Lock()
+        self._server = None
+
+    def delay(self, prompt_tokens):
+        with self.lock:
+            noise = self.random.uniform(-self.jitter, self.jitter)
+        return max(0.0, self.latency + prompt_tokens / 1000 * self.latency_per_1k_tokens + noise)
+
+    def completion(self, payload):
+        prompt_tokens = estimate_tokens(payload.get("messages", []))
+        words = min(self.completion_words, payload.get("max_tokens") or self.completion_words)
+        text = " ".join(LOREM[i % len(LOREM)] for i in range(words))
+        if (payload.get("response_format") or {}).get("type") == "json_object":
+            # Multi-frame video review: one feedback entry per "Frame N (FN)" in the prompt
+            frames = sorted({int(n) for n in re.findall(r"Frame (\d+) \(F\d+\)", json.dumps(payload.get("messages")))})
+            text = json.dumps({"frames": [{"frame": n, "feedback": text.capitalize() + "."} for n in frames]})
+            words *= max(1, len(frames))
+            return prompt_tokens, self._completion_body(payload, text, prompt_tokens, words)
+        return prompt_tokens, self._completion_body(payload, text.capitalize() + ".", prompt_tokens, words)
+
+    def _completion_body(self, payload, content, prompt_tokens, words):
+        return {
+            "id": f"chatcmpl-bench-{time.time_ns()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "gpt-4o"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": words,
+                "total_tokens": prompt_tokens + words,
+            },
+        }
+
+    def add_file(self, content, purpose):
+        with self.lock:
+            file_id = f"file-bench-{len(self.files) + 1}"
+            self.files[file_id] = content
+        return {"id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+                "filename": f"{file_id}.jsonl", "purpose": purpose, "status": "processed"}
+
+    def create_batch(self, payload):
+        with self.lock:
+            batch_id = f"batch_bench_{len(self.batches) + 1}"
+            batch = {
+                "id": batch_id, "object": "batch", "endpoint": payload.get("endpoint"),
+                "input_file_id": payload.get("input_file_id"),
+                "completion_window": payload.get("completion_window"),
+                "status": "in_progress", "output_file_id": None, "error_file_id": None,
+                "created_at": int(time.time()), "metadata": payload.get("metadata"),
+                "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            }
+            self.batches[batch_id] = batch
+        threading.Timer(self.batch_latency, self.finish_batch, args=(batch_id,)).start()
+        return batch
+
+    def finish_batch(self, batch_id):
+        batch = self.batches[batch_id]
+        lines = []
+        for line in self.files[batch["input_file_id"]].decode().splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            _, body = self.completion(request["body"])
+            lines.append(json.dumps({
+                "id": f"batch_req_{len(lines) + 1}",
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "request_id": f"req_{time.time_ns()}", "body": body},
+                "error": None,
+            }))
+        output = self.add_file(("\n".join(lines) + "\n").encode(), "batch_output")
+        with self.lock:
+            batch.update(status="completed", output_file_id=output["id"], completed_at=int(time.time()),
+                         request_counts={"total": len(lines), "completed": len(lines), "failed": 0})
+
+    def start(self, host="127.0.0.1", port=0):
+        fake = self
+
+        class Handler(_OpenAIHandler):
+            api = fake
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}/v1"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class _OpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    api = None
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _count(self, path):
+        with self.api.lock:
+            self.api.calls[path] = self.api.calls.get(path, 0) + 1
+
+    def do_GET(self):
+        path = self.path.split("?")[0].rstrip("/")
+        self._count(path)
+        parts = path.split("/")
+        if len(parts) >= 2 and parts[-2] == "batches" and parts[-1] in self.api.batches:
+            self._json(200, self.api.batches[parts[-1]])
+        elif path.endswith("/content") and parts[-2] in self.api.files:
+            body = self.api.files[parts[-2]]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._json(404, {"error": {"message": f"Unknown endpoint {path}", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        path = self.path.split("?")[0].rstrip("/")
+        api = self.api
+        with api.lock:
+            api.calls[path] = api.calls.get(path, 0) + 1
+            api.in_flight += 1
+            api.peak_in_flight = max(api.peak_in_flight, api.in_flight)
+        try:
+            if path.endswith("/chat/completions"):
+                self._chat(json.loads(body))
+            elif path.endswith("/audio/transcriptions"):
+                self._transcription(body)
+            elif path.endswith("/files"):
+                self._file_upload(body)
+            elif path.endswith("/batches"):
+                self._json(200, api.create_batch(json.loads(body)))
+            else:
+                self._json(404, {"error": {"message": f"Unknown endpoint {path}", "type": "invalid_request_error"}})
+        finally:
+            with api.lock:
+                api.in_flight -= 1
+
+    def _chat(self, payload):
+        prompt_tokens, body = self.api.completion(payload)
+        time.sleep(self.api.delay(prompt_tokens) + body["usage"]["completion_tokens"] * self.api.seconds_per_output_token)
+        self._json(200, body)
+
+    def _file_upload(self, body):
+        # multipart/form-data: a "purpose" field and a "file" field
+        boundary = self.headers.get("Content-Type", "").split("boundary=")[-1].strip('"').encode()
+        fields = {}
+        for part in body.split(b"--" + boundary):
+            head, _, value = part.partition(b"\r\n\r\n")
+            if b'name="' not in head:
+                continue
+            name = head.split(b'name="')[1].split(b'"')[0].decode()
+            fields[name] = value[:-2] if value.endswith(b"\r\n") else value
+        self._json(200, self.api.add_file(fields.get("file", b""), fields.get("purpose", b"batch").decode()))
+
+    def _transcription(self, body):
+        # Whisper bills by audio length; the upload size is a fair proxy here
+        audio_kb = len(body) // 1024
+        time.sleep(self.api.delay(audio_kb))
+        words = [LOREM[i % len(LOREM)] for i in range(self.api.transcript_words)]
+        if b"verbose_json" not in body:
+            self._json(200, {"text": " ".join(words)})
+            return
+        # Timed segments of ~10 words at a normal speaking pace (2.5 words/s)
+        segments = [
+            {"id": n, "start": i / 2.5, "end": min(i + 10, len(words)) / 2.5, "text": " " + " ".join(words[i:i + 10])}
+            for n, i in enumerate(range(0, len(words), 10))
+        ]
+        self._json(200, {
+            "task": "transcribe",
+            "language": "english",
+            "duration": len(words) / 2.5,
+            "text": " ".join(words),
+            "segments": segments,
+        })
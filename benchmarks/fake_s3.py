@@ -0,0 +1,220 @@
+"""
+In-memory, path-style S3 stand-in for the benchmarks.
+
+Implements just enough of the REST API for what the app and boto3's
+transfer manager actually call: Head/Get (with Range)/Put/Delete object,
+ListObjectsV2 and multipart uploads. `latency` is added to every request and
+`bandwidth` (bytes/sec, 0 = unlimited) throttles object bodies, so runs can
+approximate a real region instead of loopback speeds.
+"""
+import hashlib
+import re
+import threading
+import time
+import uuid
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+from xml.sax.saxutils import escape
+
+
+class FakeS3:
+    def __init__(self, latency=0.0, bandwidth=0):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.objects = {}   # (bucket, key) -> (bytes, content_type, etag, mtime)
+        self.uploads = {}   # upload_id -> {"bucket", "key", "content_type", "parts": {n: bytes}}
+        self.requests = 0
+        self.bytes_out = 0
+        self.lock = threading.Lock()
+        self._server = None
+
+    def put(self, bucket, key, data, content_type="application/octet-stream"):
+        etag = '"%s"' % hashlib.md5(data).hexdigest()
+        with self.lock:
+            self.objects[(bucket, key)] = (data, content_type, etag, time.time())
+        return etag
+
+    def start(self, host="127.0.0.1", port=0):
+        fake = self
+
+        class Handler(_S3Handler):
+            store = fake
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class _S3Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    store = None
+
+    def log_message(self, *args):
+        pass
+
+    # --- request plumbing ---
+    def _parse(self):
+        parsed = urlparse(self.path)
+        bucket, _, key = parsed.path.lstrip("/").partition("/")
+        return unquote(bucket), unquote(key), {k: v[0] for k, v in parse_qs(parsed.query, keep_blank_values=True).items()}
+
+    def _body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            data = b""
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return data
+                data += self.rfile.read(size)
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _begin(self):
+        with self.store.lock:
+            self.store.requests += 1
+        if self.store.latency:
+            time.sleep(self.store.latency)
+
+    def _send(self, status, body=b"", headers=None, head_only=False):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if head_only or not body:
+            return
+        if self.store.bandwidth:
+            step = max(64 * 1024, self.store.bandwidth // 20)
+            for i in range(0, len(body), step):
+                self.wfile.write(body[i:i + step])
+                time.sleep(min(step, len(body) - i) / self.store.bandwidth)
+        else:
+            self.wfile.write(body)
+        with self.store.lock:
+            self.store.bytes_out += len(body)
+
+    def _xml(self, status, xml):
+        self._send(status, ('<?xml version="1.0" encoding="UTF-8"?>' + xml).encode(), {"Content-Type": "application/xml"})
+
+    def _error(self, status, code):
+        self._xml(status, f"<Error><Code>{code}</Code><Message>{code}</Message></Error>")
+
+    # --- verbs ---
+    def do_HEAD(self):
+        self._begin()
+        bucket, key, _ = self._parse()
+        obj = self.store.objects.get((bucket, key))
+        if not obj:
+            return self._send(404, head_only=True)
+        data, content_type, etag, mtime = obj
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Content-Type", content_type)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(mtime, usegmt=True))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+    def do_GET(self):
+        self._begin()
+        bucket, key, query = self._parse()
+        if not key:
+            return self._list(bucket, query)
+        obj = self.store.objects.get((bucket, key))
+        if not obj:
+            return self._error(404, "NoSuchKey")
+        data, content_type, etag, mtime = obj
+        headers = {
+            "Content-Type": content_type,
+            "ETag": etag,
+            "Last-Modified": formatdate(mtime, usegmt=True),
+            "Accept-Ranges": "bytes",
+        }
+        match = re.match(r"bytes=(\d*)-(\d*)$", self.headers.get("Range", ""))
+        if not match:
+            return self._send(200, data, headers)
+        start, end = match.groups()
+        if start == "":
+            start, end = max(0, len(data) - int(end)), len(data) - 1
+        else:
+            start, end = int(start), min(int(end) if end else len(data) - 1, len(data) - 1)
+        if start >= len(data) or start > end:
+            return self._error(416, "InvalidRange")
+        headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+        self._send(206, data[start:end + 1], headers)
+
+    def do_PUT(self):
+        self._begin()
+        bucket, key, query = self._parse()
+        body = self._body()
+        if "uploadId" in query:
+            upload = self.store.uploads.get(query["uploadId"])
+            if not upload:
+                return self._error(404, "NoSuchUpload")
+            upload["parts"][int(query["partNumber"])] = body
+            return self._send(200, headers={"ETag": '"%s"' % hashlib.md5(body).hexdigest()})
+        etag = self.store.put(bucket, key, body, self.headers.get("Content-Type") or "application/octet-stream")
+        self._send(200, headers={"ETag": etag})
+
+    def do_POST(self):
+        self._begin()
+        bucket, key, query = self._parse()
+        self._body()
+        if "uploads" in query:
+            upload_id = uuid.uuid4().hex
+            self.store.uploads[upload_id] = {
+                "bucket": bucket,
+                "key": key,
+                "content_type": self.headers.get("Content-Type") or "application/octet-stream",
+                "parts": {},
+            }
+            return self._xml(200, (
+                f"<InitiateMultipartUploadResult><Bucket>{escape(bucket)}</Bucket>"
+                f"<Key>{escape(key)}</Key><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>"
+            ))
+        if "uploadId" in query:
+            upload = self.store.uploads.pop(query["uploadId"], None)
+            if not upload:
+                return self._error(404, "NoSuchUpload")
+            data = b"".join(upload["parts"][n] for n in sorted(upload["parts"]))
+            etag = self.store.put(bucket, key, data, upload["content_type"])
+            return self._xml(200, (
+                f"<CompleteMultipartUploadResult><Bucket>{escape(bucket)}</Bucket>"
+                f"<Key>{escape(key)}</Key><ETag>{escape(etag)}</ETag></CompleteMultipartUploadResult>"
+            ))
+        self._error(400, "InvalidRequest")
+
+    def do_DELETE(self):
+        self._begin()
+        bucket, key, query = self._parse()
+        if "uploadId" in query:
+            self.store.uploads.pop(query["uploadId"], None)
+        else:
+            with self.store.lock:
+                self.store.objects.pop((bucket, key), None)
+        self._send(204)
+
+    def _list(self, bucket, query):
+        prefix = query.get("prefix", "")
+        with self.store.lock:
+            items = sorted(
+                (key, obj) for (b, key), obj in self.store.objects.items()
+                if b == bucket and key.startswith(prefix)
+            )
+        contents = "".join(
+            f"<Contents><Key>{escape(key)}</Key><Size>{len(data)}</Size><ETag>{escape(etag)}</ETag>"
+            f"<LastModified>{time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(mtime))}</LastModified></Contents>"
+            for key, (data, _, etag, mtime) in items
+        )
+        self._xml(200, (
+            f"<ListBucketResult><Name>{escape(bucket)}</Name><Prefix>{escape(prefix)}</Prefix>"
+            f"<KeyCount>{len(items)}</KeyCount><IsTruncated>false</IsTruncated>{contents}</ListBucketResult>"
+        ))
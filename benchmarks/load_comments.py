@@ -0,0 +1,355 @@
+"""
+Load test for the comment and reaction API.
+
+    python benchmarks/load_comments.py                                   # SQLite in a temp dir
+    python benchmarks/load_comments.py --database-url postgresql://localhost/video_review_load
+    python benchmarks/load_comments.py --save baseline.json
+    python benchmarks/load_comments.py --baseline baseline.json --tolerance 0.25
+    python benchmarks/load_comments.py --max-p95 get_comments=150 --min-throughput 200
+
+Seeds the database with a realistic volume of videos, comments, users and
+reactions, then runs a mixed read/write workload at a chosen concurrency.
+By default requests go through the Flask test client in this process. With
+--base-url they go over HTTP to a running server, which must use the same
+--database-url. Reports p50/p95/p99 latency and throughput per operation.
+Exits non-zero when a threshold is breached or when p95 regresses past the
+baseline by more than the tolerance, so it can gate a change in CI.
+
+Use a throwaway database: seeding adds rows and the workload writes more.
+"""
+import argparse
+import json
+import os
+import random
+import secrets
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from fake_openai import LOREM  # noqa: E402
+
+OPERATIONS = ("get_comments", "add_comment", "react", "unique_video_ids", "list_assets")
+DEFAULT_MIX = "get_comments=70,add_comment=15,react=10,unique_video_ids=3,list_assets=2"
+REACTIONS = ("👍", "❤️", "✅", "👀", "❓")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to a fresh SQLite file")
+    parser.add_argument("--base-url", help="drive a running server over HTTP instead of the in-process test client")
+    parser.add_argument("--videos", type=int, default=2000)
+    parser.add_argument("--comments-per-video", type=int, default=200)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--reaction-rate", type=float, default=0.2, help="share of seeded comments with reactions")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse rows from a previous run")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30, help="seconds of measured traffic")
+    parser.add_argument("--warmup", type=float, default=3, help="seconds of unmeasured traffic first")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weights per operation, e.g. " + DEFAULT_MIX)
+    parser.add_argument("--hot-videos", type=float, default=0.1,
+                        help="share of videos that get 80%% of reads and writes, like a review week")
+    parser.add_argument("--max-p95", action="append", default=[], metavar="OP=MS")
+    parser.add_argument("--max-p99", action="append", default=[], metavar="OP=MS")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--min-throughput", type=float, help="total requests/sec")
+    parser.add_argument("--baseline", help="results JSON from an earlier --save to compare p95 against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 slowdown vs the baseline")
+    parser.add_argument("--save", help="write the results JSON here")
+    parser.add_argument("--seed", type=int, default=1)
+    return parser.parse_args()
+
+
+def parse_pairs(items):
+    pairs = {}
+    for item in items:
+        for part in item.split(","):
+            name, _, value = part.partition("=")
+            if name.strip() not in OPERATIONS:
+                raise SystemExit(f"Unknown operation {name!r}; expected one of {', '.join(OPERATIONS)}")
+            pairs[name.strip()] = float(value)
+    return pairs
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def video_ids(count):
+    return [f"load_video_{n:05d}" for n in range(count)]
+
+
+def seed(app, args, rng):
+    """Bulk-inserts users, comments and reactions; returns (user tokens, max comment id)."""
+    from sqlalchemy import func, insert
+
+    from video_review.extensions import db
+    from video_review.models import Asset, Comment, CommentReaction, User
+
+    with app.app_context():
+        db.create_all()
+        if args.skip_seed:
+            tokens = [u.token for u in User.query.filter(User.username.like("load_user_%")).all()]
+            return tokens, db.session.query(func.max(Comment.id)).scalar() or 0
+
+        started = time.perf_counter()
+        users = [
+            {"username": f"load_user_{n}_{secrets.token_hex(3)}", "password_hash": "x", "token": secrets.token_hex(32)}
+            for n in range(args.users)
+        ]
+        db.session.execute(insert(User), users)
+
+        def insert_comments(rows, reactions):
+            ids = db.session.scalars(
+                insert(Comment).returning(Comment.id, sort_by_parameter_order=True), rows
+            ).all()
+            reaction_rows.extend(
+                {"comment_id": ids[index], "reaction": reaction, "username": username}
+                for index, reaction, username in reactions
+            )
+
+        now = datetime.utcnow()
+        batch = []
+        batch_reactions = []  # (index in batch, reaction, username)
+        reaction_rows = []
+        inserted = 0
+        for n, video_id in enumerate(video_ids(args.videos)):
+            storyboard = n % 3 == 0
+            for _ in range(args.comments_per_video):
+                if rng.random() < args.reaction_rate:
+                    for reaction in rng.sample(REACTIONS, rng.randint(1, 2)):
+                        for u in rng.sample(users, rng.randint(1, 4)):
+                            batch_reactions.append((len(batch), reaction, u["username"]))
+                words = rng.randint(8, 80)
+                batch.append({
+                    "video_id": video_id,
+                    "timestamp": "0" if storyboard else str(rng.randint(0, 900)),
+                    "page": rng.randint(1, 40) if storyboard else None,
+                    "comment": " ".join(rng.choice(LOREM) for _ in range(words)),
+                    "user": rng.choice(users)["username"],
+                    "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+                })
+            if len(batch) >= 5000:
+                insert_comments(batch, batch_reactions)
+                inserted += len(batch)
+                batch, batch_reactions = [], []
+        if batch:
+            insert_comments(batch, batch_reactions)
+            inserted += len(batch)
+        for start in range(0, len(reaction_rows), 5000):
+            db.session.execute(insert(CommentReaction), reaction_rows[start:start + 5000])
+        db.session.execute(insert(Asset), [
+            {"video_id": video_id, "media_type": "storyboards" if n % 3 == 0 else "videos",
+             "comment_count": args.comments_per_video, "created_at": now, "last_activity_at": now}
+            for n, video_id in enumerate(video_ids(args.videos))
+        ])
+        db.session.commit()
+        print(f"[🌱] Seeded {args.users} users, {inserted} comments and {len(reaction_rows)} reactions on {args.videos} videos "
+              f"in {time.perf_counter() - started:.1f}s")
+        return [u["token"] for u in users], db.session.query(func.max(Comment.id)).scalar() or 0
+
+
+class InProcessClient:
+    def __init__(self, flask_app):
+        self.client = flask_app.test_client()
+
+    def request(self, method, path, token=None, json_body=None):
+        headers = {"Authorization": token} if token else {}
+        resp = self.client.open(path, method=method, json=json_body, headers=headers)
+        resp.get_data()
+        return resp.status_code
+
+
+class HttpClient:
+    def __init__(self, base_url):
+        import requests
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+
+    def request(self, method, path, token=None, json_body=None):
+        headers = {"Authorization": token} if token else {}
+        resp = self.session.request(method, self.base_url + path, json=json_body, headers=headers, timeout=60)
+        return resp.status_code
+
+
+class Workload:
+    def __init__(self, args, tokens, max_comment_id, rng):
+        self.args = args
+        self.tokens = tokens
+        self.max_comment_id = max_comment_id
+        self.videos = video_ids(args.videos)
+        self.hot = self.videos[:max(1, int(len(self.videos) * args.hot_videos))]
+        self.mix = parse_pairs([args.mix])
+        self.seed = rng.random()
+        self.latencies = {op: [] for op in OPERATIONS}
+        self.errors = {op: 0 for op in OPERATIONS}
+        self.lock = threading.Lock()
+        self.measuring = False
+        self.stop = threading.Event()
+
+    def pick_video(self, rng):
+        return rng.choice(self.hot) if rng.random() < 0.8 else rng.choice(self.videos)
+
+    def run_op(self, client, op, rng):
+        if op == "get_comments":
+            return client.request("GET", f"/comments/{self.pick_video(rng)}")
+        if op == "add_comment":
+            return client.request("POST", "/comments", token=rng.choice(self.tokens), json_body={
+                "video_id": self.pick_video(rng),
+                "timestamp": str(rng.randint(0, 900)),
+                "comment": " ".join(rng.choice(LOREM) for _ in range(rng.randint(8, 60))),
+            })
+        if op == "react":
+            comment_id = rng.randint(1, self.max_comment_id)
+            return client.request("PATCH", f"/comments/{comment_id}/reactions",
+                                  token=rng.choice(self.tokens), json_body=[rng.choice(REACTIONS)])
+        if op == "list_assets":
+            return client.request("GET", f"/assets?page={rng.randint(1, 5)}")
+        return client.request("GET", "/comments/unique_video_ids")
+
+    def worker(self, n, make_client):
+        rng = random.Random(f"{self.seed}-{n}")
+        client = make_client()
+        ops, weights = zip(*self.mix.items())
+        while not self.stop.is_set():
+            op = rng.choices(ops, weights)[0]
+            started = time.perf_counter()
+            try:
+                failed = self.run_op(client, op, rng) >= 400
+            except Exception as e:
+                print(f"[❌] {op} failed: {e}")
+                failed = True
+            elapsed = time.perf_counter() - started
+            if self.measuring:
+                with self.lock:
+                    self.latencies[op].append(elapsed)
+                    self.errors[op] += failed
+
+    def run(self, make_client):
+        threads = [
+            threading.Thread(target=self.worker, args=(n, make_client), daemon=True)
+            for n in range(self.args.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(self.args.warmup)
+        self.measuring = True
+        started = time.perf_counter()
+        time.sleep(self.args.duration)
+        self.measuring = False
+        wall = time.perf_counter() - started
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        return self.report(wall)
+
+    def report(self, wall):
+        operations = {}
+        for op in OPERATIONS:
+            samples = sorted(self.latencies[op])
+            if not samples:
+                continue
+            operations[op] = {
+                "requests": len(samples),
+                "errors": self.errors[op],
+                "throughput_per_second": round(len(samples) / wall, 2),
+                "p50_ms": round(percentile(samples, 50) * 1000, 2),
+                "p95_ms": round(percentile(samples, 95) * 1000, 2),
+                "p99_ms": round(percentile(samples, 99) * 1000, 2),
+                "max_ms": round(samples[-1] * 1000, 2),
+            }
+        total = sum(o["requests"] for o in operations.values())
+        return {
+            "wall_seconds": round(wall, 2),
+            "requests": total,
+            "errors": sum(o["errors"] for o in operations.values()),
+            "throughput_per_second": round(total / wall, 2) if wall else 0,
+            "operations": operations,
+        }
+
+
+def check(results, args):
+    """Returns a list of human-readable threshold/regression failures."""
+    failures = []
+    ops = results["operations"]
+    for key, limits in (("p95_ms", parse_pairs(args.max_p95)), ("p99_ms", parse_pairs(args.max_p99))):
+        for op, limit in limits.items():
+            if op in ops and ops[op][key] > limit:
+                failures.append(f"{op} {key} {ops[op][key]} > {limit}")
+    if results["requests"] and results["errors"] / results["requests"] > args.max_error_rate:
+        failures.append(f"error rate {results['errors']}/{results['requests']} > {args.max_error_rate:.1%}")
+    if args.min_throughput and results["throughput_per_second"] < args.min_throughput:
+        failures.append(f"throughput {results['throughput_per_second']}/s < {args.min_throughput}/s")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]["operations"]
+        for op, stats in ops.items():
+            if op in baseline and stats["p95_ms"] > baseline[op]["p95_ms"] * (1 + args.tolerance):
+                failures.append(
+                    f"{op} p95 regressed: {stats['p95_ms']}ms vs baseline {baseline[op]['p95_ms']}ms "
+                    f"(+{args.tolerance:.0%} allowed)"
+                )
+    return failures
+
+
+def print_results(results):
+    print(f"\n[📊] {results['requests']} requests in {results['wall_seconds']}s "
+          f"({results['throughput_per_second']}/s), {results['errors']} errors")
+    print(f"      {'operation':<18}{'req':>8}{'err':>6}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)")
+    for op, s in results["operations"].items():
+        print(f"      {op:<18}{s['requests']:>8}{s['errors']:>6}{s['throughput_per_second']:>9}"
+              f"{s['p50_ms']:>9}{s['p95_ms']:>9}{s['p99_ms']:>9}{s['max_ms']:>9}")
+
+
+def main():
+    args = parse_args()
+    work_dir = None
+    if not args.database_url:
+        work_dir = tempfile.mkdtemp(prefix="silas_load_")
+        args.database_url = f"sqlite:///{os.path.join(work_dir, 'load.db')}"
+    # Read by the app at import time
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("OPENAI_API_KEY", "load-test")
+
+    import app as entry
+
+    rng = random.Random(args.seed)
+    tokens, max_comment_id = seed(entry.app, args, rng)
+    if not tokens or not max_comment_id:
+        raise SystemExit("Nothing to load test: seed first (drop --skip-seed)")
+
+    workload = Workload(args, tokens, max_comment_id, rng)
+    if args.base_url:
+        make_client = lambda: HttpClient(args.base_url)  # noqa: E731
+    else:
+        make_client = lambda: InProcessClient(entry.app)  # noqa: E731
+    print(f"[🏁] {args.concurrency} workers, {args.warmup:g}s warmup + {args.duration:g}s measured "
+          f"against {args.base_url or 'the in-process app'} ({args.database_url.split('://')[0]})")
+    results = workload.run(make_client)
+    print_results(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+        print(f"[💾] Results written to {args.save}")
+
+    failures = check(results, args)
+    for failure in failures:
+        print(f"[❌] {failure}")
+    if work_dir:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    if failures:
+        sys.exit(1)
+    print("[✅] Within thresholds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+"""
+Offline benchmarks for the SILAS pipelines.
+
+    python benchmarks/run.py
+    python benchmarks/run.py --only storyboard docx --openai-latency 1.5
+    python benchmarks/run.py --video-seconds 30 120 --repeat 3 --json results.json
+
+The app is pointed at local stand-ins: a fake S3 (via S3_ENDPOINT_URL) and a
+fake OpenAI-compatible server (via OPENAI_BASE_URL), both with configurable
+latency, plus a throwaway SQLite database. Synthetic videos, storyboard PDFs
+and DOCX scripts are generated in several sizes, and each pipeline is driven
+through the Flask test client. For every run we report wall time,
+throughput, seconds per stage (taken from the app's own /metrics
+histograms), model calls and tokens, and peak RSS.
+
+The video scenarios need ffmpeg and ffprobe on PATH.
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, redirect_stderr, redirect_stdout
+from io import StringIO
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import synth  # noqa: E402
+from fake_openai import FakeOpenAI  # noqa: E402
+from fake_s3 import FakeS3  # noqa: E402
+
+SCENARIOS = ("video", "storyboard", "docx", "chat", "batch")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--video-seconds", nargs="+", type=int, default=[30, 60, 120])
+    parser.add_argument("--video-max-frames", type=int, help="frame budget per video review (default: the app's)")
+    parser.add_argument("--video-frames-per-call", type=int, help="planned frames reviewed per model call (default: the app's)")
+    parser.add_argument("--video-composite", choices=("images", "grid"), help="how grouped frames are sent")
+    parser.add_argument("--storyboard-pages", nargs="+", type=int, default=[5, 20, 50])
+    parser.add_argument("--docx-paragraphs", nargs="+", type=int, default=[40, 400])
+    parser.add_argument("--chat-requests", type=int, default=20)
+    parser.add_argument("--chat-concurrency", type=int, default=4)
+    parser.add_argument("--batch-storyboards", nargs="+", type=int, default=[5], help="20-page storyboards per bulk review")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per size")
+    parser.add_argument("--warm-cache", action="store_true", help="keep the media and DOCX text caches between runs")
+    parser.add_argument("--openai-latency", type=float, default=0.5, help="base seconds per model call")
+    parser.add_argument("--openai-latency-per-1k", type=float, default=0.05, help="extra seconds per 1k prompt tokens")
+    parser.add_argument("--openai-jitter", type=float, default=0.1)
+    parser.add_argument("--openai-output-latency", type=float, default=0.0, help="extra seconds per completion token")
+    parser.add_argument("--openai-batch-latency", type=float, default=1.0, help="seconds before a submitted batch completes")
+    parser.add_argument("--s3-latency", type=float, default=0.02, help="seconds per S3 request")
+    parser.add_argument("--s3-bandwidth", type=float, default=50, help="MB/s per S3 response, 0 for unlimited")
+    parser.add_argument("--work-dir", help="keep generated assets here instead of a temp dir")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the app's own log output")
+    return parser.parse_args()
+
+
+def configure_env(work_dir, s3_url, openai_url):
+    """Must run before the app is imported: clients and config are read at import time."""
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(work_dir, 'bench.db')}",
+        "S3_ENDPOINT_URL": s3_url,
+        "OPENAI_BASE_URL": openai_url,
+        "OPENAI_API_KEY": "bench",
+        "AWS_ACCESS_KEY_ID": "bench",
+        "AWS_SECRET_ACCESS_KEY": "bench",
+        "AWS_REGION": "us-east-1",
+        "AWS_DEFAULT_REGION": "us-east-1",
+        # The fake S3 doesn't speak aws-chunked checksum trailers
+        "AWS_REQUEST_CHECKSUM_CALCULATION": "when_required",
+        "AWS_RESPONSE_CHECKSUM_VALIDATION": "when_required",
+        "MEDIA_CACHE_DIR": os.path.join(work_dir, "media-cache"),
+        "SCRATCH_DIR": os.path.join(work_dir, "scratch"),
+        # Batch results are ingested by the poller, so poll often enough to time the batch scenario
+        "BATCH_POLL_SECONDS": "0.5",
+    })
+
+
+class PeakRSS:
+    """Samples this process's resident set size in the background and keeps the peak."""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._page = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+    def _rss(self):
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * self._page
+        except OSError:
+            # ru_maxrss is a lifetime high-water mark (KiB on Linux), the best we can do elsewhere
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = self._rss()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._rss())
+
+
+def metric_totals(metric):
+    """{labels: value} for a counter, or {labels: (sum, count)} for a histogram."""
+    totals = {}
+    for family in metric.collect():
+        for sample in family.samples:
+            labels = tuple(sorted(sample.labels.items()))
+            if sample.name.endswith("_total"):
+                totals[labels] = sample.value
+            elif sample.name.endswith("_sum"):
+                totals[labels] = (sample.value, totals.get(labels, (0, 0))[1])
+            elif sample.name.endswith("_count"):
+                totals[labels] = (totals.get(labels, (0, 0))[0], sample.value)
+    return totals
+
+
+def metric_delta(before, after):
+    delta = {}
+    for labels, value in after.items():
+        prev = before.get(labels)
+        if isinstance(value, tuple):
+            prev = prev or (0, 0)
+            if value[1] - prev[1]:
+                delta[labels] = (value[0] - prev[0], value[1] - prev[1])
+        elif value - (prev or 0):
+            delta[labels] = value - (prev or 0)
+    return delta
+
+
+class Bench:
+    def __init__(self, args, work_dir, s3, openai):
+        self.args = args
+        self.work_dir = work_dir
+        self.s3 = s3
+        self.openai = openai
+        self.results = []
+
+        import app as entry
+        from video_review import config, metrics
+        from video_review.extensions import db
+        self.app = entry.app
+        self.db = db
+        self.metrics = metrics
+        self.bucket = config.S3_BUCKET
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+
+    def s3_url(self, key):
+        return f"https://{self.bucket}.s3.amazonaws.com/{key}"
+
+    def upload(self, key, path, content_type):
+        with open(path, "rb") as f:
+            self.s3.put(self.bucket, key, f.read(), content_type)
+
+    def reset_caches(self):
+        from video_review.models import DocumentText
+        from video_review.storage import media_cache
+        media_cache.clear()
+        with self.app.app_context():
+            DocumentText.query.delete()
+            self.db.session.commit()
+
+    def comment_count(self, video_id):
+        from video_review.models import Comment
+        with self.app.app_context():
+            return Comment.query.filter_by(video_id=video_id).count()
+
+    def measure(self, scenario, size, unit, work):
+        """Runs work() and records wall time, per-stage seconds, model usage and memory."""
+        if not self.args.warm_cache:
+            self.reset_caches()
+        stages_before = metric_totals(self.metrics.STAGE_SECONDS)
+        tokens_before = metric_totals(self.metrics.TOKENS_USED)
+        bytes_before = metric_totals(self.metrics.BYTES_DOWNLOADED)
+        calls_before = sum(self.openai.calls.values())
+        children_before = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+        started = time.perf_counter()
+        with PeakRSS() as rss, ExitStack() as quiet:
+            if not self.args.verbose:
+                # App logging and moviepy's progress bars
+                log = StringIO()
+                quiet.enter_context(redirect_stdout(log))
+                quiet.enter_context(redirect_stderr(log))
+            units_done, detail = work()
+        wall = time.perf_counter() - started
+
+        stages = {}
+        for labels, (seconds, count) in metric_delta(stages_before, metric_totals(self.metrics.STAGE_SECONDS)).items():
+            labels = dict(labels)
+            stages[f"{labels['pipeline']}.{labels['stage']}"] = {"seconds": round(seconds, 3), "count": int(count)}
+        tokens = {dict(k)["kind"]: int(v) for k, v in metric_delta(tokens_before, metric_totals(self.metrics.TOKENS_USED)).items()}
+        downloaded = sum(metric_delta(bytes_before, metric_totals(self.metrics.BYTES_DOWNLOADED)).values())
+
+        result = {
+            "scenario": scenario,
+            "size": size,
+            "wall_seconds": round(wall, 3),
+            "units": units_done,
+            "unit": unit,
+            "throughput_per_second": round(units_done / wall, 3) if wall else 0,
+            "model_calls": sum(self.openai.calls.values()) - calls_before,
+            "tokens": tokens,
+            "bytes_downloaded": int(downloaded),
+            "peak_rss_mb": round(rss.peak / 2**20, 1),
+            # Children's high-water mark only moves if this run's ffmpeg used more than any before it
+            "peak_child_rss_mb": round(max(0, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss - children_before) / 1024, 1),
+            "stages": stages,
+            **detail,
+        }
+        self.results.append(result)
+        print_result(result)
+        return result
+
+    def wait_for_background(self, before):
+        """Joins the review threads the endpoint started (anything non-daemon that wasn't running before)."""
+        for thread in threading.enumerate():
+            if thread not in before and not thread.daemon and thread is not threading.current_thread():
+                thread.join()
+
+    # --- Scenarios ---
+    def run_video(self, seconds, run):
+        path = os.path.join(self.work_dir, f"video_{seconds}s.mp4")
+        if not os.path.exists(path):
+            synth.make_video(path, seconds)
+        video_id = f"bench_video_{seconds}s_{run}"
+        self.upload(f"videos/{video_id}.mp4", path, "video/mp4")
+
+        def work():
+            before = set(threading.enumerate())
+            resp = self.client.post("/silas/review_video_async", json={
+                "file_url": self.s3_url(f"videos/{video_id}.mp4"),
+                "media_type": "video",
+                "video_id": video_id,
+                "max_frames": self.args.video_max_frames,
+                "frames_per_call": self.args.video_frames_per_call,
+                "composite": self.args.video_composite,
+                # Always measure a fresh run, never a deduplicated earlier job
+                "force": True,
+            })
+            assert resp.status_code == 202 and not resp.get_json().get("deduplicated"), resp.get_data(as_text=True)
+            self.wait_for_background(before)
+            frames = self.comment_count(video_id)
+            return frames, {"video_seconds": seconds, "file_mb": round(os.path.getsize(path) / 2**20, 2)}
+
+        return self.measure("video", f"{seconds}s", "frames", work)
+
+    def run_storyboard(self, pages, run):
+        path = os.path.join(self.work_dir, f"storyboard_{pages}p.pdf")
+        if not os.path.exists(path):
+            synth.make_storyboard(path, pages)
+        video_id = f"bench_storyboard_{pages}p_{run}"
+        self.upload(f"storyboards/{video_id}.pdf", path, "application/pdf")
+
+        def work():
+            resp = self.client.post("/silas/review", json={
+                "file_url": self.s3_url(f"storyboards/{video_id}.pdf"),
+                "media_type": "storyboard",
+                "video_id": video_id,
+            })
+            assert resp.status_code == 200, resp.get_data(as_text=True)
+            return resp.get_json()["pages_reviewed"], {"file_mb": round(os.path.getsize(path) / 2**20, 2)}
+
+        return self.measure("storyboard", f"{pages}p", "pages", work)
+
+    def run_docx(self, paragraphs, run):
+        path = os.path.join(self.work_dir, f"script_{paragraphs}para.docx")
+        if not os.path.exists(path):
+            synth.make_script(path, paragraphs)
+        video_id = f"bench_script_{paragraphs}para_{run}"
+        self.upload(
+            f"documents/{video_id}.docx", path,
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        )
+
+        def work():
+            resp = self.client.post("/silas/review", json={
+                "file_url": self.s3_url(f"documents/{video_id}.docx"),
+                "media_type": "document",
+                "video_id": video_id,
+            })
+            assert resp.status_code == 200, resp.get_data(as_text=True)
+            return paragraphs, {"comments_added": resp.get_json()["comments_added"]}
+
+        return self.measure("docx", f"{paragraphs}para", "paragraphs", work)
+
+    def run_chat(self, requests, run):
+        pages = 20
+        path = os.path.join(self.work_dir, f"storyboard_{pages}p.pdf")
+        if not os.path.exists(path):
+            synth.make_storyboard(path, pages)
+        video_id = f"bench_chat_{run}"
+        self.upload(f"storyboards/{video_id}.pdf", path, "application/pdf")
+        from video_review.models import Comment, SlidePage
+        with self.app.app_context():
+            for n in range(1, pages + 1):
+                self.db.session.add(SlidePage(video_id=video_id, page_number=n, content=f"Scene {n} narration"))
+                self.db.session.add(Comment(video_id=video_id, page=n, timestamp="0", comment=f"Note on scene {n}", user="bench"))
+            self.db.session.commit()
+
+        def ask(n):
+            # Every other question names a page, which pulls in a rendered page image
+            message = f"What should change on page {n % pages + 1}?" if n % 2 else "Summarize the open feedback."
+            resp = self.app.test_client().post("/silas/chat", json={
+                "message": message,
+                "file_url": self.s3_url(f"storyboards/{video_id}.pdf"),
+                "media_type": "storyboard",
+                "video_id": video_id,
+            })
+            assert resp.status_code == 200, resp.get_data(as_text=True)
+
+        def work():
+            with ThreadPoolExecutor(max_workers=self.args.chat_concurrency) as pool:
+                list(pool.map(ask, range(requests)))
+            return requests, {"concurrency": self.args.chat_concurrency}
+
+        return self.measure("chat", f"{requests}req", "requests", work)
+
+    def run_batch(self, storyboards, run):
+        pages = 20
+        path = os.path.join(self.work_dir, f"storyboard_{pages}p.pdf")
+        if not os.path.exists(path):
+            synth.make_storyboard(path, pages)
+        assets = []
+        for n in range(storyboards):
+            video_id = f"bench_batch_{storyboards}x_{run}_{n}"
+            self.upload(f"storyboards/{video_id}.pdf", path, "application/pdf")
+            assets.append({"video_id": video_id, "file_url": self.s3_url(f"storyboards/{video_id}.pdf"), "media_type": "storyboards"})
+
+        def work():
+            before = set(threading.enumerate())
+            resp = self.client.post("/silas/batch_review", json={"assets": assets})
+            assert resp.status_code == 202, resp.get_data(as_text=True)
+            batch_id = resp.get_json()["batch_id"]
+            self.wait_for_background(before)
+            # The poller checks with OpenAI and ingests once every part has finished
+            while True:
+                status = self.client.get(f"/silas/batch_review/{batch_id}").get_json()
+                if status["status"] in ("completed", "failed"):
+                    break
+                time.sleep(0.2)
+            assert status["status"] == "completed", status
+            return status["comments_added"], {"assets": storyboards, "batch_files": len(status["parts"])}
+
+        return self.measure("batch", f"{storyboards}x{pages}p", "pages", work)
+
+    def run(self):
+        plan = {
+            "video": (self.run_video, self.args.video_seconds),
+            "storyboard": (self.run_storyboard, self.args.storyboard_pages),
+            "docx": (self.run_docx, self.args.docx_paragraphs),
+            "chat": (self.run_chat, [self.args.chat_requests]),
+            "batch": (self.run_batch, self.args.batch_storyboards),
+        }
+        for scenario in self.args.only:
+            if scenario == "video" and not (shutil.which("ffmpeg") and shutil.which("ffprobe")):
+                print("[⚠️] Skipping video: ffmpeg/ffprobe not on PATH")
+                continue
+            runner, sizes = plan[scenario]
+            for size in sizes:
+                for run in range(self.args.repeat):
+                    runner(size, run)
+        return self.results
+
+
+def print_result(result):
+    tokens = result["tokens"]
+    print(
+        f"\n[📊] {result['scenario']} {result['size']}: {result['wall_seconds']:.2f}s wall, "
+        f"{result['throughput_per_second']:.2f} {result['unit']}/s, "
+        f"{result['model_calls']} model calls, "
+        f"{tokens.get('prompt', 0)}+{tokens.get('completion', 0)} tokens, "
+        f"{result['bytes_downloaded'] / 2**20:.1f} MB downloaded, "
+        f"peak RSS {result['peak_rss_mb']} MB"
+    )
+    for name, stage in sorted(result["stages"].items(), key=lambda item: -item[1]["seconds"]):
+        print(f"      {name:<40} {stage['seconds']:>9.3f}s  x{stage['count']}")
+
+
+def main():
+    args = parse_args()
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="silas_bench_")
+    os.makedirs(work_dir, exist_ok=True)
+
+    s3 = FakeS3(latency=args.s3_latency, bandwidth=int(args.s3_bandwidth * 2**20))
+    openai = FakeOpenAI(
+        latency=args.openai_latency,
+        latency_per_1k_tokens=args.openai_latency_per_1k,
+        jitter=args.openai_jitter,
+        seconds_per_output_token=args.openai_output_latency,
+        batch_latency=args.openai_batch_latency,
+    )
+    configure_env(work_dir, s3.start(), openai.start())
+    print(f"[🏁] Benchmarking in {work_dir}")
+
+    try:
+        results = Bench(args, work_dir, s3, openai).run()
+    finally:
+        s3.stop()
+        openai.stop()
+
+    print(f"\n[✅] {len(results)} runs, peak model concurrency {openai.peak_in_flight}, {s3.requests} S3 requests")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+        print(f"[💾] Results written to {args.json}")
+    if not args.work_dir:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Synthetic review assets for the benchmarks: videos, storyboard PDFs and DOCX
+scripts of a chosen size, generated locally so runs never touch real media.
+"""
+import ffmpeg
+import fitz  # PyMuPDF
+from docx import Document
+
+from fake_openai import LOREM
+
+
+def make_video(path, seconds, width=1280, height=720, fps=25):
+    """Test-pattern video with a sine-wave audio track (H.264/AAC, like our uploads)."""
+    video = ffmpeg.input(f"testsrc2=size={width}x{height}:rate={fps}", f="lavfi", t=seconds)
+    audio = ffmpeg.input("sine=frequency=440:sample_rate=44100", f="lavfi", t=seconds)
+    (
+        ffmpeg.output(video, audio, path, vcodec="libx264", acodec="aac", pix_fmt="yuv420p",
+                      preset="veryfast", movflags="+faststart")
+        .run(quiet=True, overwrite_output=True)
+    )
+    return path
+
+
+def make_storyboard(path, pages):
+    """Landscape storyboard PDF: a frame placeholder plus narration text on each page."""
+    doc = fitz.open()
+    for n in range(1, pages + 1):
+        page = doc.new_page(width=842, height=595)
+        frame = fitz.Rect(40, 60, 500, 320)
+        page.draw_rect(frame, color=(0.2, 0.2, 0.2), fill=((n * 37) % 255 / 255, 0.6, 0.8))
+        page.insert_text((40, 40), f"Scene {n}", fontsize=20)
+        narration = " ".join(LOREM[(n + i) % len(LOREM)] for i in range(60))
+        page.insert_textbox(fitz.Rect(520, 60, 800, 540), f"Narration: {narration}", fontsize=11)
+        page.insert_textbox(fitz.Rect(40, 340, 500, 540), f"Visual notes for scene {n}: " + narration[:200], fontsize=10)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def make_script(path, paragraphs, table_every=25):
+    """DOCX script with headings, narration paragraphs and the odd shot-list table."""
+    doc = Document()
+    doc.add_heading("Synthetic Training Script", 0)
+    for n in range(1, paragraphs + 1):
+        if n % 20 == 1:
+            doc.add_heading(f"Section {n // 20 + 1}", 1)
+        doc.add_paragraph(" ".join(LOREM[(n + i) % len(LOREM)] for i in range(45)).capitalize() + ".")
+        if table_every and n % table_every == 0:
+            table = doc.add_table(rows=3, cols=2)
+            for r, (shot, note) in enumerate([("Shot", "Note"), ("Wide", "Establish room"), ("Close", "Hands on chart")]):
+                table.cell(r, 0).text = shot
+                table.cell(r, 1).text = note
+    doc.save(path)
+    return path
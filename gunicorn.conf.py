@@ -0,0 +1,61 @@
+"""
+Gunicorn settings; render.yaml starts the app with `gunicorn app:app -c gunicorn.conf.py`.
+
+Defaults to gevent workers (GUNICORN_WORKER_CLASS=sync to opt out) and a
+preloaded, warmed-up app (GUNICORN_PRELOAD=0 to load it per worker).
+"""
+import os
+import shutil
+import tempfile
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 200))  # concurrent requests per gevent worker
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 90))
+graceful_timeout = 30
+keepalive = 5
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+if worker_class == "gevent":
+    # Patch in the master, before the app (with --preload) or ssl-using client libraries are imported
+    from gevent import monkey
+    monkey.patch_all()
+
+# One directory shared by all workers so /metrics adds them up. prometheus_client
+# reads this when it's imported, so it has to be set before the app loads.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "video-review-metrics"))
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+
+def on_starting(server):
+    # Counters left over from the previous run would otherwise be added to this one's
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+    if server.cfg.preload_app:
+        from video_review import warmup
+        warmup(server.app.wsgi())
+
+
+def post_worker_init(worker):
+    if not worker.cfg.preload_app:
+        from video_review import warmup
+        warmup(worker.wsgi)
+
+
+def post_fork(server, worker):
+    # Clients built during warmup belong to the master; each worker builds its own
+    from video_review.clients import reset_clients
+    reset_clients()
+
+    if worker_class == "gevent":
+        # psycopg2 is a C extension that gevent can't patch; without this every query blocks the worker
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -137,3 +137,180 @@ ALTER TABLE ONLY public."user"
 -- PostgreSQL database dump complete
 --
 
+
+--
+-- Name: upload_session; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE IF NOT EXISTS public.upload_session (
+    id character varying(255) NOT NULL PRIMARY KEY,
+    s3_key character varying(512) NOT NULL,
+    filename character varying(255) NOT NULL,
+    category character varying(50),
+    content_type character varying(120),
+    size bigint NOT NULL,
+    part_size bigint NOT NULL,
+    part_count integer NOT NULL,
+    status character varying(20) NOT NULL DEFAULT 'pending',
+    created_at timestamp without time zone,
+    completed_at timestamp without time zone
+);
+
+--
+-- Name: notification_outbox; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE IF NOT EXISTS public.notification_outbox (
+    id serial PRIMARY KEY,
+    kind character varying(20) NOT NULL,
+    recipient character varying(255) NOT NULL,
+    subject character varying(255) NOT NULL,
+    body text NOT NULL,
+    video_id character varying(120),
+    status character varying(20) NOT NULL DEFAULT 'pending',
+    attempts integer NOT NULL DEFAULT 0,
+    next_attempt_at timestamp without time zone NOT NULL,
+    last_error text,
+    created_at timestamp without time zone,
+    sent_at timestamp without time zone
+);
+
+CREATE INDEX IF NOT EXISTS ix_notification_outbox_due ON public.notification_outbox USING btree (status, next_attempt_at);
+
+--
+-- Name: worker_lease; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE IF NOT EXISTS public.worker_lease (
+    name character varying(64) PRIMARY KEY,
+    holder character varying(255) NOT NULL,
+    expires_at timestamp without time zone NOT NULL
+);
+
+--
+-- Name: document_text; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE IF NOT EXISTS public.document_text (
+    s3_key character varying(512) NOT NULL PRIMARY KEY,
+    video_id character varying(120) NOT NULL,
+    etag character varying(255) NOT NULL,
+    content text NOT NULL,
+    blocks json NOT NULL DEFAULT '[]'::json,
+    extracted_at timestamp without time zone
+);
+
+CREATE INDEX IF NOT EXISTS ix_document_text_video_id ON public.document_text USING btree (video_id);
+
+
+--
+-- Name: comment_reaction; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE IF NOT EXISTS public.comment_reaction (
+    id serial PRIMARY KEY,
+    comment_id integer NOT NULL REFERENCES public.comment(id) ON DELETE CASCADE,
+    reaction character varying(32) NOT NULL,
+    username character varying(120) NOT NULL,
+    created_at timestamp without time zone,
+    CONSTRAINT uq_comment_reaction UNIQUE (comment_id, reaction, username)
+);
+
+-- Backfill from the legacy comment.reactions JSON ({"👍": ["alice", ...]}, sometimes a bare
+-- username string). Safe to re-run; the column is no longer written and can be dropped afterwards.
+INSERT INTO public.comment_reaction (comment_id, reaction, username, created_at)
+SELECT c.id, r.key, u.username, now()
+FROM public.comment c
+CROSS JOIN LATERAL json_each(c.reactions) AS r
+CROSS JOIN LATERAL json_array_elements_text(
+    CASE WHEN json_typeof(r.value) = 'array' THEN r.value ELSE json_build_array(r.value) END
+) AS u(username)
+WHERE c.reactions IS NOT NULL AND json_typeof(c.reactions) = 'object' AND u.username IS NOT NULL
+ON CONFLICT ON CONSTRAINT uq_comment_reaction DO NOTHING;
+
+--
+-- Full-text search indexes for /search (expressions must match video_review.models.search_vector)
+--
+
+CREATE INDEX IF NOT EXISTS ix_comment_video_id ON public.comment USING btree (video_id);
+CREATE INDEX IF NOT EXISTS ix_comment_search ON public.comment USING gin (to_tsvector('english', comment));
+CREATE INDEX IF NOT EXISTS ix_slide_page_search ON public.slide_page USING gin (to_tsvector('english', content));
+
+--
+-- Name: asset; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE IF NOT EXISTS public.asset (
+    video_id character varying(120) NOT NULL PRIMARY KEY,
+    media_type character varying(20),
+    s3_key character varying(512),
+    comment_count integer NOT NULL DEFAULT 0,
+    review_status character varying(20),
+    reviewed_at timestamp without time zone,
+    created_at timestamp without time zone,
+    last_activity_at timestamp without time zone NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_asset_activity ON public.asset USING btree (last_activity_at, video_id);
+CREATE INDEX IF NOT EXISTS ix_asset_type_activity ON public.asset USING btree (media_type, last_activity_at, video_id);
+
+-- Backfill the catalog from existing comments; safe to re-run (recounts every asset)
+INSERT INTO public.asset (video_id, comment_count, created_at, last_activity_at, review_status)
+SELECT video_id,
+       count(*),
+       min(created_at),
+       coalesce(max(created_at), now()),
+       CASE WHEN bool_or("user" = 'SILAS') THEN 'completed' END
+FROM public.comment
+GROUP BY video_id
+ON CONFLICT (video_id) DO UPDATE SET comment_count = EXCLUDED.comment_count;
+
+-- Frame sampling plan of the latest SILAS video review (see video_review/sampling.py)
+ALTER TABLE public.asset ADD COLUMN IF NOT EXISTS review_plan json;
+
+-- First document paragraph ([¶n], see numbered_blocks in video_review/documents.py) a SILAS chunk comment covers
+ALTER TABLE public.comment ADD COLUMN IF NOT EXISTS paragraph integer;
+
+--
+-- Name: review_batch; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE IF NOT EXISTS public.review_batch (
+    id serial PRIMARY KEY,
+    status character varying(20) NOT NULL DEFAULT 'rendering',
+    assets json NOT NULL DEFAULT '[]'::json,
+    parts json NOT NULL DEFAULT '[]'::json,
+    request_count integer NOT NULL DEFAULT 0,
+    comments_added integer NOT NULL DEFAULT 0,
+    failed_requests integer NOT NULL DEFAULT 0,
+    ingest_attempts integer NOT NULL DEFAULT 0,
+    error text,
+    created_at timestamp without time zone,
+    submitted_at timestamp without time zone,
+    completed_at timestamp without time zone
+);
+
+CREATE INDEX IF NOT EXISTS ix_review_batch_status ON public.review_batch USING btree (status);
+
+--
+-- Name: review_job; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE IF NOT EXISTS public.review_job (
+    id serial PRIMARY KEY,
+    video_id character varying(120) NOT NULL,
+    mode character varying(20) NOT NULL,
+    source_etag character varying(255),
+    instruction_hash character varying(64) NOT NULL,
+    dedupe_key character varying(64) NOT NULL,
+    status character varying(20) NOT NULL DEFAULT 'running',
+    comments_added integer NOT NULL DEFAULT 0,
+    error text,
+    created_at timestamp without time zone,
+    completed_at timestamp without time zone
+);
+
+-- One running or completed job per (video_id, source ETag, mode, instruction hash)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_review_job_active ON public.review_job USING btree (dedupe_key)
+    WHERE status IN ('running', 'completed');
+CREATE INDEX IF NOT EXISTS ix_review_job_video_id ON public.review_job USING btree (video_id);
@@ -0,0 +1,95 @@
+"""
+Video review backend.
+
+`create_app()` builds the Flask app from blueprints: auth, comments,
+search, assets, media/admin, SILAS, SILAS review jobs and batch review,
+notifications and export. It opens no connections and starts no threads,
+so gunicorn can call it once in the master with --preload. `warmup()` then imports the
+heavy media libraries and loads the AWS/OpenAI client machinery before the
+fork. Every worker starts with those pages already in memory
+(copy-on-write) instead of paying for them on its first SILAS request.
+"""
+import importlib
+import os
+import time
+
+from flask import Flask, Response, g, request
+from flask_cors import CORS
+
+from . import config
+from .extensions import db
+from .metrics import REQUEST_SECONDS, render_metrics
+
+# Imported lazily by the handlers that need them; warmup() loads them up front
+HEAVY_MODULES = ("numpy", "fitz", "PIL.Image", "moviepy.editor", "ffmpeg", "docx", "openai")
+
+
+def create_app():
+    app = Flask(__name__)
+    CORS(app, resources={r"/*": {"origins": "*"}})
+    app.config.update(config.flask_config())
+    os.makedirs(config.UPLOAD_FOLDER, exist_ok=True)
+    os.makedirs(config.EXPORT_FOLDER, exist_ok=True)
+
+    db.init_app(app)
+
+    @app.after_request
+    def after_request(response):
+        origin = request.headers.get("Origin")
+        if origin:
+            response.headers["Access-Control-Allow-Origin"] = origin
+        response.headers["Access-Control-Allow-Headers"] = "Content-Type,Authorization"
+        response.headers["Access-Control-Allow-Methods"] = "GET,POST,OPTIONS,PUT,DELETE,PATCH"
+        return response
+
+    # --- Metrics ---
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_latency(response):
+        started = g.pop("request_started", None)
+        if started is not None:
+            # Label by route template (not the raw path) so ids don't explode the series count
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            REQUEST_SECONDS.labels(route, request.method, response.status_code).observe(time.perf_counter() - started)
+        return response
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        body, content_type = render_metrics()
+        return Response(body, content_type=content_type)
+
+    from . import assets, auth, batch_review, comments, export, media, notifications, review_jobs, search, silas
+    for blueprint_module in (auth, comments, search, assets, media, silas, review_jobs, batch_review, notifications, export):
+        app.register_blueprint(blueprint_module.bp)
+
+    return app
+
+
+def warmup(app):
+    """Loads everything a first request would otherwise pay for. Safe to run before forking."""
+    from .clients import get_openai_client, get_s3_client, get_ses_client
+
+    started = time.perf_counter()
+    for name in HEAVY_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"[⚠️] Warmup could not import {name}: {e}")
+
+    from docx import Document
+    Document()  # parses python-docx's bundled default template
+
+    # Building the clients loads botocore's service models and the OpenAI SDK.
+    # Workers drop these instances after fork (reset_clients) and rebuild them cheaply.
+    try:
+        get_s3_client()
+        get_ses_client()
+        get_openai_client()
+    except Exception as e:
+        print(f"[⚠️] Warmup could not build API clients: {e}")
+
+    app.jinja_env.get_template("admin_instructions.html")
+    print(f"[🔥] Warmed up in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,110 @@
+import os
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+
+from .extensions import db, dialect_insert
+from .models import Asset
+
+bp = Blueprint("assets", __name__)
+
+ASSET_PAGE_SIZE = 50
+ASSET_MAX_PAGE_SIZE = 200
+# Files uploaded outside a category folder are typed by extension
+EXTENSION_MEDIA_TYPES = {
+    ".mp4": "videos", ".mov": "videos", ".webm": "videos",
+    ".pdf": "storyboards",
+    ".docx": "documents",
+    ".mp3": "voiceovers", ".wav": "voiceovers", ".m4a": "voiceovers",
+}
+
+
+def asset_id_for_key(s3_key):
+    """(video_id, media_type) for an uploaded S3 key, matching how the frontend names assets."""
+    folder, _, filename = s3_key.rpartition("/")
+    video_id, ext = os.path.splitext(filename)
+    media_type = folder.split("/")[-1] if folder else EXTENSION_MEDIA_TYPES.get(ext.lower())
+    return video_id, media_type
+
+
+def record_asset(video_id, comments=0, **fields):
+    """
+    Creates or updates the catalog row for video_id in the current transaction;
+    the caller commits along with the write that caused it. comments is added to
+    comment_count in SQL, so concurrent writers never overwrite each other's counts.
+    """
+    if not video_id:
+        return
+    now = datetime.utcnow()
+    values = {k: v for k, v in fields.items() if v is not None}
+    values["last_activity_at"] = now
+    updates = dict(values)
+    if comments:
+        updates["comment_count"] = Asset.comment_count + comments
+    stmt = dialect_insert(Asset).values(
+        video_id=video_id, comment_count=max(comments, 0), created_at=now, **values
+    ).on_conflict_do_update(index_elements=[Asset.video_id], set_=updates)
+    db.session.execute(stmt)
+
+
+def record_upload(s3_key):
+    video_id, media_type = asset_id_for_key(s3_key)
+    record_asset(video_id, media_type=media_type, s3_key=s3_key)
+    db.session.commit()
+
+
+def record_review(video_id, status, media_type=None):
+    """Sets the SILAS review status (running, completed, failed) and commits."""
+    reviewed_at = datetime.utcnow() if status == "completed" else None
+    record_asset(video_id, review_status=status, media_type=media_type, reviewed_at=reviewed_at)
+    db.session.commit()
+
+
+def asset_json(asset):
+    return {
+        "video_id": asset.video_id,
+        "media_type": asset.media_type,
+        "s3_key": asset.s3_key,
+        "comment_count": asset.comment_count,
+        "review_status": asset.review_status,
+        "reviewed_at": asset.reviewed_at.isoformat() if asset.reviewed_at else None,
+        "created_at": asset.created_at.isoformat() if asset.created_at else None,
+        "last_activity_at": asset.last_activity_at.isoformat(),
+    }
+
+
+# --- Asset catalog listing for the dashboard ---
+@bp.route('/assets', methods=['GET'])
+def list_assets():
+    try:
+        page = max(1, int(request.args.get("page", 1)))
+        per_page = min(ASSET_MAX_PAGE_SIZE, max(1, int(request.args.get("per_page", ASSET_PAGE_SIZE))))
+    except ValueError as e:
+        return jsonify({"error": f"Invalid parameter: {e}"}), 400
+
+    query = Asset.query
+    if request.args.get("media_type"):
+        query = query.filter(Asset.media_type == request.args["media_type"])
+    if request.args.get("review_status"):
+        query = query.filter(Asset.review_status == request.args["review_status"])
+    # Newest activity first; served from the (media_type,) last_activity_at indexes
+    rows = (
+        query.order_by(Asset.last_activity_at.desc(), Asset.video_id.desc())
+        .limit(per_page + 1)
+        .offset((page - 1) * per_page)
+        .all()
+    )
+
+    return jsonify({
+        "page": page,
+        "per_page": per_page,
+        "has_more": len(rows) > per_page,
+        "assets": [asset_json(a) for a in rows[:per_page]],
+    })
+
+
+# --- Single asset, including the latest video review's frame sampling plan ---
+@bp.route('/assets/<video_id>', methods=['GET'])
+def get_asset(video_id):
+    asset = Asset.query.get_or_404(video_id)
+    return jsonify({**asset_json(asset), "review_plan": asset.review_plan})
@@ -0,0 +1,32 @@
+import secrets
+
+from flask import Blueprint, jsonify, request
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from .extensions import db
+from .models import User
+
+bp = Blueprint("auth", __name__)
+
+
+# User registration route
+@bp.route('/register', methods=['POST'])
+def register():
+    data = request.json
+    if User.query.filter_by(username=data['username']).first():
+        return jsonify({'error': 'Username already exists'}), 400
+    hashed_pw = generate_password_hash(data['password'])
+    token = secrets.token_hex(32)
+    user = User(username=data['username'], password_hash=hashed_pw, token=token)
+    db.session.add(user)
+    db.session.commit()
+    return jsonify({'status': 'registered', 'token': token, 'username': user.username})
+
+# User login route
+@bp.route('/login', methods=['POST'])
+def login():
+    data = request.json
+    user = User.query.filter_by(username=data['username']).first()
+    if not user or not check_password_hash(user.password_hash, data['password']):
+        return jsonify({'error': 'Invalid credentials'}), 401
+    return jsonify({'token': user.token, 'username': user.username})
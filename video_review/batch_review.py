@@ -0,0 +1,463 @@
+"""
+Bulk SILAS review through the OpenAI Batch API.
+
+Onboarding a client with a backlog of storyboards and videos used to mean
+one interactive review per asset. POST /silas/batch_review instead renders
+every storyboard page and every planned video frame for a list of assets.
+It writes one chat completion request per page/frame to JSONL batch files
+and submits them with a 24h completion window. Batches run at half the
+per-token price and outside our interactive rate limits. A poller in each
+worker checks submitted batches. When OpenAI finishes, it ingests the
+results as the same SILAS comments the interactive reviews write. Ingest
+runs in one transaction, so a failed ingest leaves nothing behind. The
+batch goes back to "submitted" for the next poll, up to
+BATCH_INGEST_MAX_ATTEMPTS times. A batch still "rendering" after
+BATCH_RENDER_TIMEOUT is assumed lost with its worker and marked failed.
+"""
+import base64
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import update
+
+from .assets import record_asset, record_review
+from .clients import get_openai_client
+from .config import S3_BUCKET
+from .extensions import db
+from .metrics import DB_WRITES, IMAGE_BYTES_SENT, PIPELINE_RUNS, TOKENS_USED, stage
+from .models import Comment, ReviewBatch, SlidePage
+from .offload import run_pdf
+from .sampling import FrameBudget, plan_review_frames, transcript_segments
+from .silas import (
+    get_instruction,
+    pdf_page_count,
+    render_pdf_page,
+    storyboard_page_prompt,
+    transcribe_video,
+    video_frame_prompt,
+)
+from .storage import load_media, scratch
+from .thumbnails import extract_review_frames, publish_timeline, render_timeline
+
+bp = Blueprint("batch_review", __name__)
+
+BATCH_POLL_SECONDS = float(os.getenv("BATCH_POLL_SECONDS", 60))
+BATCH_RENDER_TIMEOUT = int(os.getenv("BATCH_RENDER_TIMEOUT", 6 * 3600))
+BATCH_MAX_REQUESTS = 50000  # OpenAI limit per batch input file
+BATCH_MAX_BYTES = 190 * 1024 * 1024  # kept under the 200MB input file limit
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_FINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+BATCH_INGEST_MAX_ATTEMPTS = int(os.getenv("BATCH_INGEST_MAX_ATTEMPTS", 5))
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".webm", ".m4v")
+
+batch_wakeup = threading.Event()
+batch_poller_lock = threading.Lock()
+batch_poller_started = False
+
+
+class BatchFileWriter:
+    """Writes request lines to JSONL files, starting a new file before a batch limit would be passed."""
+
+    def __init__(self, work_dir):
+        self.work_dir = work_dir
+        self.files = []  # [[path, request_count]]
+        self._file = None
+        self._bytes = 0
+
+    def add(self, custom_id, messages, max_tokens):
+        line = json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {"model": "gpt-4o", "messages": messages, "max_tokens": max_tokens},
+        }).encode() + b"\n"
+        if self._file is None or self.files[-1][1] >= BATCH_MAX_REQUESTS or self._bytes + len(line) > BATCH_MAX_BYTES:
+            self.close()
+            path = os.path.join(self.work_dir, f"batch_{len(self.files) + 1:03d}.jsonl")
+            self._file = open(path, "wb")
+            self._bytes = 0
+            self.files.append([path, 0])
+        self._file.write(line)
+        self._bytes += len(line)
+        self.files[-1][1] += 1
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def asset_kind(file_url):
+    path = file_url.lower().split("?")[0]
+    if path.endswith(".pdf"):
+        return "storyboard"
+    if path.endswith(VIDEO_EXTENSIONS):
+        return "video"
+    return None
+
+
+def render_storyboard(writer, index, asset, instruction, pipeline):
+    """Adds one request per storyboard page and saves the page text; returns the request count."""
+    with stage(pipeline, "download"):
+        pdf_path = load_media(asset["file_url"], pipeline=pipeline)
+    if not pdf_path:
+        raise RuntimeError("Failed to download PDF")
+
+    page_count = run_pdf(pdf_page_count, pdf_path)
+    for page_num in range(page_count):
+        with stage(pipeline, "render"):
+            page_text, img_b64 = run_pdf(render_pdf_page, pdf_path, page_num)
+        writer.add(f"{index}/page/{page_num + 1}", [
+            {"role": "system", "content": instruction},
+            {"role": "user", "content": storyboard_page_prompt(page_num + 1, img_b64)},
+        ], max_tokens=1000)
+        IMAGE_BYTES_SENT.labels(pipeline).inc(len(img_b64))
+
+        existing_page = SlidePage.query.filter_by(video_id=asset["video_id"], page_number=page_num + 1).first()
+        if existing_page:
+            existing_page.content = page_text
+        else:
+            db.session.add(SlidePage(video_id=asset["video_id"], page_number=page_num + 1, content=page_text))
+    db.session.commit()
+    return page_count
+
+
+def render_video(writer, index, asset, instruction, budget, client, pipeline):
+    """Adds one request per planned review frame; returns the request count."""
+    video_id = asset["video_id"]
+    # Frames only need to live until they are inside the batch file
+    with scratch.job(f"silas_batch_{video_id}") as work_dir:
+        with stage(pipeline, "download"):
+            video_path = load_media(asset["file_url"], pipeline=pipeline, work_dir=work_dir)
+        if not video_path:
+            raise RuntimeError("Failed to download video")
+
+        # Whisper isn't available through the Batch API, so narration is still transcribed inline
+        transcript = transcribe_video(client, video_path, work_dir, pipeline)
+        with stage(pipeline, "frames"):
+            timeline = render_timeline(video_path, work_dir)
+        try:
+            with stage(pipeline, "thumbnails_publish"):
+                publish_timeline(video_id, timeline, S3_BUCKET)
+        except Exception as thumb_err:
+            print(f"[⚠️] Failed to publish thumbnails for {video_id}: {thumb_err}")
+
+        with stage(pipeline, "plan"):
+            plan = plan_review_frames(timeline, transcript_segments(transcript, timeline.duration), budget)
+        with stage(pipeline, "frame_extract"):
+            extract_review_frames(video_path, plan.frames, work_dir)
+        record_asset(video_id, review_plan=plan.summary())
+        db.session.commit()
+
+        for frame in plan.frames:
+            with open(frame.path, "rb") as img_file:
+                img_b64 = base64.b64encode(img_file.read()).decode("utf-8")
+            writer.add(f"{index}/frame/{frame.timestamp:g}", [
+                {"role": "system", "content": instruction},
+                {"role": "user", "content": video_frame_prompt(frame, img_b64)},
+            ], max_tokens=500)
+            IMAGE_BYTES_SENT.labels(pipeline).inc(len(img_b64))
+        return len(plan.frames)
+
+
+def render_and_submit(app, batch_id, budget):
+    pipeline = "batch_review"
+    with app.app_context():
+        work_dir = None
+        try:
+            work_dir = scratch.open(f"batch_{batch_id}")
+            client = get_openai_client()
+            instructions = {"storyboard": get_instruction("pdf"), "video": get_instruction("video")}
+            assets = [dict(a) for a in ReviewBatch.query.get(batch_id).assets]
+            writer = BatchFileWriter(work_dir)
+
+            for index, asset in enumerate(assets):
+                try:
+                    record_review(asset["video_id"], "running", asset.get("media_type"))
+                    if asset["kind"] == "storyboard":
+                        requests = render_storyboard(writer, index, asset, instructions["storyboard"], pipeline)
+                    else:
+                        requests = render_video(writer, index, asset, instructions["video"], budget, client, pipeline)
+                    asset.update(status="rendered", requests=requests)
+                    print(f"[🖼️] Batch review {batch_id}: {requests} requests for {asset['video_id']}")
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[❌] Batch review {batch_id}: failed to render {asset['video_id']}: {e}")
+                    asset.update(status="failed", error=str(e)[:500])
+                    record_review(asset["video_id"], "failed")
+            writer.close()
+            if ReviewBatch.query.get(batch_id).status != "rendering":
+                print(f"[⚠️] Batch review {batch_id} was reclaimed while rendering; not submitting")
+                return
+            db.session.close()  # no pooled connection held across the uploads
+
+            parts = []
+            for path, count in writer.files:
+                with stage(pipeline, "submit"), open(path, "rb") as f:
+                    upload = client.files.create(file=f, purpose="batch")
+                    batch = client.batches.create(
+                        input_file_id=upload.id,
+                        endpoint="/v1/chat/completions",
+                        completion_window=BATCH_COMPLETION_WINDOW,
+                        metadata={"review_batch": str(batch_id)},
+                    )
+                parts.append({"batch_id": batch.id, "input_file_id": upload.id, "requests": count, "status": batch.status})
+
+            job = ReviewBatch.query.get(batch_id)
+            job.assets = assets
+            job.parts = parts
+            job.request_count = sum(p["requests"] for p in parts)
+            job.status = "submitted" if parts else "failed"
+            job.error = None if parts else "Nothing to review"
+            job.submitted_at = datetime.utcnow()
+            db.session.commit()
+            print(f"[📦] Batch review {batch_id}: submitted {job.request_count} requests in {len(parts)} batch file(s)")
+            batch_wakeup.set()
+        except Exception as e:
+            db.session.rollback()
+            PIPELINE_RUNS.labels(pipeline, "error").inc()
+            print(f"[❌] Batch review {batch_id} failed:", e)
+            job = ReviewBatch.query.get(batch_id)
+            job.status = "failed"
+            job.error = str(e)[:1000]
+            db.session.commit()
+        finally:
+            scratch.close(work_dir)
+
+
+def result_comment(assets, result, pipeline):
+    """The SILAS comment for one batch output line, or None if that request failed."""
+    index, kind, position = result["custom_id"].split("/")
+    asset = assets[int(index)]
+    response = result.get("response") or {}
+    if response.get("status_code") != 200:
+        return None
+    body = response["body"]
+    usage = body.get("usage") or {}
+    TOKENS_USED.labels(pipeline, "prompt").inc(usage.get("prompt_tokens") or 0)
+    TOKENS_USED.labels(pipeline, "completion").inc(usage.get("completion_tokens") or 0)
+    reply = body["choices"][0]["message"]["content"].strip()
+
+    if kind == "page":
+        page_number = int(position)
+        return Comment(
+            video_id=asset["video_id"],
+            page=page_number,
+            timestamp="0",
+            comment=f"Slide {page_number}: {reply.replace('**', '')}\n\n-- SILAS (Vision Review)",
+            user="SILAS"
+        )
+    return Comment(
+        video_id=asset["video_id"],
+        timestamp=str(int(float(position))),
+        comment=reply + "\n\n-- SILAS (Video Review)",
+        user="SILAS"
+    )
+
+
+def ingest_batch(batch_id, client):
+    pipeline = "batch_review"
+    job = ReviewBatch.query.get(batch_id)
+    assets = [dict(a) for a in job.assets]
+    added = {}
+
+    with stage(pipeline, "ingest"):
+        for part in job.parts:
+            if not part.get("output_file_id"):
+                continue
+            output = client.files.content(part["output_file_id"]).text
+            for line in output.splitlines():
+                if not line.strip():
+                    continue
+                comment = result_comment(assets, json.loads(line), pipeline)
+                if comment is not None:
+                    db.session.add(comment)
+                    added[comment.video_id] = added.get(comment.video_id, 0) + 1
+
+        for asset in assets:
+            count = added.get(asset["video_id"], 0)
+            if asset["status"] == "rendered":
+                asset["status"] = "completed" if count else "failed"
+                asset["comments_added"] = count
+            if count:
+                record_asset(asset["video_id"], comments=count)
+
+        job.assets = assets
+        job.comments_added = sum(added.values())
+        # Requests with no output line (errors, or an expired batch) count as failed
+        job.failed_requests = job.request_count - job.comments_added
+        job.status = "completed"
+        job.error = None  # from an earlier failed ingest attempt
+        job.completed_at = datetime.utcnow()
+        db.session.commit()
+    DB_WRITES.labels(pipeline).inc(job.comments_added)
+    PIPELINE_RUNS.labels(pipeline, "ok").inc()
+
+    for asset in assets:
+        if asset["status"] in ("completed", "failed") and asset.get("requests"):
+            record_review(asset["video_id"], asset["status"])
+    print(f"[📦] Batch review {batch_id}: ingested {job.comments_added} comments, {job.failed_requests} failed requests")
+
+
+def refresh_batch(job, client):
+    """Updates each part's OpenAI status; once every part has finished, ingests the results."""
+    parts = [dict(p) for p in job.parts]
+    for part in parts:
+        if part["status"] in BATCH_FINAL_STATES:
+            continue
+        batch = client.batches.retrieve(part["batch_id"])
+        part.update(status=batch.status, output_file_id=batch.output_file_id, error_file_id=batch.error_file_id)
+    job.parts = parts
+    db.session.commit()
+
+    if all(p["status"] in BATCH_FINAL_STATES for p in parts):
+        # Only one worker gets to move the job out of "submitted", so results are ingested once
+        claimed = db.session.execute(
+            update(ReviewBatch)
+            .where(ReviewBatch.id == job.id, ReviewBatch.status == "submitted")
+            .values(status="ingesting")
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            try:
+                ingest_batch(job.id, client)
+            except Exception as e:
+                db.session.rollback()
+                PIPELINE_RUNS.labels("batch_review", "error").inc()
+                attempts = job.ingest_attempts + 1
+                retry = attempts < BATCH_INGEST_MAX_ATTEMPTS
+                print(f"[❌] Batch review {job.id}: ingest attempt {attempts} failed"
+                      f"{', will retry' if retry else ''}:", e)
+                # Back to "submitted" so the next poll claims it again; the output files stay available
+                db.session.execute(
+                    update(ReviewBatch).where(ReviewBatch.id == job.id).values(
+                        status="submitted" if retry else "failed", ingest_attempts=attempts, error=str(e)[:1000]
+                    )
+                )
+                db.session.commit()
+
+
+def reclaim_stale_batches():
+    """Fails batches whose render thread died with its worker, along with their assets' reviews."""
+    cutoff = datetime.utcnow() - timedelta(seconds=BATCH_RENDER_TIMEOUT)
+    stale = ReviewBatch.query.filter(ReviewBatch.status == "rendering", ReviewBatch.created_at < cutoff).all()
+    for job in stale:
+        # Conditional, so only one worker's poller reclaims each batch
+        claimed = db.session.execute(
+            update(ReviewBatch)
+            .where(ReviewBatch.id == job.id, ReviewBatch.status == "rendering")
+            .values(status="failed", error="Timed out while rendering", completed_at=datetime.utcnow())
+        ).rowcount
+        if claimed:
+            print(f"[⚠️] Batch review {job.id} timed out while rendering; marking it failed")
+            for asset in job.assets:
+                record_review(asset["video_id"], "failed")
+        db.session.commit()
+    return len(stale)
+
+
+def poll_batches_once():
+    reclaim_stale_batches()
+    jobs = ReviewBatch.query.filter_by(status="submitted").order_by(ReviewBatch.id).all()
+    if not jobs:
+        return 0
+    client = get_openai_client()
+    for job in jobs:
+        try:
+            refresh_batch(job, client)
+        except Exception as e:
+            db.session.rollback()
+            print(f"[⚠️] Batch review {job.id}: status check failed: {e}")
+    return len(jobs)
+
+
+def run_batch_poller(app):
+    while True:
+        with app.app_context():
+            try:
+                poll_batches_once()
+            except Exception as e:
+                db.session.rollback()
+                print("[❌] Batch review poller error:", e)
+        batch_wakeup.wait(BATCH_POLL_SECONDS)
+        batch_wakeup.clear()
+
+
+def start_batch_poller(app):
+    global batch_poller_started
+    with batch_poller_lock:
+        if not batch_poller_started:
+            threading.Thread(target=run_batch_poller, args=(app,), name="batch-review-poller", daemon=True).start()
+            batch_poller_started = True
+
+
+# Started on the first request, so it runs in each worker rather than in a preloading master
+@bp.before_app_request
+def ensure_batch_poller():
+    if not batch_poller_started:
+        start_batch_poller(current_app._get_current_object())
+
+
+def batch_json(job):
+    return {
+        "batch_id": job.id,
+        "status": job.status,
+        "assets": job.assets,
+        "parts": job.parts,
+        "request_count": job.request_count,
+        "comments_added": job.comments_added,
+        "failed_requests": job.failed_requests,
+        "ingest_attempts": job.ingest_attempts,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "submitted_at": job.submitted_at.isoformat() if job.submitted_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+    }
+
+
+# --- SILAS Bulk Review Endpoints ---
+@bp.route('/silas/batch_review', methods=['POST'])
+def start_batch_review():
+    data = request.json or {}
+    items = data.get("assets") or []
+    if not items:
+        return jsonify({"error": "Missing assets"}), 400
+    try:
+        budget = FrameBudget.from_request(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid budget: {e}"}), 400
+
+    assets, unsupported = [], []
+    for item in items:
+        if not item.get("file_url") or not item.get("video_id"):
+            return jsonify({"error": "Each asset needs file_url and video_id"}), 400
+        kind = asset_kind(item["file_url"])
+        if not kind:
+            unsupported.append(item["video_id"])
+            continue
+        assets.append({
+            "video_id": item["video_id"],
+            "file_url": item["file_url"],
+            "media_type": item.get("media_type"),
+            "kind": kind,
+            "status": "pending",
+        })
+    if unsupported:
+        return jsonify({"error": "Only storyboard PDFs and videos can be batch reviewed", "unsupported": unsupported}), 400
+
+    job = ReviewBatch(assets=assets, status="rendering")
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    threading.Thread(target=render_and_submit, args=(app, job.id, budget)).start()
+    return jsonify({"status": "SILAS batch review started", "batch_id": job.id, "assets": len(assets), "budget": budget.to_dict()}), 202
+
+
+@bp.route('/silas/batch_review/<int:batch_id>', methods=['GET'])
+def get_batch_review(batch_id):
+    # Status only: checking OpenAI and ingesting are left to the poller
+    return jsonify(batch_json(ReviewBatch.query.get_or_404(batch_id)))
@@ -0,0 +1,118 @@
+"""
+Shared, connection-pooled clients for S3, SES, OpenAI and plain HTTP.
+
+Each client is built once per process on first use and then reused by every
+route and background thread, so we stop paying client construction and TLS
+handshakes on each call. boto3 clients, the OpenAI client and a requests
+Session with a mounted adapter are all safe to share between threads.
+"""
+import os
+import threading
+
+import boto3
+import httpx
+import requests
+from botocore.config import Config
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")  # only set for local stand-ins
+
+POOL_SIZE = int(os.getenv("CLIENT_POOL_SIZE", 32))
+CONNECT_TIMEOUT = float(os.getenv("CLIENT_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.getenv("CLIENT_READ_TIMEOUT", 60))
+KEEPALIVE_EXPIRY = float(os.getenv("CLIENT_KEEPALIVE_EXPIRY", 60))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", 120))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", 2))
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def _get_or_create(name, factory):
+    client = _clients.get(name)
+    if client is None:
+        with _lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = factory()
+    return client
+
+
+def _aws_config():
+    return Config(
+        max_pool_connections=POOL_SIZE,
+        connect_timeout=CONNECT_TIMEOUT,
+        read_timeout=READ_TIMEOUT,
+        tcp_keepalive=True,
+        retries={"mode": "standard", "max_attempts": 5},
+    )
+
+
+def get_s3_client():
+    return _get_or_create(
+        "s3",
+        lambda: boto3.client("s3", endpoint_url=S3_ENDPOINT_URL, config=_aws_config()),
+    )
+
+
+def get_ses_client():
+    return _get_or_create(
+        "ses",
+        lambda: boto3.client("ses", region_name=AWS_REGION, config=_aws_config()),
+    )
+
+
+def get_openai_client():
+    def build():
+        from openai import OpenAI
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=POOL_SIZE,
+                max_keepalive_connections=POOL_SIZE,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+        # base_url falls back to OPENAI_BASE_URL inside the SDK
+        return OpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            max_retries=OPENAI_MAX_RETRIES,
+            http_client=http_client,
+        )
+
+    return _get_or_create("openai", build)
+
+
+def get_http_session():
+    def build():
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=POOL_SIZE,
+            pool_maxsize=POOL_SIZE,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504),
+                              allowed_methods=("GET", "HEAD")),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    return _get_or_create("http", build)
+
+
+def http_get(url, **kwargs):
+    """GET through the shared session, with default timeouts (requests has no session-wide timeout)."""
+    kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+    return get_http_session().get(url, **kwargs)
+
+
+def http_head(url, **kwargs):
+    kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+    return get_http_session().head(url, **kwargs)
+
+
+def reset_clients():
+    """Drop every cached client, e.g. in a freshly forked worker so it doesn't inherit the parent's sockets."""
+    with _lock:
+        _clients.clear()
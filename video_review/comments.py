@@ -0,0 +1,300 @@
+import csv
+import io
+from datetime import datetime, timezone
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import delete, func, insert
+
+from .assets import record_asset
+from .extensions import db, dialect_insert
+from .models import Asset, Comment, CommentReaction, User
+from .notifications import enqueue_notification, mention_email, outbox_wakeup
+
+bp = Blueprint("comments", __name__)
+
+# Joins usernames inside the grouped reaction query; can't appear in a typed username
+USERNAME_SEPARATOR = "\x1f"
+BULK_MAX_ROWS = 10000
+
+
+def reactions_for(comment_ids):
+    """{comment_id: {reaction: [usernames]}} for the given comments, in one grouped query."""
+    if not comment_ids:
+        return {}
+    rows = (
+        db.session.query(
+            CommentReaction.comment_id,
+            CommentReaction.reaction,
+            func.aggregate_strings(CommentReaction.username, USERNAME_SEPARATOR),
+        )
+        .filter(CommentReaction.comment_id.in_(comment_ids))
+        .group_by(CommentReaction.comment_id, CommentReaction.reaction)
+        .all()
+    )
+    reactions = {}
+    for comment_id, reaction, usernames in rows:
+        reactions.setdefault(comment_id, {})[reaction] = usernames.split(USERNAME_SEPARATOR)
+    return reactions
+
+
+@bp.route('/comments', methods=['POST'])
+def add_comment():
+    data = request.json
+    token = request.headers.get('Authorization')
+    user = User.query.filter_by(token=token).first()
+    username = user.username if user else request.json.get("user", "Anonymous")
+
+    comment = Comment(
+        video_id=data['video_id'],
+        timestamp=data['timestamp'],
+        comment=data['comment'],
+        user=username,
+        page=data.get("page")
+    )
+    db.session.add(comment)
+
+    # Optional @mentions are queued in the same transaction as the comment
+    notify = data.get("notify") or {}
+    if notify.get("to"):
+        subject, body = mention_email(
+            data['video_id'], data.get("page"), data['comment'], username, notify.get("asset_url", "")
+        )
+        enqueue_notification("mention", notify["to"], subject, body, video_id=data['video_id'])
+
+    record_asset(data['video_id'], comments=1)
+    db.session.commit()
+    if notify.get("to"):
+        outbox_wakeup.set()
+    return jsonify({'status': 'success'})
+
+
+# --- Bulk comment import ---
+def bulk_rows():
+    """Rows from a JSON array ({"comments": [...]} also works) or a CSV upload / text/csv body."""
+    upload = request.files.get("file")
+    if upload or request.mimetype == "text/csv":
+        raw = upload.read() if upload else request.get_data()
+        # utf-8-sig drops the BOM Excel puts on exported CSVs
+        reader = csv.DictReader(io.StringIO(raw.decode("utf-8-sig")))
+        return [{(k or "").strip().lower(): v for k, v in row.items()} for row in reader]
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get("comments")
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of comments or a CSV file")
+    return data
+
+
+def whole_number(value, name):
+    """int from 3, "3" or a spreadsheet's "3.0"; raises ValueError for anything else."""
+    number, _, fraction = str(value).strip().partition(".")
+    if not number.isdigit() or len(number) > 9 or fraction.strip("0"):
+        raise ValueError(f"{name} must be a whole number below 1000000000")
+    return int(number)
+
+
+def bulk_comment_values(row, default_video_id, author=None):
+    """
+    Column values for one imported row; raises ValueError describing the
+    first problem. A row's own "user" is only used for anonymous imports;
+    an authenticated import is always attributed to its token's user.
+    """
+    if not isinstance(row, dict):
+        raise ValueError("Row must be an object")
+    video_id = str(row.get("video_id") or default_video_id or "").strip()
+    text = str(row.get("comment") or "").strip()
+    timestamp = str(row.get("timestamp") if row.get("timestamp") not in (None, "") else "0").strip()
+    user = author or str(row.get("user") or "Anonymous").strip()
+    if not video_id:
+        raise ValueError("Missing video_id")
+    if not text:
+        raise ValueError("Missing comment")
+    for name, value, limit in (("video_id", video_id, 120), ("timestamp", timestamp, 10), ("user", user, 120)):
+        if len(value) > limit:
+            raise ValueError(f"{name} is longer than {limit} characters")
+
+    values = {"video_id": video_id, "timestamp": timestamp, "comment": text, "user": user, "page": None,
+              "created_at": datetime.utcnow()}
+    if row.get("page") not in (None, ""):
+        values["page"] = whole_number(row["page"], "page")
+    if row.get("created_at"):
+        # Imports keep the original comment date when the source has one
+        created_at = datetime.fromisoformat(str(row["created_at"]).strip().replace("Z", "+00:00"))
+        if created_at.tzinfo:
+            # Stored naive in UTC, like every utcnow() default
+            created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+        values["created_at"] = created_at
+    return values
+
+
+@bp.route('/comments/bulk', methods=['POST'])
+def bulk_add_comments():
+    """
+    Imports many comments in one transaction. Rows carry video_id, comment
+    and optionally timestamp, page, user (honoured only without a token)
+    and created_at; ?video_id= fills in rows that have none. Invalid rows
+    are reported and skipped, or fail the whole import with
+    ?all_or_nothing=1. Results are per row, numbered from 1 in input order.
+    """
+    token = request.headers.get('Authorization')
+    user = User.query.filter_by(token=token).first() if token else None
+    author = user.username if user else None
+    all_or_nothing = request.args.get("all_or_nothing") in ("1", "true")
+
+    try:
+        rows = bulk_rows()
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return jsonify({"error": f"Could not read comments: {e}"}), 400
+    if not rows:
+        return jsonify({"error": "No comments to import"}), 400
+    if len(rows) > BULK_MAX_ROWS:
+        return jsonify({"error": f"At most {BULK_MAX_ROWS} comments per import"}), 400
+
+    results, valid = [], []
+    for number, row in enumerate(rows, 1):
+        try:
+            valid.append((number, bulk_comment_values(row, request.args.get("video_id"), author)))
+        except (TypeError, ValueError) as e:
+            results.append({"row": number, "status": "error", "error": str(e)})
+
+    if not valid or (results and all_or_nothing):
+        return jsonify({"created": 0, "failed": len(results), "results": results}), 400
+
+    # One multi-row INSERT ... RETURNING per batch of rows (insertmanyvalues), ids in input order
+    ids = db.session.execute(
+        insert(Comment).returning(Comment.id, sort_by_parameter_order=True),
+        [values for _, values in valid],
+    ).scalars().all()
+    counts = {}
+    for (number, values), comment_id in zip(valid, ids):
+        results.append({"row": number, "status": "created", "id": comment_id})
+        counts[values["video_id"]] = counts.get(values["video_id"], 0) + 1
+    for video_id, count in counts.items():
+        record_asset(video_id, comments=count)
+    db.session.commit()
+
+    results.sort(key=lambda r: r["row"])
+    return jsonify({"created": len(ids), "failed": len(rows) - len(ids), "results": results})
+
+@bp.route('/comments/<video_id>', methods=['GET', 'OPTIONS'])
+def get_comments(video_id):
+    comments = Comment.query.filter_by(video_id=video_id).order_by(Comment.timestamp).all()
+    reactions = reactions_for([c.id for c in comments])
+    return jsonify([
+        {
+            "id": c.id,
+            "timestamp": c.timestamp,
+            "comment": c.comment,
+            "user": c.user,
+            "created_at": c.created_at.isoformat(),
+            "reactions": reactions.get(c.id, {}),
+            "page": c.page,
+            "paragraph": c.paragraph,
+        }
+        for c in comments
+    ])
+
+# Route to get the video_ids that have comments, most recently active first (from the asset catalog)
+@bp.route('/comments/unique_video_ids', methods=['GET'])
+def get_unique_video_ids():
+    try:
+        results = (
+            db.session.query(Asset.video_id)
+            .filter(Asset.comment_count > 0)
+            .order_by(Asset.last_activity_at.desc())
+            .all()
+        )
+        unique_ids = [row[0] for row in results if row[0]]
+        return jsonify(unique_ids)
+    except Exception as e:
+        print("Error fetching unique video_ids:", e)
+        return jsonify([]), 500
+
+
+@bp.route("/comments", methods=["OPTIONS"])
+def comments_options():
+    response = jsonify({"status": "ok"})
+    origin = request.headers.get("Origin")
+    if origin:
+        response.headers["Access-Control-Allow-Origin"] = origin
+    response.headers["Access-Control-Allow-Headers"] = "Content-Type,Authorization"
+    response.headers["Access-Control-Allow-Methods"] = "GET,POST,OPTIONS,PUT,DELETE,PATCH"
+    return response
+
+
+@bp.route("/comments/<int:comment_id>", methods=["OPTIONS"])
+def comment_options(comment_id):
+    response = jsonify({"status": "ok"})
+    origin = request.headers.get("Origin")
+    if origin:
+        response.headers["Access-Control-Allow-Origin"] = origin
+    response.headers["Access-Control-Allow-Headers"] = "Content-Type,Authorization"
+    response.headers["Access-Control-Allow-Methods"] = "GET,POST,OPTIONS,PUT,DELETE,PATCH"
+    return response
+
+@bp.route('/comments/<int:comment_id>', methods=['PUT'])
+def update_comment(comment_id):
+    data = request.json
+    comment = Comment.query.get_or_404(comment_id)
+    comment.comment = data.get('comment', comment.comment)
+    record_asset(comment.video_id)
+    db.session.commit()
+    return jsonify({'status': 'updated', 'id': comment.id})
+
+
+# Route for updating comment reactions
+@bp.route("/comments/<int:comment_id>/reactions", methods=["OPTIONS"])
+def comment_reactions_options(comment_id):
+    response = jsonify({"status": "ok"})
+    origin = request.headers.get("Origin")
+    if origin:
+        response.headers["Access-Control-Allow-Origin"] = origin
+    response.headers["Access-Control-Allow-Headers"] = "Content-Type,Authorization"
+    response.headers["Access-Control-Allow-Methods"] = "GET,POST,OPTIONS,PUT,DELETE,PATCH"
+    return response
+
+@bp.route('/comments/<int:comment_id>/reactions', methods=['PATCH'])
+def update_reactions(comment_id):
+    data = request.json
+    token = request.headers.get('Authorization')
+    user = User.query.filter_by(token=token).first()
+    if not user:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    Comment.query.get_or_404(comment_id)
+
+    if not isinstance(data, (list, dict)):
+        return jsonify({'error': 'Expected a list of reactions'}), 400
+    max_length = CommentReaction.reaction.type.length
+    for reaction in data:
+        if not isinstance(reaction, str) or not reaction or len(reaction) > max_length:
+            return jsonify({'error': f'Each reaction must be a non-empty string of at most {max_length} characters'}), 400
+
+    # Each toggle touches only this user's row, so concurrent reactions never overwrite each other
+    for reaction in data:
+        removed = db.session.execute(
+            delete(CommentReaction).where(
+                CommentReaction.comment_id == comment_id,
+                CommentReaction.reaction == reaction,
+                CommentReaction.username == user.username,
+            )
+        ).rowcount
+        if not removed:
+            db.session.execute(
+                dialect_insert(CommentReaction).on_conflict_do_nothing(),
+                {"comment_id": comment_id, "reaction": reaction, "username": user.username},
+            )
+
+    db.session.commit()
+    reactions = reactions_for([comment_id]).get(comment_id, {})
+    return jsonify({'status': 'reaction toggled', 'id': comment_id, 'reactions': reactions})
+
+# DELETE route for deleting a comment
+@bp.route('/comments/<int:comment_id>', methods=['DELETE'])
+def delete_comment(comment_id):
+    comment = Comment.query.get_or_404(comment_id)
+    CommentReaction.query.filter_by(comment_id=comment_id).delete()
+    record_asset(comment.video_id, comments=-1)
+    db.session.delete(comment)
+    db.session.commit()
+    return jsonify({'status': 'deleted', 'id': comment_id})
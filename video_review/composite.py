@@ -0,0 +1,149 @@
+"""
+Multi-frame prompts for SILAS video review.
+
+Each planned frame used to be a separate GPT-4o call that resent the full
+video review instruction. On a long film the repeated system prompt and
+the per-call round trip cost more than the frames themselves. With
+frames_per_call > 1, consecutive planned frames are reviewed together in
+one call, each with its own narration. The frames go either as separate
+images ("images") or tiled into one labelled contact sheet ("grid"). The
+grid uses fewer image tokens but shows less detail per frame. The model
+answers with a JSON object holding one entry per frame, and
+split_composite_reply() turns that back into per-timestamp comments.
+"""
+import base64
+import io
+import json
+import math
+import os
+from dataclasses import dataclass
+
+SILAS_FRAMES_PER_CALL = int(os.getenv("SILAS_FRAMES_PER_CALL", 1))  # 1 = one call per frame
+SILAS_COMPOSITE_LAYOUT = os.getenv("SILAS_COMPOSITE_LAYOUT", "images")
+COMPOSITE_LAYOUTS = ("images", "grid")
+MAX_FRAMES_PER_CALL = 10
+TOKENS_PER_FRAME = 500  # same completion allowance as a single-frame call
+MAX_COMPLETION_TOKENS = 4096
+CONTACT_SHEET_TILE_WIDTH = 640
+CONTACT_SHEET_LABEL_SIZE = 28
+
+
+@dataclass
+class FrameGrouping:
+    frames_per_call: int = SILAS_FRAMES_PER_CALL
+    layout: str = SILAS_COMPOSITE_LAYOUT
+
+    @classmethod
+    def from_request(cls, data):
+        """Reads optional frames_per_call / composite overrides; raises ValueError on bad values."""
+        grouping = cls(
+            frames_per_call=int(data.get("frames_per_call") or SILAS_FRAMES_PER_CALL),
+            layout=data.get("composite") or SILAS_COMPOSITE_LAYOUT,
+        )
+        if not 1 <= grouping.frames_per_call <= MAX_FRAMES_PER_CALL:
+            raise ValueError(f"frames_per_call must be between 1 and {MAX_FRAMES_PER_CALL}")
+        if grouping.layout not in COMPOSITE_LAYOUTS:
+            raise ValueError(f"composite must be one of {', '.join(COMPOSITE_LAYOUTS)}")
+        return grouping
+
+    def to_dict(self):
+        return {"frames_per_call": self.frames_per_call, "composite": self.layout}
+
+
+def group_frames(frames, size):
+    """Consecutive runs of at most size planned frames."""
+    return [frames[i:i + size] for i in range(0, len(frames), size)]
+
+
+def frame_label(n):
+    return f"F{n}"
+
+
+def contact_sheet(paths):
+    """JPEG bytes with the frames tiled left to right, top to bottom, each labelled F1, F2, … in its corner."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    tiles = []
+    for path in paths:
+        with Image.open(path) as img:
+            img.draft("RGB", (CONTACT_SHEET_TILE_WIDTH, CONTACT_SHEET_TILE_WIDTH))
+            tile = img.convert("RGB")
+        tile.thumbnail((CONTACT_SHEET_TILE_WIDTH, CONTACT_SHEET_TILE_WIDTH * 2))
+        tiles.append(tile)
+
+    columns = math.ceil(math.sqrt(len(tiles)))
+    rows = math.ceil(len(tiles) / columns)
+    tile_w, tile_h = max(t.width for t in tiles), max(t.height for t in tiles)
+    sheet = Image.new("RGB", (columns * tile_w, rows * tile_h), "black")
+    draw = ImageDraw.Draw(sheet)
+    font = ImageFont.load_default(size=CONTACT_SHEET_LABEL_SIZE)
+    for n, tile in enumerate(tiles):
+        x, y = (n % columns) * tile_w, (n // columns) * tile_h
+        sheet.paste(tile, (x, y))
+        left, top, right, bottom = draw.textbbox((x + 8, y + 6), frame_label(n + 1), font=font)
+        draw.rectangle((left - 6, top - 4, right + 6, bottom + 4), fill="black")
+        draw.text((x + 8, y + 6), frame_label(n + 1), fill="white", font=font)
+
+    buffer = io.BytesIO()
+    sheet.save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def composite_prompt(group, layout):
+    """(user message content, base64 bytes sent) for a run of consecutive planned frames."""
+    lines = [f"These are {len(group)} consecutive frames from the video, in order. "
+             "Please apply the SILAS video review guidelines to each frame separately."]
+    if layout == "grid":
+        lines.append("They are tiled into one contact sheet, left to right and top to bottom, "
+                     "each labelled in its top-left corner.")
+    for n, frame in enumerate(group, 1):
+        lines.append(f"Frame {n} ({frame_label(n)}) at {int(frame.timestamp)}s. The narration around this moment "
+                     f"({int(frame.start)}s–{int(frame.end)}s) was:\n“{frame.narration}”")
+    lines.append('Reply with a JSON object of the form {"frames": [{"frame": 1, "feedback": "..."}]}, '
+                 "with one entry per frame, in order.")
+    content = [{"type": "text", "text": "\n\n".join(lines)}]
+
+    if layout == "grid":
+        images = [contact_sheet([frame.path for frame in group])]
+    else:
+        images = []
+        for frame in group:
+            with open(frame.path, "rb") as img_file:
+                images.append(img_file.read())
+    sent = 0
+    for image in images:
+        img_b64 = base64.b64encode(image).decode("utf-8")
+        sent += len(img_b64)
+        content.append({"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{img_b64}"}})
+    return content, sent
+
+
+def composite_max_tokens(group):
+    return min(MAX_COMPLETION_TOKENS, TOKENS_PER_FRAME * len(group))
+
+
+def split_composite_reply(reply, group):
+    """[(frame, feedback)] from a composite JSON reply; frames the model skipped get no comment."""
+    text = reply.strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        entries = json.loads(text).get("frames") or []
+    except (ValueError, AttributeError):
+        entries = []
+
+    feedback = {}
+    for position, entry in enumerate(entries):
+        if not isinstance(entry, dict) or not str(entry.get("feedback") or "").strip():
+            continue
+        try:
+            n = int(entry.get("frame") or position + 1)
+        except (TypeError, ValueError):
+            n = position + 1
+        if 1 <= n <= len(group):
+            feedback.setdefault(n, str(entry["feedback"]).strip())
+
+    if not feedback and text:
+        # Unstructured answer: keep it on the first frame rather than throw away a paid call
+        return [(group[0], reply.strip())]
+    return [(group[n - 1], feedback[n]) for n in sorted(feedback)]
@@ -0,0 +1,44 @@
+import os
+import tempfile
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+load_dotenv(dotenv_path=ROOT_DIR / ".env")
+
+# PostgreSQL connection string placeholder (update before deployment)
+DATABASE_URL = os.environ.get("DATABASE_URL", "postgresql://paulminton@localhost:5432/video_review")
+MAX_CONTENT_LENGTH = 500 * 1024 * 1024  # Allow uploads up to 500MB
+
+UPLOAD_FOLDER = str(ROOT_DIR / "uploads")
+EXPORT_FOLDER = os.path.join(os.getcwd(), 'exports')
+
+S3_BUCKET = 'naveon-video-storage'
+S3_REGION = 'us-east-1'  # change if your bucket is in a different region
+
+MEDIA_CACHE_DIR = os.getenv("MEDIA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "video-review-media"))
+MEDIA_CACHE_MAX_BYTES = int(os.getenv("MEDIA_CACHE_MAX_BYTES", 5 * 1024 * 1024 * 1024))
+SCRATCH_DIR = os.getenv("SCRATCH_DIR", os.path.join(tempfile.gettempdir(), "video-review-scratch"))
+SCRATCH_MAX_BYTES = int(os.getenv("SCRATCH_MAX_BYTES", 10 * 1024 * 1024 * 1024))  # job workspaces + media cache
+SCRATCH_MAX_AGE = int(os.getenv("SCRATCH_MAX_AGE", 6 * 3600))
+MEDIA_MAX_AGE = int(os.getenv("MEDIA_MAX_AGE", 3600))
+MEDIA_PREFIXES = ("videos/", "storyboards/", "voiceovers/", "documents/", "thumbnails/")
+
+
+def flask_config():
+    config = {
+        "SQLALCHEMY_DATABASE_URI": DATABASE_URL,
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+        "MAX_CONTENT_LENGTH": MAX_CONTENT_LENGTH,
+        "UPLOAD_FOLDER": UPLOAD_FOLDER,
+    }
+    if DATABASE_URL.startswith("postgres"):
+        # gevent workers serve many requests per process, so size the pool for them
+        config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            "pool_size": int(os.getenv("DB_POOL_SIZE", 10)),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 20)),
+            "pool_timeout": 10,
+            "pool_pre_ping": True,
+        }
+    return config
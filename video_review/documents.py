@@ -0,0 +1,110 @@
+from datetime import datetime
+from io import BytesIO
+
+from sqlalchemy.exc import IntegrityError
+
+from .clients import get_s3_client
+from .config import S3_BUCKET
+from .extensions import db
+from .models import DocumentText
+from .offload import run_cpu
+
+
+# --- Cached DOCX text extraction ---
+def docx_blocks(doc):
+    """
+    Flattens a python-docx Document into ordered text blocks: section headers,
+    body paragraphs and tables in document order, then section footers.
+    """
+    def part_blocks(kind, parts):
+        seen = set()
+        blocks = []
+        for part in parts:
+            if part.is_linked_to_previous:
+                continue
+            for p in part.paragraphs:
+                text = p.text.strip()
+                if text and text not in seen:
+                    seen.add(text)
+                    blocks.append({"type": kind, "text": text})
+        return blocks
+
+    blocks = part_blocks("header", [s.header for s in doc.sections])
+    for item in doc.iter_inner_content():
+        if hasattr(item, "rows"):
+            rows = []
+            for row in item.rows:
+                cells = []
+                for cell in row.cells:
+                    text = cell.text.strip()
+                    # Merged cells repeat the same text once per grid column
+                    if text and (not cells or cells[-1] != text):
+                        cells.append(text)
+                if cells:
+                    rows.append(" | ".join(cells))
+            if rows:
+                blocks.append({"type": "table", "text": "\n".join(rows)})
+        else:
+            text = item.text.strip()
+            if text:
+                style = (item.style.name if item.style is not None else "") or ""
+                is_heading = style.startswith("Heading") or style == "Title"
+                blocks.append({"type": "heading" if is_heading else "paragraph", "text": text})
+    blocks += part_blocks("footer", [s.footer for s in doc.sections])
+    return blocks
+
+
+def numbered_blocks(blocks):
+    """
+    Copies of the blocks with body blocks numbered from 1 ("paragraph"), the
+    [¶n] numbers SILAS cites and stores on its comments. Headers and footers
+    repeat on every page, so they get no number.
+    """
+    numbered, number = [], 0
+    for block in blocks:
+        if block["type"] in ("header", "footer"):
+            numbered.append({**block, "paragraph": None})
+        else:
+            number += 1
+            numbered.append({**block, "paragraph": number})
+    return numbered
+
+
+def numbered_text(blocks):
+    """Body text with each block prefixed by its paragraph number, e.g. "[¶12] ..."."""
+    return "\n\n".join(f"[¶{b['paragraph']}] {b['text']}" for b in numbered_blocks(blocks) if b["paragraph"])
+
+
+def get_document_text(video_id):
+    """
+    Returns the DocumentText row for documents/<video_id>.docx, re-extracting
+    only when the object's S3 ETag has changed since the cached copy.
+    """
+    from docx import Document
+    s3_key = f"documents/{video_id}.docx"
+    etag = get_s3_client().head_object(Bucket=S3_BUCKET, Key=s3_key)["ETag"]
+    cached = DocumentText.query.get(s3_key)
+    if cached and cached.etag == etag:
+        return cached
+
+    # Parse from memory so concurrent requests never share a temp file
+    obj = get_s3_client().get_object(Bucket=S3_BUCKET, Key=s3_key)
+    data = obj["Body"].read()
+    # Parsing is CPU-bound; keep it off the gevent event loop
+    blocks = run_cpu(lambda: docx_blocks(Document(BytesIO(data))))
+    content = "\n\n".join(b["text"] for b in blocks)
+
+    row = cached or DocumentText(s3_key=s3_key, video_id=video_id)
+    row.etag = obj["ETag"]
+    row.content = content
+    row.blocks = blocks
+    row.extracted_at = datetime.utcnow()
+    db.session.add(row)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another request cached the same document first
+        db.session.rollback()
+        row = DocumentText.query.get(s3_key)
+    print(f"[📄] Extracted {len(blocks)} blocks from {s3_key}")
+    return row
@@ -0,0 +1,53 @@
+import os
+from datetime import datetime
+
+from flask import Blueprint, send_file
+
+from .config import EXPORT_FOLDER
+from .metrics import stage
+from .models import Comment
+
+bp = Blueprint("export", __name__)
+
+
+@bp.route('/export/<video_id>', methods=['GET'])
+def export_comments(video_id):
+    from docx import Document
+    with stage("export", "query"):
+        comments = Comment.query.filter_by(video_id=video_id).order_by(Comment.page.nullslast(), Comment.timestamp).all()
+
+    base_filename = f"{video_id}_v"
+    existing_versions = [f for f in os.listdir(EXPORT_FOLDER) if f.startswith(base_filename) and f.endswith(".docx")]
+    version = len(existing_versions) + 1
+    export_filename = f"{base_filename}{version}.docx"
+    export_path = os.path.join(EXPORT_FOLDER, export_filename)
+
+    local_time = datetime.now().strftime('%Y-%m-%d %I:%M %p')  # local time
+
+    with stage("export", "build_docx"):
+        doc = Document()
+        doc.add_heading(f"Comments for Video: {video_id}", 0)
+        doc.add_paragraph(f"Exported on: {local_time}")
+        doc.add_paragraph(f"Version: {version}")
+        doc.add_paragraph("")
+
+        for c in comments:
+            full = c.comment.strip()
+            base = full.split("\n\n--")[0]
+            additions = full.split("\n\n--")[1:] if "\n\n--" in full else []
+
+            p = doc.add_paragraph()
+            if c.page:
+                p.add_run(f"Page {c.page}:").bold = True
+            else:
+                p.add_run(f"{c.timestamp} seconds").bold = True
+            p.add_run(f" — {base} ({c.user})")
+            for add in additions:
+                lines = add.strip().split("\n")
+                meta = lines[0]
+                body = "\n".join(lines[1:]).strip()
+                doc.add_paragraph(f"{body} ({meta})")
+            doc.add_paragraph("")
+
+        doc.save(export_path)
+    return send_file(export_path, as_attachment=True)
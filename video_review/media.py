@@ -0,0 +1,572 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import BotoCoreError, ClientError
+from flask import Blueprint, Response, abort, current_app, jsonify, render_template, request, send_file
+from werkzeug.utils import safe_join, secure_filename
+
+from .assets import EXTENSION_MEDIA_TYPES, record_upload
+from .clients import get_s3_client
+from .config import MEDIA_MAX_AGE, MEDIA_PREFIXES, S3_BUCKET
+from .extensions import db
+from .models import Instruction, UploadSession
+from .storage import media_cache, pinned_path, scratch
+from .thumbnails import publish_timeline, render_timeline, thumbnail_prefix
+
+bp = Blueprint("media", __name__)
+
+
+# --- Admin List S3 Files Route ---
+@bp.route('/admin/list', methods=['GET'])
+def list_s3_files():
+    category = request.args.get("category")
+    if not category:
+        return jsonify({"error": "Missing category"}), 400
+
+    prefix = f"{category}/"
+    try:
+        response = get_s3_client().list_objects_v2(Bucket=S3_BUCKET, Prefix=prefix)
+        files = [
+            obj["Key"].split("/", 1)[-1]
+            for obj in response.get("Contents", [])
+            if obj["Key"].startswith(prefix) and obj["Key"] != prefix
+        ]
+        return jsonify(files)
+    except Exception as e:
+        print(f"[❌] Failed to list {category} files:", str(e))
+        return jsonify([]), 500
+
+# --- Archive S3 File Route (Soft Delete) ---
+@bp.route('/admin/archive', methods=['POST'])
+def archive_s3_file():
+    data = request.json
+    category = data.get("category")
+    filename = data.get("filename")
+
+    if not category or not filename:
+        return jsonify({'error': 'Missing category or filename'}), 400
+
+    original_key = f"{category}/{filename}"
+    archive_key = f"archive/{category}/{filename}"
+
+    try:
+        # Copy the file to the archive location
+        copy_to_archive(original_key, archive_key)
+        # Delete the original
+        get_s3_client().delete_object(Bucket=S3_BUCKET, Key=original_key)
+        return jsonify({'status': 'archived', 'from': original_key, 'to': archive_key})
+    except Exception as e:
+        print(f"[❌] Failed to archive {original_key}:", str(e))
+        return jsonify({'error': 'Failed to archive file'}), 500
+
+
+ARCHIVE_COPY_CONCURRENCY = int(os.getenv("ARCHIVE_COPY_CONCURRENCY", 8))
+ARCHIVE_DELETE_BATCH = 1000  # delete_objects accepts at most 1,000 keys per call
+ARCHIVE_MAX_KEYS = int(os.getenv("ARCHIVE_MAX_KEYS", 1000))  # per request, so one call finishes inside the worker timeout
+# Managed copies switch to multipart UploadPartCopy above the threshold, so
+# objects over the 5GB single copy_object limit archive correctly too.
+ARCHIVE_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=256 * 1024 * 1024,
+    multipart_chunksize=256 * 1024 * 1024,
+    max_concurrency=4
+)
+
+
+def copy_to_archive(original_key, archive_key):
+    get_s3_client().copy(
+        {'Bucket': S3_BUCKET, 'Key': original_key},
+        S3_BUCKET,
+        archive_key,
+        Config=ARCHIVE_TRANSFER_CONFIG
+    )
+
+
+# --- Batch Archive Route ---
+@bp.route('/admin/archive/batch', methods=['POST'])
+def archive_s3_files_batch():
+    """
+    Archives many objects at once, given either a category plus filenames or a
+    key prefix. Copies run concurrently, originals are removed with batched
+    delete_objects calls, and every key gets its own result entry. At most
+    ARCHIVE_MAX_KEYS objects per request; larger prefixes are refused and
+    can be archived in narrower ones.
+    """
+    data = request.get_json(silent=True) or {}
+    category = data.get("category")
+    filenames = data.get("filenames") or []
+    prefix = data.get("prefix")
+
+    if prefix is not None and not isinstance(prefix, str):
+        return jsonify({'error': 'prefix must be a string'}), 400
+    if not isinstance(filenames, list) or not all(isinstance(f, str) and f for f in filenames):
+        return jsonify({'error': 'filenames must be a list of strings'}), 400
+
+    if prefix:
+        # Also catches "archive" and "archived…", which would list the archive itself
+        if prefix.startswith("archive"):
+            return jsonify({'error': 'Prefix is already archived'}), 400
+        try:
+            keys = []
+            paginator = get_s3_client().get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=S3_BUCKET, Prefix=prefix):
+                keys.extend(obj["Key"] for obj in page.get("Contents", []) if not obj["Key"].endswith("/"))
+                if len(keys) > ARCHIVE_MAX_KEYS:
+                    return jsonify({
+                        'error': f'Prefix matches more than {ARCHIVE_MAX_KEYS} objects; archive a narrower prefix'
+                    }), 400
+        except Exception as e:
+            print(f"[❌] Failed to list {prefix} for archiving:", str(e))
+            return jsonify({'error': 'Failed to list files'}), 500
+    elif category and filenames:
+        if len(filenames) > ARCHIVE_MAX_KEYS:
+            return jsonify({'error': f'At most {ARCHIVE_MAX_KEYS} files per request'}), 400
+        keys = [f"{category}/{filename}" for filename in filenames]
+    else:
+        return jsonify({'error': 'Provide a prefix, or a category and filenames'}), 400
+
+    keys = list(dict.fromkeys(keys))
+    results = {key: {'key': key, 'archive_key': f"archive/{key}"} for key in keys}
+
+    def copy_one(key):
+        try:
+            copy_to_archive(key, results[key]['archive_key'])
+            return key, None
+        except Exception as e:
+            return key, str(e)
+
+    copied = []
+    with ThreadPoolExecutor(max_workers=ARCHIVE_COPY_CONCURRENCY) as pool:
+        for key, error in pool.map(copy_one, keys):
+            if error:
+                results[key].update(status='copy_failed', error=error)
+            else:
+                copied.append(key)
+
+    # Only originals that were safely copied are deleted
+    for i in range(0, len(copied), ARCHIVE_DELETE_BATCH):
+        batch = copied[i:i + ARCHIVE_DELETE_BATCH]
+        try:
+            response = get_s3_client().delete_objects(
+                Bucket=S3_BUCKET,
+                Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+            )
+            errors = {err['Key']: err.get('Message', err.get('Code')) for err in response.get('Errors', [])}
+        except Exception as e:
+            errors = {key: str(e) for key in batch}
+        for key in batch:
+            if key in errors:
+                results[key].update(status='delete_failed', error=errors[key])
+            else:
+                results[key]['status'] = 'archived'
+
+    archived = sum(1 for r in results.values() if r['status'] == 'archived')
+    print(f"[📦] Archived {archived}/{len(keys)} objects")
+    return jsonify({
+        'status': 'completed' if archived == len(keys) else 'partial',
+        'archived': archived,
+        'failed': len(keys) - archived,
+        'results': list(results.values())
+    }), 200 if archived == len(keys) else 207
+
+
+@bp.route('/upload', methods=['POST'])
+def upload_video():
+    file = request.files.get('video') or request.files.get('file')
+    if file is None or file.filename == '':
+        return jsonify({'error': 'No video file provided'}), 400
+
+    filename = secure_filename(file.filename)
+
+    try:
+        get_s3_client().upload_fileobj(
+            file,
+            S3_BUCKET,
+            filename,
+            ExtraArgs={'ContentType': file.content_type}
+        )
+        s3_url = f"https://{S3_BUCKET}.s3.amazonaws.com/{filename}"
+        print(f"[✅] Uploaded to S3: {s3_url}")
+        record_upload(filename)
+        response_data = {
+            'status': 'uploaded',
+            'filename': filename,
+            'url': s3_url
+        }
+        print(f"[✅] Returning response: {response_data}")
+        return jsonify(response_data)
+
+    except (BotoCoreError, ClientError) as e:
+        print(f"[❌] S3 Upload failed: {e}")
+        return jsonify({'error': 'Upload to S3 failed'}), 500
+
+
+# Correct upload route definition (ensuring no duplicates)
+@bp.route('/uploads/<path:filename>')
+def uploaded_file(filename):
+    path = safe_join(current_app.config['UPLOAD_FOLDER'], filename)
+    if path and os.path.isfile(path):
+        return send_file(path, mimetype="video/mp4", conditional=True)
+    # Nothing local (the normal case in production): proxy the S3 object instead
+    return stream_media(filename)
+
+
+# --- Range-aware S3 media proxy backed by the shared disk cache ---
+@bp.route('/media/stream/<path:key>', methods=['GET', 'HEAD'])
+def stream_media(key):
+    if not key.startswith(MEDIA_PREFIXES):
+        abort(404)
+
+    try:
+        entry = media_cache.lookup(key)
+        if entry:
+            # send_file handles Range, If-Range and If-None-Match for us
+            response = send_file(
+                entry.path,
+                mimetype=entry.content_type,
+                conditional=True,
+                etag=entry.etag.strip('"'),
+                max_age=MEDIA_MAX_AGE
+            )
+            response.headers["Accept-Ranges"] = "bytes"
+            return response
+
+        # Cache miss: pass the requested range straight through from S3 so
+        # playback starts immediately, and fill the cache in the background.
+        media_cache.fetch_in_background(key)
+        params = {"Bucket": S3_BUCKET, "Key": key}
+        if request.headers.get("Range"):
+            params["Range"] = request.headers["Range"]
+        obj = get_s3_client().get_object(**params)
+    except ClientError as e:
+        code = e.response.get("Error", {}).get("Code")
+        if code in ("404", "NoSuchKey", "NotFound"):
+            abort(404)
+        if code == "InvalidRange":
+            abort(416)
+        print(f"[❌] Failed to proxy {key}:", e)
+        return jsonify({"error": "Failed to load media"}), 502
+
+    def body_chunks():
+        try:
+            yield from obj["Body"].iter_chunks(chunk_size=1024 * 1024)
+        finally:
+            obj["Body"].close()
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(obj["ContentLength"]),
+        "ETag": obj["ETag"],
+        "Cache-Control": f"public, max-age={MEDIA_MAX_AGE}",
+    }
+    if obj.get("ContentRange"):
+        headers["Content-Range"] = obj["ContentRange"]
+    return Response(
+        body_chunks(),
+        status=206 if obj.get("ContentRange") else 200,
+        headers=headers,
+        mimetype=obj.get("ContentType") or "application/octet-stream"
+    )
+
+# --- Timeline Thumbnail Routes ---
+@bp.route('/thumbnails/<video_id>', methods=['POST'])
+def generate_thumbnails(video_id):
+    s3_key = f"videos/{video_id}.mp4"
+
+    def run_thumbnails():
+        try:
+            with scratch.job(f"thumbs_{video_id}") as work_dir:
+                video_path = pinned_path(lambda: media_cache.fetch(s3_key, pipeline="thumbnails"), work_dir)
+                timeline = render_timeline(video_path, work_dir)
+                publish_timeline(video_id, timeline, S3_BUCKET)
+            print(f"[🖼️] Published {len(timeline.sprites)} sprite sheet(s) for {video_id}")
+        except Exception as e:
+            print(f"[❌] Thumbnail generation failed for {video_id}:", e)
+
+    threading.Thread(target=run_thumbnails).start()
+    return jsonify({"status": "Thumbnail generation started"}), 202
+
+
+@bp.route('/thumbnails/<video_id>', methods=['GET'])
+def get_thumbnails(video_id):
+    prefix = thumbnail_prefix(video_id)
+    try:
+        response = get_s3_client().list_objects_v2(Bucket=S3_BUCKET, Prefix=prefix)
+        keys = [obj["Key"] for obj in response.get("Contents", [])]
+    except Exception as e:
+        print(f"[❌] Failed to list thumbnails for {video_id}:", e)
+        return jsonify({"error": "Failed to list thumbnails"}), 500
+
+    vtt_key = prefix + "thumbnails.vtt"
+    if vtt_key not in keys:
+        return jsonify({"error": "Thumbnails not found"}), 404
+    return jsonify({
+        "vtt_url": f"/media/stream/{vtt_key}",
+        "sprites": [f"/media/stream/{key}" for key in sorted(keys) if key.endswith(".jpg")],
+    })
+
+
+# Admin asset upload route
+@bp.route('/admin/upload', methods=['POST'])
+def admin_upload_asset():
+    file = request.files.get('file')
+    category = request.form.get('category')  # 'videos', 'storyboards', 'voiceovers', 'documents'
+
+    if not file or not category:
+        return jsonify({'error': 'File and category are required'}), 400
+
+    filename = secure_filename(file.filename)
+    s3_key = f"{category}/{filename}"
+
+    try:
+        get_s3_client().upload_fileobj(
+            file,
+            S3_BUCKET,
+            s3_key,
+            ExtraArgs={'ContentType': file.content_type}
+        )
+        s3_url = f"https://{S3_BUCKET}.s3.amazonaws.com/{s3_key}"
+        print(f"[✅] Admin uploaded to S3: {s3_url}")
+        record_upload(s3_key)
+        return jsonify({'status': 'uploaded', 's3_key': s3_key, 'url': s3_url})
+    except (BotoCoreError, ClientError) as e:
+        print(f"[❌] Admin S3 upload failed: {e}")
+        return jsonify({'error': 'Admin upload to S3 failed'}), 500
+
+
+# --- Presigned multipart upload sessions ---
+# The browser PUTs each part straight to S3 using the presigned URLs, so Flask
+# only handles the small create/complete/abort control requests.
+UPLOAD_PART_SIZE = int(os.getenv("UPLOAD_PART_SIZE", 16 * 1024 * 1024))  # S3 minimum is 5MB
+UPLOAD_MAX_PARTS = 10000  # S3 hard limit per multipart upload
+UPLOAD_MAX_SIZE = int(os.getenv("UPLOAD_MAX_SIZE", 5 * 1024 * 1024 * 1024))
+UPLOAD_URL_EXPIRY = int(os.getenv("UPLOAD_URL_EXPIRY", 3600))
+UPLOAD_CATEGORIES = {"videos", "storyboards", "voiceovers", "documents"}
+
+
+def presign_upload_parts(session, part_numbers):
+    return [
+        {
+            "part_number": n,
+            "url": get_s3_client().generate_presigned_url(
+                "upload_part",
+                Params={
+                    "Bucket": S3_BUCKET,
+                    "Key": session.s3_key,
+                    "UploadId": session.id,
+                    "PartNumber": n,
+                },
+                ExpiresIn=UPLOAD_URL_EXPIRY,
+            ),
+        }
+        for n in part_numbers
+    ]
+
+
+@bp.route('/upload/sessions', methods=['POST'])
+def create_upload_session():
+    data = request.json or {}
+    filename = secure_filename(data.get("filename") or "")
+    category = data.get("category")
+    content_type = data.get("content_type") or "application/octet-stream"
+    try:
+        size = int(data.get("size") or 0)
+    except (TypeError, ValueError):
+        size = 0
+
+    if not filename or size <= 0:
+        return jsonify({'error': 'Missing filename or size'}), 400
+    # Keys outside a category folder aren't served or reviewed (MEDIA_PREFIXES), so infer one from the extension
+    category = category or EXTENSION_MEDIA_TYPES.get(os.path.splitext(filename)[1].lower())
+    if not category:
+        return jsonify({'error': 'Missing category'}), 400
+    if category not in UPLOAD_CATEGORIES:
+        return jsonify({'error': 'Unknown category'}), 400
+    if size > UPLOAD_MAX_SIZE:
+        return jsonify({'error': 'File too large'}), 413
+
+    # Grow the part size for very large files so we stay under the S3 part limit
+    part_size = max(UPLOAD_PART_SIZE, -(-size // UPLOAD_MAX_PARTS))
+    part_count = -(-size // part_size)
+    s3_key = f"{category}/{filename}"
+
+    try:
+        upload = get_s3_client().create_multipart_upload(
+            Bucket=S3_BUCKET,
+            Key=s3_key,
+            ContentType=content_type
+        )
+        session = UploadSession(
+            id=upload["UploadId"],
+            s3_key=s3_key,
+            filename=filename,
+            category=category,
+            content_type=content_type,
+            size=size,
+            part_size=part_size,
+            part_count=part_count,
+        )
+        db.session.add(session)
+        db.session.commit()
+        print(f"[📤] Upload session started for {s3_key} ({part_count} parts)")
+        return jsonify({
+            'upload_id': session.id,
+            's3_key': s3_key,
+            'part_size': part_size,
+            'parts': presign_upload_parts(session, range(1, part_count + 1)),
+        }), 201
+    except (BotoCoreError, ClientError) as e:
+        print(f"[❌] Failed to start upload session for {s3_key}: {e}")
+        return jsonify({'error': 'Failed to start upload'}), 500
+
+
+@bp.route('/upload/sessions/<upload_id>/parts', methods=['POST'])
+def refresh_upload_parts(upload_id):
+    """Re-issue presigned URLs, e.g. to resume an upload after the originals expired."""
+    session = UploadSession.query.get_or_404(upload_id)
+    if session.status != "pending":
+        return jsonify({'error': f'Upload is {session.status}'}), 409
+
+    requested = (request.get_json(silent=True) or {}).get("part_numbers")
+    if requested is None:
+        part_numbers = list(range(1, session.part_count + 1))
+    elif isinstance(requested, list) and all(type(n) is int and 1 <= n <= session.part_count for n in requested):
+        part_numbers = requested
+    else:
+        return jsonify({'error': f'part_numbers must be a list of integers from 1 to {session.part_count}'}), 400
+    return jsonify({'upload_id': session.id, 'parts': presign_upload_parts(session, part_numbers)})
+
+
+@bp.route('/upload/sessions/<upload_id>/complete', methods=['POST'])
+def complete_upload_session(upload_id):
+    session = UploadSession.query.get_or_404(upload_id)
+    if session.status != "pending":
+        return jsonify({'error': f'Upload is {session.status}'}), 409
+
+    try:
+        # Ask S3 which parts actually landed rather than trusting the client,
+        # which also means the bucket CORS config doesn't need to expose ETag.
+        parts = []
+        paginator = get_s3_client().get_paginator("list_parts")
+        for page in paginator.paginate(Bucket=S3_BUCKET, Key=session.s3_key, UploadId=session.id):
+            for part in page.get("Parts", []):
+                parts.append({"PartNumber": part["PartNumber"], "ETag": part["ETag"]})
+
+        if len(parts) != session.part_count:
+            return jsonify({
+                'error': 'Upload incomplete',
+                'parts_received': len(parts),
+                'parts_expected': session.part_count,
+            }), 409
+
+        get_s3_client().complete_multipart_upload(
+            Bucket=S3_BUCKET,
+            Key=session.s3_key,
+            UploadId=session.id,
+            MultipartUpload={"Parts": sorted(parts, key=lambda p: p["PartNumber"])}
+        )
+        session.status = "completed"
+        session.completed_at = datetime.utcnow()
+        record_upload(session.s3_key)  # commits the session update too
+
+        s3_url = f"https://{S3_BUCKET}.s3.amazonaws.com/{session.s3_key}"
+        print(f"[✅] Multipart upload completed: {s3_url}")
+        return jsonify({
+            'status': 'uploaded',
+            'filename': session.filename,
+            's3_key': session.s3_key,
+            'url': s3_url
+        })
+    except (BotoCoreError, ClientError) as e:
+        print(f"[❌] Failed to complete upload {session.s3_key}: {e}")
+        return jsonify({'error': 'Failed to complete upload'}), 500
+
+
+@bp.route('/upload/sessions/<upload_id>', methods=['DELETE'])
+def abort_upload_session(upload_id):
+    session = UploadSession.query.get_or_404(upload_id)
+    if session.status != "pending":
+        return jsonify({'error': f'Upload is {session.status}'}), 409
+
+    try:
+        get_s3_client().abort_multipart_upload(Bucket=S3_BUCKET, Key=session.s3_key, UploadId=session.id)
+    except ClientError as e:
+        # Already gone on the S3 side; still mark the session as aborted
+        print(f"[⚠️] Abort for {session.s3_key} returned: {e}")
+    session.status = "aborted"
+    db.session.commit()
+    return jsonify({'status': 'aborted', 'upload_id': upload_id})
+
+
+# --- SILAS System Instruction Admin API ---
+# Place this route BEFORE the frontend fallback routes to ensure correct matching
+@bp.route("/admin/instructions", methods=["GET"])
+def get_silas_instruction():
+    mode = request.args.get("mode")
+    if not mode:
+        return jsonify({"error": "Missing mode"}), 400
+    try:
+        row = Instruction.query.get(mode)
+        if row:
+            return jsonify({"mode": mode, "content": row.content})
+        else:
+            return jsonify({"mode": mode, "content": ""})
+    except Exception as e:
+        print("[❌] Failed to load instructions:", e)
+        return jsonify({"error": "Unable to load instructions"}), 500
+
+
+# Serve the admin instruction editor UI
+@bp.route("/admin/instructions-editor")
+def serve_instruction_editor():
+    return render_template("admin_instructions.html")
+
+
+@bp.route("/admin/instructions", methods=["POST"])
+def save_silas_instruction():
+    data = request.json
+    print(f"[🔧] Incoming POST to save instructions: {data}")
+    mode = data.get("mode")
+    content = data.get("content")
+    if not mode or content is None:
+        return jsonify({"error": "Missing mode or content"}), 400
+    try:
+        print(f"[📝] Saving SILAS instructions for mode: {mode}")
+        print(f"[🧾] Content to save:\n{content}")
+        instruction = Instruction.query.get(mode)
+        if instruction:
+            instruction.content = content
+        else:
+            instruction = Instruction(mode=mode, content=content)
+            db.session.add(instruction)
+        db.session.commit()
+        return jsonify({"status": "saved", "mode": mode})
+    except Exception as e:
+        print("[❌] Failed to save instructions:", e)
+        return jsonify({"error": "Unable to save instructions"}), 500
+
+
+# Route for listing S3 files by category
+@bp.route('/media', methods=['GET'])
+def list_media_by_type():
+    category = request.args.get('type')  # 'videos', 'storyboards', 'voiceovers', 'documents'
+    if not category:
+        return jsonify({'error': 'Missing type query parameter'}), 400
+
+    try:
+        response = get_s3_client().list_objects_v2(Bucket=S3_BUCKET, Prefix=f"{category}/")
+        files = []
+        for obj in response.get('Contents', []):
+            key = obj['Key']
+            if key.endswith('/'):
+                continue  # skip folder entries
+            filename = key.split('/')[-1]
+            file_url = f"https://{S3_BUCKET}.s3.amazonaws.com/{key}"
+            files.append({'filename': filename, 'url': file_url, 'stream_url': f"/media/stream/{key}"})
+
+        return jsonify(files)
+    except Exception as e:
+        print(f"[❌] Failed to list {category} from S3:", str(e))
+        return jsonify({'error': 'Failed to list media files'}), 500
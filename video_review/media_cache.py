@@ -0,0 +1,306 @@
+"""
+Size-bounded LRU disk cache for S3 media.
+
+Playback (via the range-aware proxy route) and the SILAS review and
+transcription jobs all read media through the same cache. So an asset is
+fetched from S3 once per instance, not once per job. Entries are keyed by
+S3 key and ETag, which means a re-uploaded object is fetched fresh. Files
+are written atomically, so gunicorn workers can share the same directory.
+
+Media from other hosts is cached by URL with the server's ETag or
+Last-Modified validator. If the server sends neither, the SHA-256 of the
+content is used instead. A repeated download of unchanged content then
+lands on the entry already on disk instead of adding a copy.
+
+A job that reads an entry for longer than one open() (ffmpeg runs several
+passes over a video) pins it. trim() skips pinned entries until the job
+unpins them or its process dies. Pins are marker files next to the entry,
+so they hold across gunicorn workers.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import unquote, urlparse
+
+from .clients import get_s3_client, http_get, http_head
+from .metrics import BYTES_DOWNLOADED
+from .workspace import pid_alive
+
+PIN_MARKER = ".pin-"
+
+
+@dataclass
+class CachedMedia:
+    key: str
+    path: str
+    etag: str
+    size: int
+    content_type: str
+
+
+class MediaCache:
+    def __init__(self, root, max_bytes, bucket, revalidate_seconds=60):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.bucket = bucket
+        self.revalidate_seconds = revalidate_seconds
+        self._index = {}  # key -> (CachedMedia, checked_at)
+        self._locks = {}
+        self._filling = set()
+        self._locks_guard = threading.Lock()
+        self._evict_lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _key_lock(self, key):
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _entry_path(self, key, etag):
+        digest = hashlib.sha256(f"{key}\0{etag}".encode()).hexdigest()
+        return os.path.join(self.root, digest[:2], digest)
+
+    def _fresh(self, key):
+        cached = self._index.get(key)
+        if cached and time.time() - cached[1] < self.revalidate_seconds and os.path.exists(cached[0].path):
+            self._touch(cached[0].path)
+            return cached[0]
+        return None
+
+    def _from_disk(self, key, etag):
+        entry = self._load_meta(key, etag)
+        if entry:
+            self._index[key] = (entry, time.time())
+            self._touch(entry.path)
+        return entry
+
+    def lookup(self, key):
+        """Returns the cached entry for key if present and still current, without fetching."""
+        return self._fresh(key) or self._from_disk(key, self.head(key)["ETag"])
+
+    def head(self, key):
+        return get_s3_client().head_object(Bucket=self.bucket, Key=key)
+
+    def fetch(self, key, pipeline="playback"):
+        """Returns the cached entry for key, downloading it from S3 first if needed."""
+        with self._key_lock(key):
+            entry = self._fresh(key)
+            if entry:
+                return entry
+            head = self.head(key)
+            entry = self._from_disk(key, head["ETag"])
+            if entry:
+                return entry
+
+            path = self._entry_path(key, head["ETag"])
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._evict(head["ContentLength"])
+
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    get_s3_client().download_fileobj(self.bucket, key, f)
+                entry = CachedMedia(
+                    key=key,
+                    path=path,
+                    etag=head["ETag"],
+                    size=head["ContentLength"],
+                    content_type=head.get("ContentType") or "application/octet-stream",
+                )
+                with open(path + ".json", "w") as f:
+                    json.dump(entry.__dict__, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+            BYTES_DOWNLOADED.labels(pipeline).inc(entry.size)
+            print(f"[💾] Cached {key} ({entry.size} bytes)")
+            self._index[key] = (entry, time.time())
+            return entry
+
+    def fetch_url(self, url, pipeline="media"):
+        """Like fetch() for a URL outside our bucket. Raises if the download fails."""
+        with self._key_lock(url):
+            entry = self._fresh(url)
+            if entry:
+                return entry
+            head = http_head(url, allow_redirects=True)
+            validator = (head.headers.get("ETag") or head.headers.get("Last-Modified")) if head.ok else None
+            if validator:
+                entry = self._from_disk(url, validator)
+                if entry:
+                    return entry
+
+            incoming = os.path.join(self.root, "incoming")
+            os.makedirs(incoming, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=incoming, suffix=".part")
+            try:
+                digest, size = hashlib.sha256(), 0
+                resp = http_get(url, stream=True)
+                resp.raise_for_status()
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in resp.iter_content(chunk_size=1024 * 1024):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+                BYTES_DOWNLOADED.labels(pipeline).inc(size)
+
+                version = validator or f"sha256:{digest.hexdigest()}"
+                path = self._entry_path(url, version)
+                entry = self._load_meta(url, version)
+                if entry:
+                    # Same content as an entry we already have
+                    os.remove(tmp_path)
+                    self._touch(path)
+                else:
+                    self._evict(size)
+                    entry = CachedMedia(
+                        key=url,
+                        path=path,
+                        etag=version,
+                        size=size,
+                        content_type=resp.headers.get("Content-Type") or "application/octet-stream",
+                    )
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(path + ".json", "w") as f:
+                        json.dump(entry.__dict__, f)
+                    os.replace(tmp_path, path)
+                    print(f"[💾] Cached {url} ({size} bytes)")
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+            self._index[url] = (entry, time.time())
+            return entry
+
+    def fetch_in_background(self, key):
+        with self._locks_guard:
+            if key in self._filling:
+                return
+            self._filling.add(key)
+
+        def run():
+            try:
+                self.fetch(key)
+            except Exception as e:
+                print(f"[⚠️] Background cache fill for {key} failed: {e}")
+            finally:
+                with self._locks_guard:
+                    self._filling.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _load_meta(self, key, etag):
+        path = self._entry_path(key, etag)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path + ".json") as f:
+                return CachedMedia(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def _touch(path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _entries(self):
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for item in os.scandir(shard.path):
+                if item.is_file() and not item.name.endswith((".json", ".part")) and PIN_MARKER not in item.name:
+                    stat = item.stat()
+                    yield item.path, stat.st_size, stat.st_mtime
+
+    def clear(self):
+        """Drops every cached entry, on disk and in memory."""
+        with self._evict_lock:
+            for path, _, _ in list(self._entries()):
+                for p in (path, path + ".json"):
+                    try:
+                        os.remove(p)
+                    except OSError:
+                        pass
+            self._index.clear()
+
+    def pin(self, path):
+        """
+        Protects the entry at path from trim() until unpin(). Returns the pin,
+        or None if the entry was evicted before it could be pinned.
+        """
+        with self._evict_lock:
+            if not os.path.exists(path):
+                return None
+            fd, pin = tempfile.mkstemp(
+                prefix=f"{os.path.basename(path)}{PIN_MARKER}{os.getpid()}-", dir=os.path.dirname(path)
+            )
+            os.close(fd)
+            return pin
+
+    @staticmethod
+    def unpin(pin):
+        try:
+            os.remove(pin)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _pinned(path):
+        """True if a live process pins path; pins left by dead processes are removed."""
+        prefix = os.path.basename(path) + PIN_MARKER
+        pinned = False
+        for item in os.scandir(os.path.dirname(path)):
+            if not item.name.startswith(prefix):
+                continue
+            try:
+                pid = int(item.name[len(prefix):].split("-")[0])
+            except ValueError:
+                continue
+            if pid_alive(pid):
+                pinned = True
+            else:
+                MediaCache.unpin(item.path)
+        return pinned
+
+    def _evict(self, incoming_bytes):
+        """Deletes least recently used entries until incoming_bytes fits under the size limit."""
+        self.trim(self.max_bytes - incoming_bytes)
+
+    def trim(self, max_total):
+        """
+        Deletes least recently used entries until the cache holds at most
+        max_total bytes. Pinned entries are kept, so the cache can stay over
+        max_total until the jobs using them finish.
+        """
+        with self._evict_lock:
+            entries = sorted(self._entries(), key=lambda e: e[2])
+            total = sum(size for _, size, _ in entries)
+            for path, size, _ in entries:
+                if total <= max_total:
+                    break
+                if self._pinned(path):
+                    continue
+                for p in (path, path + ".json"):
+                    try:
+                        os.remove(p)
+                    except OSError:
+                        pass
+                total -= size
+
+def s3_key_from_url(url, bucket):
+    """Maps a public S3 object URL for bucket back to its key, or None for any other URL."""
+    parsed = urlparse(url or "")
+    host = parsed.netloc.lower()
+    if host.startswith(f"{bucket}.s3.") and host.endswith(".amazonaws.com"):
+        return unquote(parsed.path.lstrip("/")) or None
+    return None
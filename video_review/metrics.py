@@ -0,0 +1,74 @@
+"""
+Prometheus metrics for the SILAS pipelines and the HTTP routes.
+
+Pipelines wrap each step in `stage(pipeline, name)` so slow reviews can be
+traced to a specific step: download, audio extraction, Whisper, frame
+rendering, GPT-4o calls, DB writes and so on. Under gunicorn,
+gunicorn.conf.py points PROMETHEUS_MULTIPROC_DIR at a shared directory so
+that /metrics combines all workers.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+STAGE_SECONDS = Histogram(
+    "silas_stage_seconds", "Time spent in each stage of a SILAS pipeline",
+    ["pipeline", "stage"], buckets=STAGE_BUCKETS
+)
+BYTES_DOWNLOADED = Counter(
+    "silas_bytes_downloaded_total", "Media bytes fetched from S3 or over HTTP", ["pipeline"]
+)
+IMAGE_BYTES_SENT = Counter(
+    "silas_image_bytes_sent_total", "Base64 image bytes sent to the model", ["pipeline"]
+)
+TOKENS_USED = Counter(
+    "silas_tokens_total", "Model tokens used", ["pipeline", "kind"]
+)
+DB_WRITES = Counter(
+    "silas_db_writes_total", "Rows written to the database", ["pipeline"]
+)
+PIPELINE_RUNS = Counter(
+    "silas_pipeline_runs_total", "Completed pipeline runs", ["pipeline", "status"]
+)
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency per route",
+    ["route", "method", "status"]
+)
+
+
+@contextmanager
+def stage(pipeline, name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(pipeline, name).observe(time.perf_counter() - start)
+
+
+def record_usage(pipeline, response):
+    """Adds the token usage reported on an OpenAI response, if any."""
+    usage = getattr(response, "usage", None)
+    if not usage:
+        return
+    TOKENS_USED.labels(pipeline, "prompt").inc(getattr(usage, "prompt_tokens", 0) or 0)
+    TOKENS_USED.labels(pipeline, "completion").inc(getattr(usage, "completion_tokens", 0) or 0)
+
+
+def render_metrics():
+    """Returns (body, content_type) in the Prometheus text exposition format."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
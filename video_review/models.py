@@ -0,0 +1,170 @@
+from datetime import datetime
+
+from sqlalchemy import func, literal_column
+
+from .extensions import db
+
+# Text search configuration. /search builds the same expression, so Postgres can use the GIN indexes below
+SEARCH_CONFIG = literal_column("'english'")
+
+
+def search_vector(column):
+    return func.to_tsvector(SEARCH_CONFIG, column)
+
+# --- Get SILAS system instruction for a mode ---
+class Instruction(db.Model):
+    mode = db.Column(db.String(50), primary_key=True)
+    content = db.Column(db.Text, nullable=False)
+
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(120), unique=True, nullable=False)
+    password_hash = db.Column(db.String(256), nullable=False)
+    token = db.Column(db.String(64), unique=True, index=True)
+
+class Comment(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    video_id = db.Column(db.String(120), nullable=False, index=True)
+    timestamp = db.Column(db.String(10), nullable=False)
+    comment = db.Column(db.Text, nullable=False)
+    user = db.Column(db.String(120), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    page = db.Column(db.Integer, nullable=True)
+    paragraph = db.Column(db.Integer, nullable=True)  # first document paragraph (¶) a chunked SILAS review covers
+
+    __table_args__ = (
+        # Postgres only; SQLite databases fall back to LIKE matching
+        db.Index("ix_comment_search", search_vector(comment), postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+
+# --- CommentReaction model: one row per user per reaction, toggled without touching the comment ---
+class CommentReaction(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    comment_id = db.Column(db.Integer, db.ForeignKey("comment.id", ondelete="CASCADE"), nullable=False)
+    reaction = db.Column(db.String(32), nullable=False)
+    username = db.Column(db.String(120), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Also serves the per-comment lookups, since comment_id leads
+        db.UniqueConstraint("comment_id", "reaction", "username", name="uq_comment_reaction"),
+    )
+
+# --- Asset model: one catalog row per reviewed asset, kept current by uploads, comments and SILAS ---
+class Asset(db.Model):
+    video_id = db.Column(db.String(120), primary_key=True)  # S3 file name without extension
+    media_type = db.Column(db.String(20), nullable=True)  # videos, storyboards, voiceovers, documents
+    s3_key = db.Column(db.String(512), nullable=True)
+    comment_count = db.Column(db.Integer, nullable=False, default=0)
+    review_status = db.Column(db.String(20), nullable=True)  # running, completed, failed (None = never reviewed)
+    reviewed_at = db.Column(db.DateTime, nullable=True)
+    review_plan = db.Column(db.JSON, nullable=True)  # frame sampling plan of the latest video review
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_activity_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("ix_asset_activity", "last_activity_at", "video_id"),
+        db.Index("ix_asset_type_activity", "media_type", "last_activity_at", "video_id"),
+    )
+
+# --- SlidePage model for storing full text of each storyboard page ---
+class SlidePage(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    video_id = db.Column(db.String(120), nullable=False, index=True)
+    page_number = db.Column(db.Integer, nullable=False)
+    content = db.Column(db.Text, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_slide_page_search", search_vector(content), postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+
+# --- DocumentText model caching extracted DOCX text per S3 object version ---
+class DocumentText(db.Model):
+    s3_key = db.Column(db.String(512), primary_key=True)
+    video_id = db.Column(db.String(120), nullable=False, index=True)
+    etag = db.Column(db.String(255), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    blocks = db.Column(db.JSON, nullable=False, default=list)  # [{"type": "heading"|"paragraph"|"table"|..., "text": ...}]
+    extracted_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# --- UploadSession model for tracking presigned multipart uploads ---
+class UploadSession(db.Model):
+    id = db.Column(db.String(255), primary_key=True)  # S3 multipart UploadId
+    s3_key = db.Column(db.String(512), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    category = db.Column(db.String(50), nullable=True)
+    content_type = db.Column(db.String(120), nullable=True)
+    size = db.Column(db.BigInteger, nullable=False)
+    part_size = db.Column(db.BigInteger, nullable=False)
+    part_count = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, completed, aborted
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+# --- NotificationOutbox model: emails waiting for the background sender ---
+class NotificationOutbox(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # review_complete, mention
+    recipient = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    video_id = db.Column(db.String(120), nullable=True)
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_notification_outbox_due", "status", "next_attempt_at"),
+    )
+
+# --- WorkerLease model: lets exactly one worker process run a background loop, renewed while it runs ---
+class WorkerLease(db.Model):
+    name = db.Column(db.String(64), primary_key=True)
+    holder = db.Column(db.String(255), nullable=False)  # hostname:pid
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+# --- ReviewBatch model: a bulk SILAS review submitted through the OpenAI Batch API ---
+class ReviewBatch(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default="rendering")  # rendering, submitted, ingesting, completed, failed
+    assets = db.Column(db.JSON, nullable=False, default=list)  # [{"video_id", "file_url", "media_type", "kind", "status"}]
+    parts = db.Column(db.JSON, nullable=False, default=list)  # [{"batch_id", "input_file_id", "requests", "status", "output_file_id", "error_file_id"}]
+    request_count = db.Column(db.Integer, nullable=False, default=0)
+    comments_added = db.Column(db.Integer, nullable=False, default=0)
+    failed_requests = db.Column(db.Integer, nullable=False, default=0)
+    ingest_attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    submitted_at = db.Column(db.DateTime, nullable=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_review_batch_status", "status"),
+    )
+
+# --- ReviewJob model: one SILAS review run, so identical submissions share it (see review_jobs.py) ---
+class ReviewJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    video_id = db.Column(db.String(120), nullable=False)
+    mode = db.Column(db.String(20), nullable=False)  # storyboard, video
+    source_etag = db.Column(db.String(255), nullable=True)  # None when the source has no validator
+    instruction_hash = db.Column(db.String(64), nullable=False)  # prompts + options the review ran with
+    dedupe_key = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="running")  # running, completed, failed, superseded
+    comments_added = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # At most one running or completed job per key; a second insert loses the race with an IntegrityError
+        db.Index(
+            "uq_review_job_active", "dedupe_key", unique=True,
+            postgresql_where=db.text("status IN ('running', 'completed')"),
+            sqlite_where=db.text("status IN ('running', 'completed')"),
+        ),
+        db.Index("ix_review_job_video_id", "video_id"),
+    )
@@ -0,0 +1,290 @@
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+
+from .clients import get_ses_client
+from .extensions import db
+from .models import NotificationOutbox, WorkerLease
+
+bp = Blueprint("notifications", __name__)
+
+
+# --- Notification Outbox ---
+# Notification routes only write rows to the outbox table (in the same
+# transaction as whatever triggered them); a background sender drains it
+# with rate limiting, retry/backoff and optional per-recipient digests.
+# Every worker runs the sender loop, but only the one holding the
+# "notification-sender" lease sends, so NOTIFY_SEND_RATE holds across all
+# workers. Due rows are marked "sending" and committed before SES is
+# called; a row left "sending" by a crashed sender is retried once
+# NOTIFY_SENDING_TIMEOUT passes.
+NOTIFY_SOURCE = "support@naveonguides.com"
+NOTIFY_SEND_RATE = float(os.getenv("NOTIFY_SEND_RATE", 10))  # emails/sec for the whole deployment; SES default quota is 14
+NOTIFY_LEASE_SECONDS = float(os.getenv("NOTIFY_LEASE_SECONDS", 60))
+NOTIFY_SENDING_TIMEOUT = float(os.getenv("NOTIFY_SENDING_TIMEOUT", 600))
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", 6))
+NOTIFY_RETRY_BASE = float(os.getenv("NOTIFY_RETRY_BASE", 30))  # seconds, doubled per attempt
+NOTIFY_RETRY_MAX = float(os.getenv("NOTIFY_RETRY_MAX", 3600))
+NOTIFY_DIGEST_SECONDS = int(os.getenv("NOTIFY_DIGEST_SECONDS", 0))  # 0 sends every mention on its own
+NOTIFY_POLL_SECONDS = float(os.getenv("NOTIFY_POLL_SECONDS", 5))
+NOTIFY_BATCH_SIZE = 100
+SENDER_LEASE = "notification-sender"
+
+outbox_wakeup = threading.Event()
+outbox_worker_lock = threading.Lock()
+outbox_worker_started = False
+
+
+def enqueue_notification(kind, to_addresses, subject, body, video_id=None):
+    """Adds one outbox row per recipient to the current session; the caller commits."""
+    if isinstance(to_addresses, str):
+        to_addresses = [to_addresses]
+    for address in to_addresses:
+        db.session.add(NotificationOutbox(
+            kind=kind,
+            recipient=address.strip(),
+            subject=subject,
+            body=body,
+            video_id=video_id
+        ))
+    return len(to_addresses)
+
+
+def mention_email(video_id, page, comment_text, reviewer, asset_url):
+    subject = f"@Notify from {reviewer} - Comment on {video_id}"
+    page_info = f"Slide {page}" if page else "Timeline Comment"
+    body = (
+        f"{reviewer} tagged you in a comment on {page_info} of {video_id}:\n\n"
+        f"\"{comment_text.strip()}\"\n\n"
+        f"View the full review:\n{asset_url}"
+    )
+    return subject, body
+
+
+class RateLimiter:
+    """Simple token bucket shared by the sender thread."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def wait(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            time.sleep((1 - self.tokens) / self.rate)
+
+
+def send_outbox_email(recipient, subject, body):
+    get_ses_client().send_email(
+        Source=NOTIFY_SOURCE,
+        Destination={"ToAddresses": [recipient]},
+        Message={
+            "Subject": {"Data": subject},
+            "Body": {"Text": {"Data": body}},
+        }
+    )
+
+
+def group_outbox_rows(rows, now):
+    """Yields lists of rows to send as one email, holding mentions back while their digest window is open."""
+    digests = {}
+    for row in rows:
+        if NOTIFY_DIGEST_SECONDS and row.kind == "mention":
+            digests.setdefault(row.recipient, []).append(row)
+        else:
+            yield [row]
+    for recipient_rows in digests.values():
+        oldest = min(r.created_at for r in recipient_rows)
+        if (now - oldest).total_seconds() >= NOTIFY_DIGEST_SECONDS:
+            yield recipient_rows
+
+
+def lease_holder():
+    # Read per call: with --preload every worker imports this module in the master, before forking
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def acquire_sender_lease():
+    """Takes or renews the single-sender lease; False while another worker holds it."""
+    holder = lease_holder()
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=NOTIFY_LEASE_SECONDS)
+    renewed = db.session.execute(
+        update(WorkerLease)
+        .where(WorkerLease.name == SENDER_LEASE,
+               or_(WorkerLease.holder == holder, WorkerLease.expires_at < now))
+        .values(holder=holder, expires_at=expires_at)
+    ).rowcount
+    if not renewed:
+        if db.session.get(WorkerLease, SENDER_LEASE):
+            db.session.rollback()
+            return False
+        db.session.add(WorkerLease(name=SENDER_LEASE, holder=holder, expires_at=expires_at))
+    try:
+        db.session.commit()
+        return True
+    except IntegrityError:
+        # Another worker created the lease first
+        db.session.rollback()
+        return False
+
+
+def claim_outbox_groups(now):
+    """Marks due rows "sending" and commits, so no row lock is held while SES is called."""
+    rows = (
+        NotificationOutbox.query
+        .filter(NotificationOutbox.status.in_(("pending", "sending")), NotificationOutbox.next_attempt_at <= now)
+        .order_by(NotificationOutbox.id)
+        .limit(NOTIFY_BATCH_SIZE)
+        .with_for_update(skip_locked=True)  # covers the hand-over while the lease changes hands
+        .all()
+    )
+    groups = list(group_outbox_rows(rows, now))
+    for group in groups:
+        for row in group:
+            row.status = "sending"
+            row.next_attempt_at = now + timedelta(seconds=NOTIFY_SENDING_TIMEOUT)
+    db.session.commit()
+    return groups
+
+
+def drain_outbox_once(limiter, until=None):
+    """Sends due notifications; stops at until (time.monotonic()) and hands unsent rows back."""
+    groups = claim_outbox_groups(datetime.utcnow())
+    sent = 0
+    for n, group in enumerate(groups):
+        if until and time.monotonic() >= until:
+            # The lease could lapse to another worker; let the next holder send the rest
+            for row in (r for g in groups[n:] for r in g):
+                row.status = "pending"
+                row.next_attempt_at = datetime.utcnow()
+            break
+        if len(group) == 1:
+            subject, body = group[0].subject, group[0].body
+        else:
+            subject = f"{len(group)} new comment mentions"
+            body = "\n\n----------\n\n".join(r.body for r in group)
+        limiter.wait()
+        try:
+            send_outbox_email(group[0].recipient, subject, body)
+            for row in group:
+                row.status = "sent"
+                row.sent_at = datetime.utcnow()
+            sent += 1
+        except Exception as e:
+            print(f"[⚠️] Notification to {group[0].recipient} failed: {e}")
+            for row in group:
+                row.attempts += 1
+                row.last_error = str(e)[:1000]
+                if row.attempts >= NOTIFY_MAX_ATTEMPTS:
+                    row.status = "failed"
+                else:
+                    row.status = "pending"
+                    delay = min(NOTIFY_RETRY_BASE * 2 ** (row.attempts - 1), NOTIFY_RETRY_MAX)
+                    row.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+        db.session.commit()
+    db.session.commit()
+    return sent
+
+
+def run_outbox_worker(app):
+    limiter = RateLimiter(NOTIFY_SEND_RATE)
+    while True:
+        with app.app_context():
+            try:
+                if acquire_sender_lease():
+                    # Finish well before the lease could expire, so two workers never send at once
+                    sent = drain_outbox_once(limiter, time.monotonic() + NOTIFY_LEASE_SECONDS / 2)
+                    if sent:
+                        print(f"[📧] Sent {sent} queued notification(s)")
+            except Exception as e:
+                db.session.rollback()
+                print("[❌] Notification outbox error:", e)
+        outbox_wakeup.wait(NOTIFY_POLL_SECONDS)
+        outbox_wakeup.clear()
+
+
+def start_outbox_worker(app):
+    global outbox_worker_started
+    with outbox_worker_lock:
+        if not outbox_worker_started:
+            threading.Thread(target=run_outbox_worker, args=(app,), name="notification-outbox", daemon=True).start()
+            outbox_worker_started = True
+
+
+# Started on the first request, so it runs in each worker rather than in a preloading master;
+# the sender lease picks which of them actually sends
+@bp.before_app_request
+def ensure_outbox_worker():
+    if not outbox_worker_started:
+        start_outbox_worker(current_app._get_current_object())
+
+
+# --- Notify Team Route ---
+@bp.route("/notify_team", methods=["POST"])
+def notify_team():
+    data = request.json
+    video_id = data.get("video_id")
+    reviewer = data.get("reviewer")
+    asset_url = data.get("asset_url")
+    to_addresses = data.get("to")
+
+    if not video_id or not reviewer or not asset_url or not to_addresses:
+        return jsonify({"error": "Missing required fields"}), 400
+
+    try:
+        subject = f"Review Complete: {video_id}"
+        body = (
+            f"{reviewer} has completed their review of {video_id}.\n\n"
+            f"Message:\n{data.get('message', '[No message provided]')}\n\n"
+            f"You can view the comments and feedback at:\n{asset_url}"
+        )
+
+        queued = enqueue_notification("review_complete", to_addresses, subject, body, video_id=video_id)
+        db.session.commit()
+        outbox_wakeup.set()
+        return jsonify({"status": "Notification queued", "queued": queued}), 202
+
+    except Exception as e:
+        db.session.rollback()
+        print("[❌] Failed to notify team:", e)
+        return jsonify({"error": "Notification failed"}), 500
+
+
+# --- Notify Comment Route ---
+@bp.route("/notify_comment", methods=["POST"])
+def notify_comment():
+    data = request.json
+    video_id = data.get("video_id")
+    page = data.get("page")
+    comment_text = data.get("comment_text")
+    reviewer = data.get("reviewer")
+    to_addresses = data.get("to")  # list of emails
+    asset_url = data.get("asset_url")
+
+    if not video_id or not comment_text or not reviewer or not to_addresses:
+        return jsonify({"error": "Missing required fields"}), 400
+
+    try:
+        subject, body = mention_email(video_id, page, comment_text, reviewer, asset_url)
+        queued = enqueue_notification("mention", to_addresses, subject, body, video_id=video_id)
+        db.session.commit()
+        outbox_wakeup.set()
+        return jsonify({"status": "Comment notification queued", "queued": queued}), 202
+
+    except Exception as e:
+        db.session.rollback()
+        print("[❌] Failed to send comment notification:", e)
+        return jsonify({"error": "Failed to notify"}), 500
@@ -0,0 +1,40 @@
+"""
+Runs CPU-bound calls off the gevent event loop.
+
+run_cpu() uses gevent's thread pool for pure functions (no db.session or
+flask.g). run_pdf() is for PyMuPDF, which isn't thread-safe: calls run one
+at a time on a single thread per worker. Without gevent both run inline.
+"""
+import sys
+import threading
+
+_pdf_pool = None
+_pdf_lock = threading.Lock()
+
+
+def gevent_active():
+    if "gevent" not in sys.modules:
+        return False
+    from gevent import monkey
+    return monkey.is_module_patched("threading")
+
+
+def run_cpu(fn, *args, **kwargs):
+    """Returns fn(*args, **kwargs), computed on gevent's thread pool when running under gevent."""
+    if gevent_active():
+        import gevent
+        return gevent.get_hub().threadpool.apply(fn, args, kwargs)
+    return fn(*args, **kwargs)
+
+
+def run_pdf(fn, *args, **kwargs):
+    """Like run_cpu(), but serialized: fn may use PyMuPDF, and no other PyMuPDF call runs meanwhile."""
+    global _pdf_pool
+    if gevent_active():
+        from gevent.threadpool import ThreadPool
+        # Created on first use, so each forked worker gets its own thread
+        if _pdf_pool is None:
+            _pdf_pool = ThreadPool(1)
+        return _pdf_pool.apply(fn, args, kwargs)
+    with _pdf_lock:
+        return fn(*args, **kwargs)
@@ -0,0 +1,126 @@
+"""
+Single-flight SILAS reviews: async submissions claim a review_job row keyed
+by (video_id, source ETag, mode, instruction hash), so identical submissions
+share one run. "force": true re-runs a completed review; a job still running
+after REVIEW_JOB_TIMEOUT is taken over by the next submission.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+
+from flask import Blueprint, jsonify
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from .extensions import db
+from .models import ReviewJob
+
+bp = Blueprint("review_jobs", __name__)
+
+REVIEW_JOB_TIMEOUT = int(os.getenv("REVIEW_JOB_TIMEOUT", 2 * 3600))
+ACTIVE_STATUSES = ("running", "completed")
+
+
+def instruction_hash(*parts):
+    """Stable hash of the prompts and options a review runs with (JSON-serializable parts)."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+def dedupe_key(video_id, source_etag, mode, instructions):
+    return hashlib.sha256(json.dumps([video_id, source_etag, mode, instructions]).encode()).hexdigest()
+
+
+def claim_review_job(video_id, mode, source_etag, instructions, force=False):
+    """
+    Returns (job, created). created is False when an identical review is
+    already running, or has completed against the same source; the caller
+    hands that job back instead of starting another.
+    """
+    key = dedupe_key(video_id, source_etag, mode, instructions)
+    for _ in range(2):
+        existing = ReviewJob.query.filter(
+            ReviewJob.dedupe_key == key, ReviewJob.status.in_(ACTIVE_STATUSES)
+        ).first()
+        if existing:
+            if existing.status == "running" and existing.created_at < datetime.utcnow() - timedelta(seconds=REVIEW_JOB_TIMEOUT):
+                print(f"[⚠️] Review job {existing.id} for {video_id} timed out; starting a new one")
+                existing.status = "failed"
+                existing.error = "Timed out"
+                existing.completed_at = datetime.utcnow()
+            elif existing.status == "completed" and (force or not source_etag):
+                existing.status = "superseded"
+            else:
+                return existing, False
+
+        job = ReviewJob(
+            video_id=video_id,
+            mode=mode,
+            source_etag=source_etag,
+            instruction_hash=instructions,
+            dedupe_key=key,
+            status="running",
+        )
+        db.session.add(job)
+        try:
+            db.session.commit()
+            return job, True
+        except IntegrityError:
+            # Another submission claimed the key between our read and our insert
+            db.session.rollback()
+    return ReviewJob.query.filter(ReviewJob.dedupe_key == key, ReviewJob.status.in_(ACTIVE_STATUSES)).one(), False
+
+
+def review_outcome(comments_added, errors):
+    """
+    (status, error) for a finished run. A run where any page or frame failed,
+    or that added nothing, counts as failed, so the next identical
+    submission claims a new job instead of being handed a partial result.
+    """
+    if errors:
+        return "failed", f"{len(errors)} part(s) failed, first: {errors[0]}"[:1000]
+    if not comments_added:
+        return "failed", "No comments were added"
+    return "completed", None
+
+
+def finish_review_job(job_id, status, comments_added=0, error=None):
+    """Marks a claimed job completed or failed and commits."""
+    db.session.execute(
+        update(ReviewJob)
+        .where(ReviewJob.id == job_id)
+        .values(status=status, comments_added=comments_added, error=error, completed_at=datetime.utcnow())
+    )
+    db.session.commit()
+
+
+def review_job_json(job):
+    return {
+        "job_id": job.id,
+        "video_id": job.video_id,
+        "mode": job.mode,
+        "status": job.status,
+        "source_etag": job.source_etag,
+        "comments_added": job.comments_added,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+    }
+
+
+def deduplicated_response(job):
+    """Response for a submission that attached to an existing job instead of starting one."""
+    if job.status == "completed":
+        return jsonify({
+            "status": "SILAS review already completed",
+            "job_id": job.id,
+            "comments_added": job.comments_added,
+            "deduplicated": True,
+        }), 200
+    return jsonify({"status": "SILAS review already running", "job_id": job.id, "deduplicated": True}), 202
+
+
+# --- SILAS review job status ---
+@bp.route('/silas/review_jobs/<int:job_id>', methods=['GET'])
+def get_review_job(job_id):
+    return jsonify(review_job_json(ReviewJob.query.get_or_404(job_id)))
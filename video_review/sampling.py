@@ -0,0 +1,193 @@
+"""
+Frame sampling plans for SILAS video review.
+
+render_timeline() produces a candidate frame every THUMBNAIL_INTERVAL seconds,
+and every frame sent to the vision model is a paid call of a few seconds, so
+reviewing all of them made cost and turnaround grow without bound on long
+films. plan_review_frames() picks at most a per-video budget of candidates.
+Each candidate is weighted by the time it covers, how much narration falls
+in it and how different it looks from the previous candidate (a cheap
+scene-change score). The cumulative weight is split into equal bins and the
+heaviest candidate of each bin is reviewed. Static, quiet stretches get
+sparse coverage, busy ones dense coverage, and the whole film is always
+covered.
+
+Candidates are thumbnail-size, which is all the scoring needs. Only the
+planned frames are then extracted at full size (extract_review_frames in
+thumbnails.py).
+"""
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+
+SILAS_MAX_FRAMES = int(os.getenv("SILAS_MAX_FRAMES", 60))
+SILAS_MAX_REVIEW_SECONDS = float(os.getenv("SILAS_MAX_REVIEW_SECONDS", 0))  # 0 = no wall-time cap
+SILAS_SECONDS_PER_FRAME = float(os.getenv("SILAS_SECONDS_PER_FRAME", 6))  # vision call + comment write
+NARRATION_WEIGHT = 1.0
+SCENE_WEIGHT = 2.0
+NARRATION_MAX_WORDS = 200  # per frame prompt, however long the stretch of film it stands for
+
+
+@dataclass
+class FrameBudget:
+    max_frames: int = SILAS_MAX_FRAMES
+    max_seconds: float = SILAS_MAX_REVIEW_SECONDS
+    seconds_per_frame: float = SILAS_SECONDS_PER_FRAME
+
+    @classmethod
+    def from_request(cls, data):
+        """Reads optional max_frames / max_seconds overrides; raises ValueError on bad values."""
+        budget = cls(
+            max_frames=int(data.get("max_frames") or SILAS_MAX_FRAMES),
+            max_seconds=float(data.get("max_seconds") or SILAS_MAX_REVIEW_SECONDS),
+        )
+        if budget.max_frames < 1 or budget.max_seconds < 0:
+            raise ValueError("max_frames must be at least 1 and max_seconds non-negative")
+        return budget
+
+    @property
+    def frames(self):
+        limit = self.max_frames
+        if self.max_seconds:
+            limit = min(limit, int(self.max_seconds // self.seconds_per_frame))
+        return max(1, limit)
+
+    def to_dict(self):
+        return {
+            "max_frames": self.max_frames,
+            "max_seconds": self.max_seconds or None,
+            "frames": self.frames,
+            "estimated_seconds": round(self.frames * self.seconds_per_frame),
+        }
+
+
+@dataclass
+class PlannedFrame:
+    timestamp: float
+    path: str
+    start: float  # stretch of film this frame stands for
+    end: float
+    narration: str
+    reason: str  # scene or narration when that signal is strong, otherwise coverage
+
+
+@dataclass
+class FramePlan:
+    duration: float
+    candidates: int
+    budget: FrameBudget
+    frames: list = field(default_factory=list)
+
+    def summary(self):
+        return {
+            "duration": round(self.duration, 1),
+            "candidates": self.candidates,
+            "frames": len(self.frames),
+            "budget": self.budget.to_dict(),
+            "estimated_seconds": round(len(self.frames) * self.budget.seconds_per_frame),
+            "reasons": dict(Counter(f.reason for f in self.frames)),
+            "timestamps": [round(f.timestamp, 1) for f in self.frames],
+        }
+
+
+def transcript_segments(transcript, duration):
+    """[(start, end, text)] from a verbose_json transcription, or evenly paced from plain text."""
+    segments = getattr(transcript, "segments", None)
+    if segments:
+        return [(float(s.start), float(s.end), s.text.strip()) for s in segments]
+    words = (transcript.text or "").split()
+    if not words or not duration:
+        return []
+    pieces = max(1, int(duration // 5))
+    size = -(-len(words) // pieces)
+    return [
+        (duration * i / len(words), duration * min(i + size, len(words)) / len(words), " ".join(words[i:i + size]))
+        for i in range(0, len(words), size)
+    ]
+
+
+def scene_scores(frame_paths):
+    """0..1 difference of each frame from the one before (1.0 for the first), on tiny grayscale copies."""
+    from PIL import Image, ImageChops, ImageStat
+
+    scores, previous = [], None
+    for path in frame_paths:
+        with Image.open(path) as img:
+            img.draft("L", (64, 64))  # JPEG DCT scaling: decodes at a fraction of full size
+            small = img.convert("L").resize((32, 18))
+        scores.append(ImageStat.Stat(ImageChops.difference(small, previous)).mean[0] / 255 if previous else 1.0)
+        previous = small
+    return scores
+
+
+def narration_between(segments, start, end):
+    words = " ".join(text for s, e, text in segments if start <= (s + e) / 2 < end).split()
+    if len(words) > NARRATION_MAX_WORDS:
+        return " ".join(words[:NARRATION_MAX_WORDS]) + " …"
+    return " ".join(words)
+
+
+def frame_reason(component):
+    signal = max(("scene", "narration"), key=component.get)
+    return signal if component[signal] >= 0.5 else "coverage"
+
+
+def plan_review_frames(timeline, segments, budget):
+    """Chooses which of timeline.frames to review, within budget.frames."""
+    candidates = timeline.frames
+    duration = timeline.duration or (len(candidates) * timeline.interval)
+    if not candidates:
+        return FramePlan(duration=duration, candidates=0, budget=budget)
+
+    times = [ts for ts, _ in candidates]
+    bounds = [(ts, min(ts + timeline.interval, duration) if duration else ts + timeline.interval) for ts in times]
+    word_counts = [len(narration_between(segments, start, end).split()) for start, end in bounds]
+    scenes = scene_scores([path for _, path in candidates])
+    max_words = max(word_counts) or 1
+    max_scene = max(scenes[1:], default=0) or 1
+
+    components = [
+        {
+            "coverage": max(end - start, 0.001) / timeline.interval,
+            "narration": NARRATION_WEIGHT * word_counts[i] / max_words,
+            "scene": SCENE_WEIGHT * (min(scenes[i] / max_scene, 1.0) if i else 0.0),
+        }
+        for i, (start, end) in enumerate(bounds)
+    ]
+    weights = [sum(c.values()) for c in components]
+
+    count = min(budget.frames, len(candidates))
+    if count == len(candidates):
+        chosen = list(range(len(candidates)))
+    else:
+        # Split the cumulative weight into count equal bins and take the heaviest candidate in each,
+        # so a hard cut or a dense line of narration wins its stretch of film
+        step = sum(weights) / count
+        best, cumulative = {}, 0.0
+        for i, weight in enumerate(weights):
+            bin_index = min(int((cumulative + weight / 2) / step), count - 1)
+            if bin_index not in best or weight > weights[best[bin_index]]:
+                best[bin_index] = i
+            cumulative += weight
+        chosen = set(best.values())
+        # A heavy candidate can span several bins; spend what's left on the next heaviest
+        for i in sorted(range(len(weights)), key=lambda n: -weights[n]):
+            if len(chosen) >= count:
+                break
+            chosen.add(i)
+        chosen = sorted(chosen)
+
+    plan = FramePlan(duration=duration, candidates=len(candidates), budget=budget)
+    for n, i in enumerate(chosen):
+        # Each frame carries the narration for the stretch between it and its neighbours
+        start = 0.0 if n == 0 else (times[chosen[n - 1]] + times[i]) / 2
+        end = float("inf") if n == len(chosen) - 1 else (times[i] + times[chosen[n + 1]]) / 2
+        plan.frames.append(PlannedFrame(
+            timestamp=times[i],
+            path=candidates[i][1],
+            start=start,
+            end=min(end, duration),
+            narration=narration_between(segments, start, end),
+            reason=frame_reason(components[i]),
+        ))
+    return plan
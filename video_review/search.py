@@ -0,0 +1,158 @@
+import re
+from datetime import date, datetime, timedelta
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import DateTime, String, and_, cast, literal, null, select, union_all
+
+from .extensions import db
+from .models import SEARCH_CONFIG, Comment, SlidePage, search_vector
+
+bp = Blueprint("search", __name__)
+
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+SNIPPET_CHARS = 200
+
+
+def parse_date(value):
+    """Accepts YYYY-MM-DD or a full ISO timestamp; None when absent."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
+
+def parse_until(value):
+    """Exclusive upper bound for until: a bare date covers that whole day."""
+    if not value:
+        return None
+    try:
+        return datetime.combine(date.fromisoformat(value) + timedelta(days=1), datetime.min.time())
+    except ValueError:
+        # A full timestamp stays inclusive; microseconds are the column's resolution
+        return parse_date(value) + timedelta(microseconds=1)
+
+
+def like_terms(q):
+    """Splits a query into words for the SQLite fallback (every word must appear)."""
+    return [t for t in (w.strip('"') for w in q.split()) if t and not t.startswith("-")]
+
+
+def text_match(column, q):
+    """(where clause, rank expression) for column matching q."""
+    if db.engine.dialect.name == "postgresql":
+        tsquery = db.func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        vector = search_vector(column)
+        return vector.op("@@")(tsquery), db.func.ts_rank(vector, tsquery)
+    terms = like_terms(q) or [q]
+    escaped = [t.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") for t in terms]
+    return and_(*(column.ilike(f"%{t}%", escape="\\") for t in escaped)), literal(0.0)
+
+
+def snippet(text, q):
+    """A window of text around the first query word found, for result lists."""
+    text = " ".join((text or "").split())
+    if len(text) <= SNIPPET_CHARS:
+        return text
+    start = 0
+    for term in like_terms(q):
+        found = re.search(re.escape(term), text, re.IGNORECASE)
+        if found:
+            start = max(0, found.start() - SNIPPET_CHARS // 4)
+            break
+    window = text[start:start + SNIPPET_CHARS]
+    return ("…" if start else "") + window + ("…" if start + SNIPPET_CHARS < len(text) else "")
+
+
+# --- Search comments and storyboard page text ---
+@bp.route('/search', methods=['GET'])
+def search():
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"error": "Missing q"}), 400
+
+    kind = request.args.get("kind")  # comment, page, or both when absent
+    if kind not in (None, "comment", "page"):
+        return jsonify({"error": "Invalid kind (use comment or page)"}), 400
+    user = request.args.get("user")  # e.g. SILAS
+    video_id = request.args.get("video_id")
+    try:
+        since = parse_date(request.args.get("since"))
+        until = parse_until(request.args.get("until"))
+        page = max(1, int(request.args.get("page", 1)))
+        per_page = min(SEARCH_MAX_PAGE_SIZE, max(1, int(request.args.get("per_page", SEARCH_PAGE_SIZE))))
+    except ValueError as e:
+        return jsonify({"error": f"Invalid parameter: {e}"}), 400
+
+    branches = []
+    if kind in (None, "comment"):
+        match, rank = text_match(Comment.comment, q)
+        query = select(
+            literal("comment").label("kind"),
+            Comment.id.label("id"),
+            Comment.video_id.label("video_id"),
+            Comment.page.label("page"),
+            Comment.timestamp.label("timestamp"),
+            Comment.user.label("user"),
+            Comment.created_at.label("created_at"),
+            Comment.comment.label("text"),
+            rank.label("rank"),
+        ).where(match)
+        if user:
+            query = query.where(Comment.user == user)
+        if video_id:
+            query = query.where(Comment.video_id == video_id)
+        if since:
+            query = query.where(Comment.created_at >= since)
+        if until:
+            query = query.where(Comment.created_at < until)
+        branches.append(query)
+
+    # Pages have no author or date, so those filters leave only comments
+    if kind in (None, "page") and not (user or since or until):
+        match, rank = text_match(SlidePage.content, q)
+        query = select(
+            literal("page").label("kind"),
+            SlidePage.id.label("id"),
+            SlidePage.video_id.label("video_id"),
+            SlidePage.page_number.label("page"),
+            cast(null(), String).label("timestamp"),
+            cast(null(), String).label("user"),
+            cast(null(), DateTime).label("created_at"),
+            SlidePage.content.label("text"),
+            rank.label("rank"),
+        ).where(match)
+        if video_id:
+            query = query.where(SlidePage.video_id == video_id)
+        branches.append(query)
+
+    rows = []
+    if branches:
+        hits = (union_all(*branches) if len(branches) > 1 else branches[0]).subquery()
+        # Fetch one extra row to know whether another page exists without a COUNT over every match
+        rows = db.session.execute(
+            select(hits)
+            .order_by(hits.c.rank.desc(), hits.c.created_at.desc().nullslast(), hits.c.id.desc())
+            .limit(per_page + 1)
+            .offset((page - 1) * per_page)
+        ).all()
+
+    return jsonify({
+        "query": q,
+        "page": page,
+        "per_page": per_page,
+        "has_more": len(rows) > per_page,
+        "results": [
+            {
+                "kind": r.kind,
+                "id": r.id,
+                "video_id": r.video_id,
+                "page": r.page,
+                "timestamp": r.timestamp,
+                "user": r.user,
+                "created_at": r.created_at.isoformat() if r.created_at else None,
+                "snippet": snippet(r.text, q),
+                "rank": round(float(r.rank or 0), 4),
+            }
+            for r in rows[:per_page]
+        ],
+    })
@@ -0,0 +1,844 @@
+import base64
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Blueprint, current_app, jsonify, request
+
+from .assets import record_asset, record_review
+from .clients import get_openai_client
+from .composite import FrameGrouping, composite_max_tokens, composite_prompt, group_frames, split_composite_reply
+from .config import S3_BUCKET
+from .documents import get_document_text, numbered_blocks, numbered_text
+from .extensions import db
+from .metrics import DB_WRITES, IMAGE_BYTES_SENT, PIPELINE_RUNS, record_usage, stage
+from .models import Comment, Instruction, SlidePage
+from .offload import run_pdf
+from .sampling import FrameBudget, plan_review_frames, transcript_segments
+from .review_jobs import claim_review_job, deduplicated_response, finish_review_job, instruction_hash, review_outcome
+from .storage import load_media, media_cache, pinned_path, scratch, source_version
+from .thumbnails import extract_review_frames, publish_timeline, render_timeline
+
+bp = Blueprint("silas", __name__)
+
+
+def get_instruction(mode):
+    try:
+        row = Instruction.query.get(mode)
+        return row.content if row else ""
+    except Exception as e:
+        print(f"[❌] Failed to load system instruction for {mode}:", e)
+        return ""
+
+
+def transcribe_video(client, video_path, work_dir, pipeline):
+    """Extracts the audio track into work_dir and transcribes it with Whisper."""
+    from moviepy.editor import VideoFileClip
+    print("[🔈] Extracting audio from video...")
+    with stage(pipeline, "audio_extract"):
+        audio_clip = VideoFileClip(video_path).audio
+        audio_path = os.path.join(work_dir, "audio.mp3")
+        audio_clip.write_audiofile(audio_path, codec="mp3")
+
+    with stage(pipeline, "transcribe"), open(audio_path, "rb") as f:
+        # verbose_json adds timed segments, so narration can be matched to frames
+        return client.audio.transcriptions.create(
+            model="whisper-1", file=f, response_format="verbose_json"
+        )
+
+
+def video_frame_prompt(frame, img_b64):
+    """User message content for one planned video review frame."""
+    ts = int(frame.timestamp)
+    return [
+        {
+            "type": "text",
+            "text": f"This is a frame from the video at {ts}s. The narration around this moment ({int(frame.start)}s–{int(frame.end)}s) was:\n\n“{frame.narration}”\n\nPlease apply the SILAS video review guidelines to this frame."
+        },
+        {
+            "type": "image_url",
+            "image_url": {
+                "url": f"data:image/jpeg;base64,{img_b64}"
+            }
+        }
+    ]
+
+
+def pdf_page_count(pdf_path):
+    """Call through run_pdf(), like every PyMuPDF use."""
+    import fitz
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+
+def render_pdf_page(pdf_path, page_num, dpi=150):
+    """(page text, base64 PNG) for one page; call through run_pdf(). No fitz object outlives the call."""
+    import fitz
+    with fitz.open(pdf_path) as doc:
+        page = doc.load_page(page_num)
+        return page.get_text().strip(), base64.b64encode(page.get_pixmap(dpi=dpi).tobytes("png")).decode("utf-8")
+
+
+def storyboard_page_prompt(page_number, img_b64):
+    """User message content for one rendered storyboard page (page_number is 1-based)."""
+    return [
+        {
+            "type": "text",
+            "text": f"This is page {page_number} of the storyboard. Please apply the SILAS storyboard review guidelines when reviewing this page visually."
+        },
+        {
+            "type": "image_url",
+            "image_url": {
+                "url": f"data:image/png;base64,{img_b64}"
+            }
+        }
+    ]
+
+
+# --- Transcript Route ---
+@bp.route("/transcript/<video_id>", methods=["GET"])
+def get_transcript_for_video(video_id):
+    try:
+        filename = f"transcripts/{video_id}.json"
+        if os.path.exists(filename):
+            with open(filename, "r") as f:
+                data = json.load(f)
+            return jsonify(data)
+        else:
+            return jsonify({"error": "Transcript not found"}), 404
+    except Exception as e:
+        print("[❌] Error reading transcript:", e)
+        return jsonify({"error": "Failed to read transcript"}), 500
+
+# --- On Demand Transcript Fallback Route ---
+@bp.route("/transcript_on_demand/<video_id>", methods=["GET"])
+def transcribe_video_on_demand(video_id):
+    from moviepy.editor import VideoFileClip
+    try:
+        s3_key = f"videos/{video_id}.mp4"
+        with scratch.job(f"transcript_{video_id}") as work_dir:
+            video_path = pinned_path(lambda: media_cache.fetch(s3_key, pipeline="transcript"), work_dir)
+            audio_clip = VideoFileClip(video_path).audio
+            audio_path = os.path.join(work_dir, f"{video_id}.mp3")
+            audio_clip.write_audiofile(audio_path, codec="mp3")
+
+            client = get_openai_client()
+            with open(audio_path, "rb") as f:
+                transcript = client.audio.transcriptions.create(
+                    model="whisper-1",
+                    file=f,
+                    response_format="verbose_json"
+                )
+
+        results = []
+        for segment in transcript.segments:
+            results.append({
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text.strip()
+            })
+
+        return jsonify(results)
+    except Exception as e:
+        print("[❌] Error generating on-demand transcript:", e)
+        return jsonify({"error": "Failed to transcribe video"}), 500
+
+
+# --- SILAS Video Review Async Endpoint ---
+@bp.route('/silas/review_video_async', methods=['POST'])
+def silas_review_video_async():
+    print("[📥] /silas/review_video_async endpoint triggered")
+    data = request.json
+    file_url = data.get("file_url")
+    media_type = data.get("media_type")
+    video_id = data.get("video_id")
+
+    if not file_url or not media_type or not video_id:
+        return jsonify({"error": "Missing required fields"}), 400
+    try:
+        budget = FrameBudget.from_request(data)
+        grouping = FrameGrouping.from_request(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid review options: {e}"}), 400
+
+    job, created = claim_review_job(
+        video_id, "video", source_version(file_url),
+        instruction_hash(get_instruction("video"), budget.to_dict(), grouping.to_dict()),
+        force=bool(data.get("force")),
+    )
+    if not created:
+        return deduplicated_response(job)
+    job_id = job.id
+
+    app = current_app._get_current_object()
+
+    def run_async_review():
+        print("🚀 Inside SILAS run_async_review thread")
+        started = time.monotonic()
+        pipeline = "review_video_async"
+        comments_added, errors = 0, []
+        with app.app_context():
+            print(f"[✅] SILAS background thread started for: {video_id}")
+            work_dir = None
+            try:
+                record_review(video_id, "running", media_type)
+                # Derived audio and frames live in a workspace that is removed when the review ends
+                work_dir = scratch.open(f"silas_{video_id}")
+                # Download video (or reuse the cached copy, pinned while this review runs)
+                with stage(pipeline, "download"):
+                    video_path = load_media(file_url, pipeline=pipeline, work_dir=work_dir)
+                if not video_path:
+                    print("❌ Failed to download video")
+                    PIPELINE_RUNS.labels(pipeline, "error").inc()
+                    record_review(video_id, "failed")
+                    finish_review_job(job_id, "failed", error="Failed to download video")
+                    return
+
+                print(f"[📥] Video available at {video_path}")
+
+                # Transcribe with Whisper
+                client = get_openai_client()
+                transcript = transcribe_video(client, video_path, work_dir, pipeline)
+
+                print(f"[📝] Transcript preview: {transcript.text[:100]}...")
+
+                # One decode pass gives us both the review frames and the
+                # scrub-preview sprite sheets, which are published alongside
+                with stage(pipeline, "frames"):
+                    timeline = render_timeline(video_path, work_dir)
+                try:
+                    with stage(pipeline, "thumbnails_publish"):
+                        publish_timeline(video_id, timeline, S3_BUCKET)
+                except Exception as thumb_err:
+                    print(f"[⚠️] Failed to publish thumbnails for {video_id}: {thumb_err}")
+
+                with stage(pipeline, "plan"):
+                    segments = transcript_segments(transcript, timeline.duration)
+                    plan = plan_review_frames(timeline, segments, budget)
+                with stage(pipeline, "frame_extract"):
+                    extract_review_frames(video_path, plan.frames, work_dir)
+                summary = plan.summary()
+                print(f"[🎞️] Reviewing {summary['frames']} of {summary['candidates']} frames "
+                      f"({summary['reasons']}), about {summary['estimated_seconds']}s")
+                record_asset(video_id, review_plan=summary)
+                db.session.commit()
+                system_instruction = get_instruction("video")
+                print(f"[📖] Instruction being sent to SILAS:\n{system_instruction}")
+                # Don't hold a pooled DB connection while waiting on the model
+                db.session.close()
+
+                deadline = started + budget.max_seconds if budget.max_seconds else None
+                reviewed = 0
+                for group in group_frames(plan.frames, grouping.frames_per_call):
+                    if deadline and time.monotonic() > deadline:
+                        print(f"[⏱️] Review time budget reached; skipping the last {len(plan.frames) - reviewed} frames")
+                        break
+                    reviewed += len(group)
+                    span = f"{int(group[0].timestamp)}s" if len(group) == 1 else f"{int(group[0].timestamp)}–{int(group[-1].timestamp)}s"
+                    try:
+                        if len(group) == 1:
+                            with open(group[0].path, "rb") as img_file:
+                                img_b64 = base64.b64encode(img_file.read()).decode("utf-8")
+                            vision_prompt, image_bytes = video_frame_prompt(group[0], img_b64), len(img_b64)
+                            options = {"max_tokens": 500}
+                        else:
+                            # Several frames, one instruction: see composite.py
+                            vision_prompt, image_bytes = composite_prompt(group, grouping.layout)
+                            options = {"max_tokens": composite_max_tokens(group), "response_format": {"type": "json_object"}}
+
+                        with stage(pipeline, "vision"):
+                            response = client.chat.completions.create(
+                                model="gpt-4o",
+                                messages=[
+                                    {
+                                        "role": "system",
+                                        "content": system_instruction
+                                    },
+                                    {
+                                        "role": "user",
+                                        "content": vision_prompt
+                                    }
+                                ],
+                                **options
+                            )
+                        IMAGE_BYTES_SENT.labels(pipeline).inc(image_bytes)
+                        record_usage(pipeline, response)
+
+                        reply = response.choices[0].message.content.strip()
+                        feedback = [(group[0], reply)] if len(group) == 1 else split_composite_reply(reply, group)
+                        if len(feedback) < len(group):
+                            print(f"[⚠️] SILAS returned feedback for {len(feedback)} of {len(group)} frames at {span}")
+                        with stage(pipeline, "db_write"):
+                            for frame, text in feedback:
+                                db.session.add(Comment(
+                                    video_id=video_id,
+                                    timestamp=str(int(frame.timestamp)),
+                                    comment=text + "\n\n-- SILAS (Video Review)",
+                                    user="SILAS"
+                                ))
+                            record_asset(video_id, comments=len(feedback))
+                            db.session.commit()
+                        DB_WRITES.labels(pipeline).inc(len(feedback))
+                        comments_added += len(feedback)
+                        print(f"[✅] Saved {len(feedback)} comment(s) for {span}")
+                    except Exception as frame_err:
+                        db.session.rollback()
+                        errors.append(f"{span}: {frame_err}")
+                        print(f"❌ Error processing frames at {span}: {frame_err}")
+                status, error = review_outcome(comments_added, errors)
+                PIPELINE_RUNS.labels(pipeline, "ok" if status == "completed" else "error").inc()
+                record_review(video_id, status)
+                finish_review_job(job_id, status, comments_added, error)
+            except Exception as e:
+                import traceback
+                PIPELINE_RUNS.labels(pipeline, "error").inc()
+                print("[❌] SILAS video review error:", str(e))
+                traceback.print_exc()
+                db.session.rollback()
+                record_review(video_id, "failed")
+                finish_review_job(job_id, "failed", comments_added, str(e)[:1000])
+            finally:
+                scratch.close(work_dir)
+
+    print("✅ Review thread dispatched")
+    threading.Thread(target=run_async_review).start()
+    return jsonify({
+        "status": "SILAS video review started",
+        "job_id": job_id,
+        "budget": budget.to_dict(),
+        **grouping.to_dict(),
+    }), 202
+
+
+# --- Chunked (map-reduce) DOCX review ---
+DOCX_CHUNK_CHARS = int(os.getenv("DOCX_CHUNK_CHARS", 6000))
+DOCX_CHUNK_THRESHOLD = int(os.getenv("DOCX_CHUNK_THRESHOLD", 12000))  # auto-chunk documents longer than this
+SILAS_REVIEW_CONCURRENCY = int(os.getenv("SILAS_REVIEW_CONCURRENCY", 4))
+
+
+def chunk_document_blocks(blocks, max_chars=DOCX_CHUNK_CHARS):
+    """
+    Splits the body blocks of a document into review chunks. A chunk starts at
+    each heading (once the current chunk has some substance) or when it would
+    grow past max_chars. Paragraph numbers come from numbered_blocks().
+    """
+    chunks = []
+    current = None
+    heading = None
+    body = [b for b in numbered_blocks(blocks) if b["paragraph"]]
+    for block in body:
+        number = block["paragraph"]
+        if block["type"] == "heading":
+            heading = block["text"]
+        size = len(block["text"])
+        starts_section = block["type"] == "heading" and current and current["chars"] >= max_chars // 4
+        if current is None or starts_section or current["chars"] + size > max_chars:
+            current = {"start": number, "end": number, "heading": heading, "parts": [], "chars": 0}
+            chunks.append(current)
+        current["end"] = number
+        current["parts"].append(f"[¶{number}] {block['text']}")
+        current["chars"] += size
+    return [
+        {"start": c["start"], "end": c["end"], "heading": c["heading"], "text": "\n\n".join(c["parts"])}
+        for c in chunks
+    ]
+
+
+def review_document_chunked(client, video_id, blocks, pipeline="review"):
+    """Reviews chunks in parallel, then runs a short reduce pass for an overall summary."""
+    chunks = chunk_document_blocks(blocks)
+    instruction = get_instruction("document")
+    db.session.close()  # no pooled connection held across the model calls
+
+    def review_chunk(chunk):
+        section = f" (section \"{chunk['heading']}\")" if chunk["heading"] else ""
+        with stage(pipeline, "llm_chunk"):
+            response = client.chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": instruction},
+                    {
+                        "role": "user",
+                        "content": (
+                            f"This is part of the document titled {video_id}, covering paragraphs "
+                            f"{chunk['start']}–{chunk['end']}{section}. Paragraphs are numbered like [¶12].\n\n"
+                            f"{chunk['text']}\n\n"
+                            "Please review this part with specific feedback, citing paragraph numbers."
+                        )
+                    }
+                ],
+                max_tokens=700
+            )
+        record_usage(pipeline, response)
+        return response.choices[0].message.content.strip()
+
+    with ThreadPoolExecutor(max_workers=SILAS_REVIEW_CONCURRENCY) as pool:
+        reviews = list(pool.map(review_chunk, chunks))
+
+    for chunk, review in zip(chunks, reviews):
+        label = f"Paragraphs {chunk['start']}–{chunk['end']}"
+        if chunk["heading"]:
+            label += f" ({chunk['heading']})"
+        db.session.add(Comment(
+            video_id=video_id,
+            timestamp="0",
+            comment=f"{label}: {review}\n\n-- SILAS (Document Review)",
+            user="SILAS",
+            paragraph=chunk["start"]
+        ))
+    # Chunk reviews are stored before the reduce pass, so a failed summary doesn't discard them
+    with stage(pipeline, "db_write"):
+        record_asset(video_id, comments=len(chunks))
+        db.session.commit()
+    DB_WRITES.labels(pipeline).inc(len(chunks))
+    db.session.close()
+
+    summary_input = "\n\n".join(
+        f"Paragraphs {c['start']}–{c['end']}:\n{r}" for c, r in zip(chunks, reviews)
+    )
+    try:
+        with stage(pipeline, "llm_reduce"):
+            response = client.chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": instruction},
+                    {
+                        "role": "user",
+                        "content": (
+                            f"Below are section-by-section reviews of the document titled {video_id}.\n\n"
+                            f"{summary_input}\n\n"
+                            "Summarize the most important overall feedback in a few short bullet points."
+                        )
+                    }
+                ],
+                max_tokens=400
+            )
+    except Exception as e:
+        print(f"[⚠️] Summary failed for {video_id}; keeping {len(chunks)} chunk reviews:", str(e))
+        return len(chunks)
+    record_usage(pipeline, response)
+    db.session.add(Comment(
+        video_id=video_id,
+        timestamp="0",
+        comment="Summary: " + response.choices[0].message.content.strip() + "\n\n-- SILAS (Document Review)",
+        user="SILAS"
+    ))
+    with stage(pipeline, "db_write"):
+        record_asset(video_id, comments=1)
+        db.session.commit()
+    DB_WRITES.labels(pipeline).inc()
+    return len(chunks) + 1
+
+
+# --- SILAS AI Review Endpoint ---
+@bp.route('/silas/review', methods=['POST'])
+def silas_review():
+    """
+    Accepts a PDF or DOCX URL, downloads it, extracts the content, sends to SILAS for review,
+    and stores returned comments.
+    """
+    data = request.json
+    file_url = data.get("file_url")
+    media_type = data.get("media_type")
+    video_id = data.get("video_id")
+
+    if not file_url or not media_type or not video_id:
+        return jsonify({"error": "Missing required fields"}), 400
+
+    pipeline = "review"
+
+    # DOCX handling (must come before PDF check)
+    if file_url.lower().endswith(".docx"):
+        try:
+            record_review(video_id, "running", media_type)
+            client = get_openai_client()
+
+            with stage(pipeline, "docx_extract"):
+                document = get_document_text(video_id)
+            doc_text, blocks = document.content, document.blocks
+
+            # Long scripts are split and reviewed in parallel; "mode" can force either path
+            review_mode = data.get("mode") or ("chunked" if len(doc_text) > DOCX_CHUNK_THRESHOLD else "single")
+            if review_mode == "chunked":
+                comments_added = review_document_chunked(client, video_id, blocks, pipeline)
+                record_review(video_id, "completed")
+                return jsonify({"status": "SILAS docx review completed", "comments_added": comments_added})
+
+            instruction = get_instruction("document")
+            db.session.close()  # no pooled connection held across the model call
+            with stage(pipeline, "llm"):
+                response = client.chat.completions.create(
+                    model="gpt-4o",
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": instruction
+                        },
+                        {
+                            "role": "user",
+                            "content": f"Here is the content of the document titled {video_id}:\n\n{doc_text}\n\nPlease provide a detailed review with feedback."
+                        }
+                    ],
+                    max_tokens=1000
+                )
+
+            record_usage(pipeline, response)
+            reply = response.choices[0].message.content.strip()
+            comment = Comment(
+                video_id=video_id,
+                timestamp="0",
+                comment=reply + "\n\n-- SILAS (Document Review)",
+                user="SILAS"
+            )
+            with stage(pipeline, "db_write"):
+                db.session.add(comment)
+                record_asset(video_id, comments=1)
+                db.session.commit()
+            DB_WRITES.labels(pipeline).inc()
+            record_review(video_id, "completed")
+            return jsonify({"status": "SILAS docx review completed", "comments_added": 1})
+        except Exception as docx_err:
+            print("[❌] DOCX SILAS review error:", docx_err)
+            db.session.rollback()
+            record_review(video_id, "failed")
+            return jsonify({"error": "DOCX review failed"}), 500
+
+    # Only handle PDFs for now (storyboards)
+    if not file_url.lower().endswith(".pdf"):
+        return jsonify({"error": "Only PDF review is supported in this endpoint"}), 400
+
+    try:
+        record_review(video_id, "running", media_type)
+        client = get_openai_client()
+        # Download PDF (or reuse the cached copy)
+        with stage(pipeline, "download"):
+            pdf_path = load_media(file_url, pipeline=pipeline)
+        if not pdf_path:
+            record_review(video_id, "failed")
+            return jsonify({"error": "Failed to download PDF"}), 400
+
+        num_pages = run_pdf(pdf_page_count, pdf_path)
+        instruction = get_instruction("pdf")
+        db.session.close()  # only check out a DB connection for the writes, not across model calls
+
+        comments_added = 0
+        for page_num in range(num_pages):
+            # Run GPT-4o Vision review regardless of text content
+            with stage(pipeline, "render"):
+                page_text, img_b64 = run_pdf(render_pdf_page, pdf_path, page_num)
+
+            vision_prompt = storyboard_page_prompt(page_num + 1, img_b64)
+
+            with stage(pipeline, "vision"):
+                response = client.chat.completions.create(
+                    model="gpt-4o",
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": instruction
+                        },
+                        {
+                            "role": "user",
+                            "content": vision_prompt
+                        }
+                    ],
+                    max_tokens=1000
+                )
+
+            IMAGE_BYTES_SENT.labels(pipeline).inc(len(img_b64))
+            record_usage(pipeline, response)
+            raw_reply = response.choices[0].message.content.strip()
+            stripped_reply = raw_reply.replace("**", "")
+            formatted_reply = f"Slide {page_num + 1}: {stripped_reply}"
+
+            new_comment = Comment(
+                video_id=video_id,
+                page=page_num + 1,
+                timestamp="0",
+                comment=formatted_reply + "\n\n-- SILAS (Vision Review)",
+                user="SILAS"
+            )
+            with stage(pipeline, "db_write"):
+                # Save the page text for reference alongside the review
+                existing_page = SlidePage.query.filter_by(video_id=video_id, page_number=page_num+1).first()
+                if existing_page:
+                    existing_page.content = page_text
+                else:
+                    db.session.add(SlidePage(
+                        video_id=video_id,
+                        page_number=page_num+1,
+                        content=page_text
+                    ))
+                db.session.add(new_comment)
+                record_asset(video_id, comments=1)
+                db.session.commit()
+            DB_WRITES.labels(pipeline).inc(2)  # slide page text + comment
+            comments_added += 1
+        record_review(video_id, "completed")
+        return jsonify({"status": "SILAS review completed", "comments_added": comments_added, "pages_reviewed": num_pages})
+    except Exception as e:
+        print("SILAS error:", str(e))
+        db.session.rollback()
+        record_review(video_id, "failed")
+        return jsonify({"error": "SILAS review failed"}), 500
+
+
+# --- SILAS Chat Endpoint ---
+@bp.route('/silas/chat', methods=['POST'])
+def silas_chat():
+    data = request.json
+    message = data.get("message", "").strip()
+    file_url = data.get("file_url")
+    media_type = data.get("media_type")
+    video_id = data.get("video_id")
+
+    if not message:
+        return jsonify({"error": "Missing message"}), 400
+
+    try:
+        client = get_openai_client()
+        chat_image = data.get("chat_image")
+        # Load all comments for the video and format them
+        all_comments = []
+        comment_context = ""
+        page_context = ""
+        with stage("chat", "context"):
+            if video_id:
+                all_comments = Comment.query.filter_by(video_id=video_id).order_by(Comment.id.asc()).all()
+                comment_context = "\n".join([
+                    f"{c.timestamp or '0:00'} - {c.user}: {c.comment}" for c in all_comments
+                ])
+                # Load DOCX or storyboard content
+                if file_url and file_url.lower().endswith(".docx"):
+                    try:
+                        page_context = get_document_text(video_id).content
+                    except Exception as e:
+                        print("[⚠️] Failed to extract DOCX for chat:", e)
+                        page_context = ""
+                else:
+                    all_pages = SlidePage.query.filter_by(video_id=video_id).order_by(SlidePage.page_number.asc()).all()
+                    if all_pages:
+                        page_context = "\n\n".join([
+                            f"Page {p.page_number}:\n{p.content.strip()}" for p in all_pages
+                        ])
+            instruction = get_instruction("chat")
+            db.session.close()  # the rest of the request only waits on the model
+
+        if chat_image:
+            prompt = (
+                "You have been provided an uploaded image. The user may ask about the image's contents. "
+                "Please prioritize the image over other document context if questions reference it directly.\n\n"
+                f"User Question: {message}\n\n"
+                f"Storyboard Pages (if relevant):\n{page_context}\n\nComments:\n{comment_context}"
+            )
+        else:
+            prompt = (
+                f"You are SILAS. The user has a question about this {media_type}.\n"
+                f"File: {file_url}\n\n"
+                f"Storyboard pages:\n{page_context}\n\n"
+                f"Comments so far:\n{comment_context}\n\n"
+                f"Question: {message}"
+            )
+
+        # Check if message references a specific page and prepare image prompt if needed
+        import re
+        img_prompt = None
+        page_match = re.search(r"\bpage (\d{1,2})\b", message, re.IGNORECASE)
+        if page_match and file_url and file_url.lower().endswith(".pdf"):
+            try:
+                page_index = int(page_match.group(1)) - 1
+                with stage("chat", "page_render"):
+                    pdf_path = load_media(file_url, pipeline="chat")
+                    if pdf_path:
+                        if 0 <= page_index < run_pdf(pdf_page_count, pdf_path):
+                            _, img_b64 = run_pdf(render_pdf_page, pdf_path, page_index)
+                            img_prompt = {
+                                "type": "image_url",
+                                "image_url": {
+                                    "url": f"data:image/png;base64,{img_b64}",
+                                    "detail": "auto"
+                                }
+                            }
+            except Exception as e:
+                print(f"[⚠️] Failed to attach page image to chat prompt: {e}")
+
+        # Prioritize PDF page reference over uploaded image
+        if page_match and file_url and file_url.lower().endswith(".pdf"):
+            chat_image = None  # Discard screenshot if user asked about a page
+        elif chat_image and chat_image.startswith("data:image/"):
+            img_prompt = {
+                "type": "image_url",
+                "image_url": {
+                    "url": chat_image,
+                    "detail": "auto"
+                }
+            }
+
+        with stage("chat", "llm"):
+            chat_response = client.chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": instruction
+                    },
+                    {
+                        "role": "user",
+                        "content": [{"type": "text", "text": prompt}] + ([img_prompt] if img_prompt else [])
+                    }
+                ]
+            )
+
+        record_usage("chat", chat_response)
+        reply = chat_response.choices[0].message.content.strip()
+        return jsonify({"response": reply})
+
+    except Exception as e:
+        print("SILAS chat error:", str(e))
+        return jsonify({"error": "SILAS chat failed"}), 500
+
+
+# --- SILAS Storyboard Review Async Endpoint ---
+ASYNC_STORYBOARD_SYSTEM_PROMPT = (
+    "You are SILAS, a helpful and supportive assistant that reviews educational media. "
+    "You may receive an uploaded image and/or references to specific page numbers. "
+    "If the user mentions 'this image', assume they are referring to an uploaded screenshot. "
+    "If they reference a page number (e.g., 'page 3'), use that page from the storyboard PDF instead. "
+    "If both an image and a page are present, prioritize based on what the user clearly refers to. "
+    "Always clarify your reference in your reply (e.g., 'Based on page 2' or 'In the uploaded image'). "
+    "If the context is unclear, ask the user a clarifying question before answering."
+)
+ASYNC_STORYBOARD_PAGE_PROMPT = (
+    "Please review this storyboard slide (Page {page}). Provide only 2–3 specific, visual improvements. "
+    "Base your feedback on what you clearly see in the slide and its narration. Avoid vague language like "
+    "'if not already present' and do not include Overall Tone or What Works unless explicitly instructed."
+)
+
+
+@bp.route('/silas/review_async', methods=['POST'])
+def silas_review_async():
+    data = request.json
+    file_url = data.get("file_url")
+    media_type = data.get("media_type")
+    video_id = data.get("video_id")
+
+    if not file_url or not media_type or not video_id:
+        return jsonify({"error": "Missing required fields"}), 400
+
+    job, created = claim_review_job(
+        video_id, "storyboard", source_version(file_url),
+        instruction_hash(ASYNC_STORYBOARD_SYSTEM_PROMPT, ASYNC_STORYBOARD_PAGE_PROMPT),
+        force=bool(data.get("force")),
+    )
+    if not created:
+        return deduplicated_response(job)
+    job_id = job.id
+
+    app = current_app._get_current_object()
+
+    def run_async_review():
+        pipeline = "review_async"
+        comments_added, errors = 0, []
+        with app.app_context():
+            try:
+                record_review(video_id, "running", media_type)
+                client = get_openai_client()
+                with stage(pipeline, "download"):
+                    pdf_path = load_media(file_url, pipeline=pipeline)
+                if pdf_path:
+                    for page_num in range(run_pdf(pdf_page_count, pdf_path)):
+                        try:
+                            # Review threads are greenlets under gevent; keep PyMuPDF off the event loop
+                            with stage(pipeline, "render"):
+                                page_text, img_b64 = run_pdf(render_pdf_page, pdf_path, page_num)
+
+                            vision_prompt = [
+                                {
+                                    "type": "text",
+                                    "text": ASYNC_STORYBOARD_PAGE_PROMPT.format(page=page_num + 1)
+                                },
+                                {
+                                    "type": "image_url",
+                                    "image_url": {
+                                        "url": f"data:image/png;base64,{img_b64}",
+                                        "detail": "auto"
+                                    }
+                                }
+                            ]
+
+                            with stage(pipeline, "vision"):
+                                response = client.chat.completions.create(
+                                    model="gpt-4o",
+                                    messages=[
+                                        {
+                                            "role": "system",
+                                            "content": ASYNC_STORYBOARD_SYSTEM_PROMPT
+                                        },
+                                        {
+                                            "role": "user",
+                                            "content": vision_prompt
+                                        }
+                                    ],
+                                    max_tokens=1000
+                                )
+
+                            IMAGE_BYTES_SENT.labels(pipeline).inc(len(img_b64))
+                            record_usage(pipeline, response)
+                            raw_reply = response.choices[0].message.content.strip()
+                            stripped_reply = raw_reply.replace("**", "")
+                            formatted_reply = f"Slide {page_num + 1}: {stripped_reply}"
+
+                            new_comment = Comment(
+                                video_id=video_id,
+                                page=page_num + 1,
+                                timestamp="0",
+                                comment=formatted_reply + "\n\n-- SILAS (Vision Review)",
+                                user="SILAS"
+                            )
+                            with stage(pipeline, "db_write"):
+                                existing_page = SlidePage.query.filter_by(video_id=video_id, page_number=page_num+1).first()
+                                if existing_page:
+                                    existing_page.content = page_text
+                                else:
+                                    db.session.add(SlidePage(
+                                        video_id=video_id,
+                                        page_number=page_num+1,
+                                        content=page_text
+                                    ))
+                                db.session.add(new_comment)
+                                record_asset(video_id, comments=1)
+                                db.session.commit()
+                            DB_WRITES.labels(pipeline).inc(2)  # slide page text + comment
+                            comments_added += 1
+                        except Exception as page_err:
+                            db.session.rollback()
+                            errors.append(f"page {page_num + 1}: {page_err}")
+                            print(f"[❌] Error processing page {page_num + 1}: {page_err}")
+                else:
+                    errors.append("Failed to download PDF")
+                status, error = review_outcome(comments_added, errors)
+                PIPELINE_RUNS.labels(pipeline, "ok" if status == "completed" else "error").inc()
+                record_review(video_id, status)
+                finish_review_job(job_id, status, comments_added, error)
+            except Exception as e:
+                PIPELINE_RUNS.labels(pipeline, "error").inc()
+                print("[❌] SILAS async thread error:", e)
+                db.session.rollback()
+                record_review(video_id, "failed")
+                finish_review_job(job_id, "failed", comments_added, str(e)[:1000])
+
+    threading.Thread(target=run_async_review).start()
+    return jsonify({"status": "SILAS review started", "job_id": job_id}), 202
+
+
+@bp.route("/docx_text/<video_id>", methods=["GET"])
+def extract_docx_text(video_id):
+    try:
+        blocks = get_document_text(video_id).blocks
+        # Same [¶n] numbering as the paragraph anchors on SILAS document comments
+        return jsonify({ "content": numbered_text(blocks), "blocks": numbered_blocks(blocks) })
+    except Exception as e:
+        print("[❌] Failed to extract DOCX text:", e)
+        return jsonify({ "error": str(e) }), 500
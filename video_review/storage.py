@@ -0,0 +1,50 @@
+from .clients import http_head
+from .config import MEDIA_CACHE_DIR, MEDIA_CACHE_MAX_BYTES, S3_BUCKET, SCRATCH_DIR, SCRATCH_MAX_AGE, SCRATCH_MAX_BYTES
+from .media_cache import MediaCache, s3_key_from_url
+from .workspace import ScratchSpace
+
+media_cache = MediaCache(MEDIA_CACHE_DIR, MEDIA_CACHE_MAX_BYTES, S3_BUCKET)
+scratch = ScratchSpace(SCRATCH_DIR, SCRATCH_MAX_BYTES, SCRATCH_MAX_AGE, media_cache)
+
+def pinned_path(fetch, work_dir=None):
+    """
+    Local path of the entry fetch() returns. With work_dir (a scratch
+    workspace), the entry is pinned until that workspace is closed.
+    """
+    for _ in range(2):
+        path = fetch().path
+        # A concurrent trim can evict the entry before it is pinned; fetch it again then
+        if not work_dir or scratch.pin(work_dir, path):
+            return path
+    raise RuntimeError(f"{path} was evicted from the media cache before it could be pinned")
+
+
+def load_media(file_url, pipeline="media", work_dir=None):
+    """
+    Returns a local path for file_url from the shared media cache: objects
+    in our bucket by key and ETag, anything else by URL and content.
+    With work_dir, the entry is pinned while that workspace is open.
+    Returns None if the download fails.
+    """
+    try:
+        key = s3_key_from_url(file_url, S3_BUCKET)
+        if key:
+            return pinned_path(lambda: media_cache.fetch(key, pipeline=pipeline), work_dir)
+        return pinned_path(lambda: media_cache.fetch_url(file_url, pipeline=pipeline), work_dir)
+    except Exception as e:
+        print(f"[❌] Failed to load media {file_url}:", e)
+        return None
+
+
+def source_version(file_url):
+    """The ETag (or Last-Modified) of file_url's current content, or None if it can't be determined."""
+    try:
+        key = s3_key_from_url(file_url, S3_BUCKET)
+        if key:
+            return media_cache.head(key)["ETag"]
+        head = http_head(file_url, allow_redirects=True)
+        if head.ok:
+            return head.headers.get("ETag") or head.headers.get("Last-Modified")
+    except Exception as e:
+        print(f"[⚠️] Could not check the current version of {file_url}: {e}")
+    return None
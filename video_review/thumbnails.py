@@ -0,0 +1,148 @@
+"""
+Timeline thumbnails: scrub-preview sprite sheets plus candidate review
+frames from a single ffmpeg decode.
+
+One pass samples the video every `interval` seconds and scales the samples
+down to thumbnail size. The stream is then split in two. One branch is
+tiled into sprite sheets. The other is written out as small candidate
+frames, which is all the frame planner (sampling.py) needs for its scene
+scores. A WebVTT index maps each time range to its tile (`#xywh=`), which is
+the format most web players use for thumbnail previews.
+
+Full-size frames are only extracted for the timestamps the planner picks
+(extract_review_frames). Each one seeks straight to its timestamp instead
+of encoding a full-size JPEG for every candidate.
+"""
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import ffmpeg
+
+from .clients import get_s3_client
+
+THUMBNAIL_INTERVAL = float(os.getenv("THUMBNAIL_INTERVAL", 3))
+THUMBNAIL_WIDTH = int(os.getenv("THUMBNAIL_WIDTH", 160))
+SPRITE_COLUMNS = 10
+SPRITE_ROWS = 10
+REVIEW_FRAME_MAX_WIDTH = int(os.getenv("REVIEW_FRAME_MAX_WIDTH", 1280))
+FRAME_EXTRACT_WORKERS = int(os.getenv("FRAME_EXTRACT_WORKERS", min(4, os.cpu_count() or 1)))
+
+
+@dataclass
+class Timeline:
+    interval: float
+    duration: float
+    thumb_width: int
+    thumb_height: int
+    sprites: list = field(default_factory=list)  # local sprite sheet paths, in order
+    frames: list = field(default_factory=list)   # [(timestamp_seconds, local_jpg_path)] thumbnail-size candidates
+    vtt_path: str = ""
+
+
+def thumbnail_prefix(video_id):
+    return f"thumbnails/{video_id}/"
+
+
+def render_timeline(video_path, out_dir, interval=THUMBNAIL_INTERVAL):
+    """Decodes video_path once, writing sprite sheets, candidate frames and a VTT index into out_dir."""
+    probe = ffmpeg.probe(video_path)
+    video_stream = next(s for s in probe["streams"] if s["codec_type"] == "video")
+    duration = float(probe["format"].get("duration") or video_stream.get("duration") or 0)
+    width, height = int(video_stream["width"]), int(video_stream["height"])
+    thumb_height = max(2, int(round(THUMBNAIL_WIDTH * height / width / 2)) * 2)
+
+    frames_dir = os.path.join(out_dir, "frames")
+    os.makedirs(frames_dir, exist_ok=True)
+
+    sampled = (
+        # Deblocking makes no visible difference at thumbnail size and costs decode time
+        ffmpeg.input(video_path, skip_loop_filter="all").video
+        .filter("fps", fps=f"1/{interval}")
+        .filter("scale", THUMBNAIL_WIDTH, thumb_height)
+    )
+    branches = sampled.filter_multi_output("split")
+    sprites = (
+        branches[0]
+        .filter("tile", f"{SPRITE_COLUMNS}x{SPRITE_ROWS}")
+        .output(os.path.join(out_dir, "sprite_%03d.jpg"), **{"q:v": 5})
+    )
+    frames = branches[1].output(os.path.join(frames_dir, "frame_%05d.jpg"), **{"q:v": 5})
+    ffmpeg.merge_outputs(sprites, frames).run(quiet=True, overwrite_output=True)
+
+    timeline = Timeline(
+        interval=interval,
+        duration=duration,
+        thumb_width=THUMBNAIL_WIDTH,
+        thumb_height=thumb_height,
+        sprites=sorted(glob.glob(os.path.join(out_dir, "sprite_*.jpg"))),
+    )
+    frame_paths = sorted(glob.glob(os.path.join(frames_dir, "frame_*.jpg")))
+    timeline.frames = [(i * interval, path) for i, path in enumerate(frame_paths)]
+    timeline.vtt_path = os.path.join(out_dir, "thumbnails.vtt")
+    write_vtt(timeline, len(frame_paths))
+    return timeline
+
+
+def extract_review_frames(video_path, frames, out_dir):
+    """
+    Writes a full-size JPEG for each planned frame, seeking straight to its
+    timestamp, and points frame.path at it. A frame that can't be extracted
+    (a seek past the last decodable frame) keeps its candidate image.
+    """
+    frames_dir = os.path.join(out_dir, "review_frames")
+    os.makedirs(frames_dir, exist_ok=True)
+
+    def extract(n, frame):
+        path = os.path.join(frames_dir, f"frame_{n:05d}.jpg")
+        try:
+            (
+                ffmpeg.input(video_path, ss=frame.timestamp).video
+                .filter("scale", f"min({REVIEW_FRAME_MAX_WIDTH},iw)", -2)
+                .output(path, vframes=1, **{"q:v": 3})
+                .run(quiet=True, overwrite_output=True)
+            )
+        except ffmpeg.Error as e:
+            print(f"[⚠️] Could not extract a full-size frame at {frame.timestamp}s: {e}")
+        if os.path.exists(path):
+            frame.path = path
+
+    # Each seek is its own short ffmpeg process, so a few run side by side
+    with ThreadPoolExecutor(max_workers=FRAME_EXTRACT_WORKERS) as pool:
+        list(pool.map(extract, range(len(frames)), frames))
+    return frames
+
+
+def format_vtt_time(seconds):
+    hours, rem = divmod(seconds, 3600)
+    minutes, secs = divmod(rem, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+
+def write_vtt(timeline, tile_count):
+    per_sprite = SPRITE_COLUMNS * SPRITE_ROWS
+    lines = ["WEBVTT", ""]
+    for i in range(tile_count):
+        start = i * timeline.interval
+        end = min(start + timeline.interval, timeline.duration) if timeline.duration else start + timeline.interval
+        sprite = os.path.basename(timeline.sprites[i // per_sprite]) if timeline.sprites else ""
+        col, row = (i % per_sprite) % SPRITE_COLUMNS, (i % per_sprite) // SPRITE_COLUMNS
+        lines.append(f"{format_vtt_time(start)} --> {format_vtt_time(max(end, start + 0.001))}")
+        lines.append(
+            f"{sprite}#xywh={col * timeline.thumb_width},{row * timeline.thumb_height},"
+            f"{timeline.thumb_width},{timeline.thumb_height}"
+        )
+        lines.append("")
+    with open(timeline.vtt_path, "w") as f:
+        f.write("\n".join(lines))
+
+
+def publish_timeline(video_id, timeline, bucket):
+    """Uploads the sprite sheets and VTT index next to the video under thumbnails/<video_id>/."""
+    s3 = get_s3_client()
+    prefix = thumbnail_prefix(video_id)
+    for path in timeline.sprites:
+        s3.upload_file(path, bucket, prefix + os.path.basename(path), ExtraArgs={"ContentType": "image/jpeg"})
+    s3.upload_file(timeline.vtt_path, bucket, prefix + "thumbnails.vtt", ExtraArgs={"ContentType": "text/vtt"})
+    return prefix + "thumbnails.vtt"
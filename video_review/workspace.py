@@ -0,0 +1,138 @@
+"""
+Per-job scratch workspaces under SCRATCH_DIR, removed when the job ends.
+
+    with scratch.job(f"silas_{video_id}") as work_dir:
+        ...
+
+SCRATCH_MAX_BYTES budgets the live workspaces and the shared media cache
+together: a starting job trims the cache (least recently used, skipping
+pinned entries) and gets ScratchSpaceFull if live jobs alone fill it.
+Workspaces left by dead processes are reclaimed by the next job.
+"""
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+OWNER_FILE = ".owner"
+OWNERLESS_GRACE_SECONDS = 60
+
+
+class ScratchSpaceFull(RuntimeError):
+    pass
+
+
+def dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ScratchSpace:
+    def __init__(self, root, max_bytes, max_age, media_cache=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age  # seconds before a workspace is treated as abandoned, even if its owner is alive
+        self.media_cache = media_cache
+        self._active = set()
+        self._pins = {}  # workspace path -> media cache pins released by close()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _owner(self, path):
+        try:
+            with open(os.path.join(path, OWNER_FILE)) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def _stale(self, path, mtime):
+        if path in self._active:
+            return False
+        owner = self._owner(path)
+        if owner is None:
+            # Just created by another worker and not yet tagged, or never tagged at all
+            return time.time() - mtime > OWNERLESS_GRACE_SECONDS
+        if owner == os.getpid() or not pid_alive(owner):
+            return True
+        return time.time() - mtime > self.max_age
+
+    def make_room(self):
+        """Reclaims abandoned workspaces and trims the media cache to fit the shared budget."""
+        with self._lock:
+            workspaces = [
+                (item.path, item.stat().st_mtime) for item in os.scandir(self.root) if item.is_dir(follow_symlinks=False)
+            ]
+            live = 0
+            for path, mtime in sorted(workspaces, key=lambda w: w[1]):
+                if self._stale(path, mtime):
+                    print(f"[🧹] Removing abandoned workspace {path}")
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    live += dir_size(path)
+        if live >= self.max_bytes:
+            raise ScratchSpaceFull(f"Scratch space full: live jobs use {live} of {self.max_bytes} bytes")
+        if self.media_cache:
+            self.media_cache.trim(self.max_bytes - live)
+        return live
+
+    def open(self, prefix):
+        """Creates a workspace directory; release it with close()."""
+        self.make_room()
+        path = tempfile.mkdtemp(prefix=re.sub(r"[^\w.-]", "_", prefix) + "_", dir=self.root)
+        # Marked active before it is tagged, so another thread never sees it as ours but unused
+        with self._lock:
+            self._active.add(path)
+        with open(os.path.join(path, OWNER_FILE), "w") as f:
+            f.write(str(os.getpid()))
+        return path
+
+    def pin(self, path, media_path):
+        """
+        Keeps media_path (a media cache entry) from being trimmed until the
+        workspace at path is closed. False if the entry is already gone.
+        """
+        if not self.media_cache:
+            return True
+        pin = self.media_cache.pin(media_path)
+        if not pin:
+            return False
+        with self._lock:
+            self._pins.setdefault(path, []).append(pin)
+        return True
+
+    def close(self, path):
+        if not path:
+            return
+        with self._lock:
+            self._active.discard(path)
+            pins = self._pins.pop(path, [])
+        for pin in pins:
+            self.media_cache.unpin(pin)
+        shutil.rmtree(path, ignore_errors=True)
+
+    @contextmanager
+    def job(self, prefix):
+        path = self.open(prefix)
+        try:
+            yield path
+        finally:
+            self.close(path)
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from "react";
 import axios from "axios";
+import { multipartUpload } from "../multipartUpload";
 
 const AdminUpload = () => {
   const [selectedFile, setSelectedFile] = useState(null);
@@ -14,16 +15,12 @@ const AdminUpload = () => {
       return;
     }
 
-    const formData = new FormData();
-    formData.append("file", selectedFile);
-    formData.append("category", category);
-
     try {
-      const backendUrl = process.env.REACT_APP_BACKEND_URL || "";
-      const res = await axios.post(`${backendUrl}/admin/upload`, formData, {
-        headers: { "Content-Type": "multipart/form-data" }
+      const result = await multipartUpload(selectedFile, {
+        category,
+        onProgress: (pct) => setUploadStatus(`Uploading... ${pct}%`)
       });
-      setUploadStatus(`✅ Upload successful: ${res.data.url}`);
+      setUploadStatus(`✅ Upload successful: ${result.url}`);
       // Optionally refresh file list after upload
       setFileList(prev => prev.concat(selectedFile.name));
     } catch (err) {
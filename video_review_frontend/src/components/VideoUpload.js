@@ -1,5 +1,5 @@
 import React, { useState } from "react";
-import axios from "axios";
+import { multipartUpload } from "../multipartUpload";
 
 const VideoUpload = ({ onUploadSuccess }) => {
   const [selectedFile, setSelectedFile] = useState(null);
@@ -17,9 +17,6 @@ const VideoUpload = ({ onUploadSuccess }) => {
 
     setIsUploading(true);
 
-    const formData = new FormData();
-    formData.append("video", selectedFile);
-
     try {
       const backendUrl = process.env.REACT_APP_BACKEND_URL || '';
       console.log("Using backend URL:", backendUrl);
@@ -27,16 +24,10 @@ const VideoUpload = ({ onUploadSuccess }) => {
         console.warn("⚠️ REACT_APP_BACKEND_URL is undefined. Check your .env file and ensure the React app was restarted.");
       }
 
-      const res = await axios.post(
-        `${backendUrl}/upload`,
-        formData,
-        {
-          headers: { "Content-Type": "multipart/form-data" }
-        }
-      );
+      const result = await multipartUpload(selectedFile);
 
-      console.log("Upload response:", res.data);
-      const s3Url = res.data.url;
+      console.log("Upload response:", result);
+      const s3Url = result.url;
       if (!s3Url) {
         console.error("Error: S3 URL not returned from backend.");
         setUploadStatus("Upload failed: No S3 URL received.");
@@ -86,7 +77,7 @@ const VideoUpload = ({ onUploadSuccess }) => {
         <input
           id="video-file"
           type="file"
-          accept=".mp4,.pdf,.docx,.pptx,.mp3,.wav"
+          accept=".mp4,.pdf,.docx,.mp3,.wav"
           onChange={handleFileChange}
           style={{
             marginBottom: "1rem",
@@ -0,0 +1,50 @@
+import axios from "axios";
+
+const PART_CONCURRENCY = 4;
+
+// Uploads a file straight to S3 using a presigned multipart upload session.
+// The backend only issues the part URLs and finalizes the upload.
+export async function multipartUpload(file, { category, onProgress } = {}) {
+  const backendUrl = process.env.REACT_APP_BACKEND_URL || "";
+
+  const { data: session } = await axios.post(`${backendUrl}/upload/sessions`, {
+    filename: file.name,
+    size: file.size,
+    content_type: file.type || "application/octet-stream",
+    category
+  });
+
+  const partProgress = {};
+  const reportProgress = () => {
+    if (!onProgress) return;
+    const loaded = Object.values(partProgress).reduce((sum, n) => sum + n, 0);
+    onProgress(Math.min(100, Math.round((loaded / file.size) * 100)));
+  };
+
+  const queue = [...session.parts];
+  const uploadNext = async () => {
+    while (queue.length > 0) {
+      const { part_number, url } = queue.shift();
+      const start = (part_number - 1) * session.part_size;
+      const blob = file.slice(start, start + session.part_size);
+      await axios.put(url, blob, {
+        onUploadProgress: (e) => {
+          partProgress[part_number] = e.loaded;
+          reportProgress();
+        }
+      });
+    }
+  };
+
+  try {
+    await Promise.all(
+      Array.from({ length: Math.min(PART_CONCURRENCY, queue.length) }, uploadNext)
+    );
+  } catch (err) {
+    await axios.delete(`${backendUrl}/upload/sessions/${session.upload_id}`).catch(() => {});
+    throw err;
+  }
+
+  const { data } = await axios.post(`${backendUrl}/upload/sessions/${session.upload_id}/complete`);
+  return data;
+}